@@ -9,11 +9,6 @@ from flask import Flask
 from flask_cors import CORS
 from flask_caching import Cache
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 def create_app(config_name=None):
@@ -32,6 +27,10 @@ def create_app(config_name=None):
     config_name = config_name or os.getenv('FLASK_ENV', 'development')
     configure_app(app, config_name)
     
+    # Queue-based, structured logging with request ids
+    from app.utils.log_pipeline import configure_logging
+    configure_logging(app)
+    
     # Initialize extensions
     initialize_extensions(app)
     
@@ -41,7 +40,11 @@ def create_app(config_name=None):
     # Register error handlers
     register_error_handlers(app)
     
-    logger.info(f"Flask app created with config: {config_name}")
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+    
+    logger.info("Flask app created with config: %s", config_name)
     return app
 
 def configure_app(app, config_name):
@@ -52,8 +55,23 @@ def configure_app(app, config_name):
     app.config['DEBUG'] = config_name == 'development'
     
     # Cache configuration
-    app.config['CACHE_TYPE'] = 'SimpleCache'
+    app.config['CACHE_TYPE'] = os.getenv('CACHE_TYPE', 'SimpleCache')  # e.g. RedisCache to share across workers
+    if os.getenv('CACHE_REDIS_URL'):
+        app.config['CACHE_REDIS_URL'] = os.getenv('CACHE_REDIS_URL')
     app.config['CACHE_DEFAULT_TIMEOUT'] = 300
+    app.config['CACHE_COMPRESSION'] = os.getenv('CACHE_COMPRESSION', 'zlib')  # zstd, zlib or none
+    app.config['CACHE_COMPRESSION_LEVEL'] = int(os.getenv('CACHE_COMPRESSION_LEVEL', '6'))
+    app.config['CACHE_COMPRESSION_THRESHOLD'] = int(os.getenv('CACHE_COMPRESSION_THRESHOLD', '16384'))
+    app.config['CACHE_SNAPSHOT'] = os.getenv('CACHE_SNAPSHOT', '1') == '1'
+    app.config['CACHE_SNAPSHOT_PATH'] = os.getenv(
+        'CACHE_SNAPSHOT_PATH',
+        os.path.join(os.path.dirname(app.root_path), 'data', 'cache_snapshot.bin')
+    )
+    app.config['CACHE_SNAPSHOT_INTERVAL'] = int(os.getenv('CACHE_SNAPSHOT_INTERVAL', '300'))
+    app.config['CACHE_SNAPSHOT_MAX_ENTRIES'] = int(os.getenv('CACHE_SNAPSHOT_MAX_ENTRIES', '2000'))
+    
+    # Response serialization: orjson when installed, unless disabled
+    app.config['FAST_JSON'] = os.getenv('FAST_JSON', '1') == '1'
     
     # CORS configuration
     app.config['CORS_ORIGINS'] = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
@@ -61,6 +79,52 @@ def configure_app(app, config_name):
     # NBA API configuration
     app.config['NBA_API_TIMEOUT'] = int(os.getenv('NBA_API_TIMEOUT', '30'))
     app.config['NBA_API_RETRIES'] = int(os.getenv('NBA_API_RETRIES', '3'))
+    app.config['NBA_API_BACKOFF_BASE'] = float(os.getenv('NBA_API_BACKOFF_BASE', '0.5'))
+    app.config['NBA_API_BACKOFF_CAP'] = float(os.getenv('NBA_API_BACKOFF_CAP', '8'))
+    app.config['NBA_API_HEDGE'] = os.getenv('NBA_API_HEDGE', '0') == '1'
+    app.config['NBA_API_HEDGE_PERCENTILE'] = float(os.getenv('NBA_API_HEDGE_PERCENTILE', '95'))
+    app.config['NBA_API_WORKERS'] = int(os.getenv('NBA_API_WORKERS', '8'))
+    app.config['NBA_API_BREAKER_THRESHOLD'] = int(os.getenv('NBA_API_BREAKER_THRESHOLD', '5'))
+    app.config['NBA_API_BREAKER_RESET'] = float(os.getenv('NBA_API_BREAKER_RESET', '30'))
+    app.config['NBA_API_BULK_TIMEOUT'] = int(os.getenv('NBA_API_BULK_TIMEOUT', '180'))
+    
+    # Upstream scheduler: slot spacing, and queue depth and wait limits per priority
+    app.config['NBA_API_MIN_INTERVAL'] = float(os.getenv('NBA_API_MIN_INTERVAL', '0.6'))
+    app.config['NBA_API_QUEUE_DEPTH_INTERACTIVE'] = int(os.getenv('NBA_API_QUEUE_DEPTH_INTERACTIVE', '32'))
+    app.config['NBA_API_QUEUE_DEPTH_BACKGROUND'] = int(os.getenv('NBA_API_QUEUE_DEPTH_BACKGROUND', '64'))
+    app.config['NBA_API_QUEUE_WAIT_INTERACTIVE'] = float(os.getenv('NBA_API_QUEUE_WAIT_INTERACTIVE', '10'))
+    app.config['NBA_API_QUEUE_WAIT_BACKGROUND'] = float(os.getenv('NBA_API_QUEUE_WAIT_BACKGROUND', '120'))
+    
+    # Per-client quota on upstream calls (cache misses); 0 disables it
+    app.config['CLIENT_QUOTA'] = int(os.getenv('CLIENT_QUOTA', '60'))
+    app.config['CLIENT_QUOTA_WINDOW'] = int(os.getenv('CLIENT_QUOTA_WINDOW', '60'))
+    app.config['CLIENT_QUOTA_KEY_HEADER'] = os.getenv('CLIENT_QUOTA_KEY_HEADER', 'X-API-Key')
+    app.config['CLIENT_API_KEYS'] = [
+        api_key.strip() for api_key in os.getenv('CLIENT_API_KEYS', '').split(',') if api_key.strip()
+    ]
+    
+    # Local shot store populated by bulk ingestion
+    app.config['SHOT_STORE_DIR'] = os.getenv(
+        'SHOT_STORE_DIR',
+        os.path.join(os.path.dirname(app.root_path), 'data', 'shot_store')
+    )
+    
+    # Warm set loaded at startup and readiness thresholds
+    from app.utils.seasons import current_season
+    app.config['WARM_PLAYER_IDS'] = [
+        int(player_id) for player_id in os.getenv('WARM_PLAYER_IDS', '').split(',') if player_id.strip()
+    ]
+    app.config['WARM_SEASONS'] = [
+        season.strip() for season in os.getenv('WARM_SEASONS', current_season()).split(',') if season.strip()
+    ]
+    app.config['ROSTER_REFRESH_INTERVAL'] = int(os.getenv('ROSTER_REFRESH_INTERVAL', '21600'))
+    app.config['WARM_RETRY_PASSES'] = int(os.getenv('WARM_RETRY_PASSES', '3'))
+    app.config['WARM_RETRY_INTERVAL'] = float(os.getenv('WARM_RETRY_INTERVAL', '30'))
+    app.config['READY_UPSTREAM_WINDOW'] = float(os.getenv('READY_UPSTREAM_WINDOW', '300'))
+    app.config['READY_MAX_ERROR_RATE'] = float(os.getenv('READY_MAX_ERROR_RATE', '0.5'))
+    app.config['READY_MAX_P95_MS'] = float(os.getenv('READY_MAX_P95_MS', '10000'))
+    app.config['READY_MIN_CALLS'] = int(os.getenv('READY_MIN_CALLS', '5'))
+    app.config['READY_MAX_WARM_FAILURE_RATE'] = float(os.getenv('READY_MAX_WARM_FAILURE_RATE', '0'))
     
     # Logging configuration
     if config_name == 'production':
@@ -68,7 +132,18 @@ def configure_app(app, config_name):
     else:
         app.config['LOG_LEVEL'] = logging.INFO
     
-    logging.getLogger().setLevel(app.config['LOG_LEVEL'])
+    # json (one object per line) or text
+    app.config['LOG_FORMAT'] = os.getenv('LOG_FORMAT', 'json')
+    # Records waiting for the writer thread before new ones are dropped
+    app.config['LOG_QUEUE_SIZE'] = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    # Fraction of records kept per high-frequency event, e.g. "cache_hit=0.01,cache_store=0.1"
+    app.config['LOG_SAMPLE_RATES'] = {
+        event.strip(): float(rate)
+        for event, _, rate in (
+            item.partition('=') for item in os.getenv('LOG_SAMPLE_RATES', 'cache_hit=0.01,cache_store=0.1').split(',')
+        )
+        if event.strip()
+    }
 
 def initialize_extensions(app):
     """Initialize Flask extensions"""
@@ -77,18 +152,69 @@ def initialize_extensions(app):
     CORS(app, origins=app.config['CORS_ORIGINS'])
     logger.info(f"CORS configured for origins: {app.config['CORS_ORIGINS']}")
     
+    # Fast JSON encoding for every jsonify() response
+    from app.utils.json_provider import ORJSON_AVAILABLE, OrjsonProvider
+    if app.config['FAST_JSON'] and ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
+    logger.info(f"JSON provider: {type(app.json).__name__}")
+    
     # Initialize Cache
     cache = Cache(app)
     app.cache = cache
-    logger.info("Cache initialized")
+    
+    from app.utils.compression import ValueCompressor
+    app.cache_compressor = ValueCompressor.from_config(app.config)
+    logger.info(f"Cache initialized (compression: {app.cache_compressor.codec}, "
+                f"level {app.cache_compressor.level}, threshold {app.cache_compressor.threshold}B)")
+    
+    # Reload hot entries saved by the previous process, then keep snapshotting;
+    # started by the first request so CLI commands leave the snapshot alone
+    if app.config['CACHE_SNAPSHOT']:
+        from app.services.cache_snapshot import CacheSnapshotter
+        app.cache_snapshotter = CacheSnapshotter(
+            app,
+            app.config['CACHE_SNAPSHOT_PATH'],
+            max_entries=app.config['CACHE_SNAPSHOT_MAX_ENTRIES'],
+            interval=app.config['CACHE_SNAPSHOT_INTERVAL']
+        )
+        app.before_request(app.cache_snapshotter.ensure_started)
+    
+    # Initialize upstream retry policy shared by all NBA API calls
+    from app.services.upstream import RetryPolicy
+    app.upstream_policy = RetryPolicy.from_config(app.config)
+    logger.info(f"Upstream policy configured: timeout={app.config['NBA_API_TIMEOUT']}s, "
+                f"retries={app.config['NBA_API_RETRIES']}, hedge={app.config['NBA_API_HEDGE']}, "
+                f"min interval={app.config['NBA_API_MIN_INTERVAL']}s")
+    
+    # Upstream quota per client, counted in the cache backend
+    from app.services.client_quota import ClientQuota
+    app.client_quota = ClientQuota.from_config(app.config)
+    logger.info(f"Client quota: {app.config['CLIENT_QUOTA']} upstream calls per "
+                f"{app.config['CLIENT_QUOTA_WINDOW']}s")
+    if app.config['CLIENT_QUOTA'] and app.config['CACHE_TYPE'] == 'SimpleCache':
+        logger.warning("Client quotas are counted per worker with SimpleCache; "
+                       "set CACHE_TYPE=RedisCache to share them across workers")
+    
+    # Player index and warm set, loaded in the background from the first request on
+    from app.services.player_index import PlayerIndex
+    from app.services.warmup import Warmup
+    app.player_index = PlayerIndex()
+    app.warmup = Warmup.from_config(app)
+    app.before_request(app.warmup.ensure_started)
 
 def register_blueprints(app):
     """Register application blueprints"""
     
+    from app.routes.health import health_bp
+    from app.routes.league import league_bp
     from app.routes.players import players_bp
+    from app.routes.teams import teams_bp
     
     # Register API blueprints with prefix
+    app.register_blueprint(health_bp, url_prefix='/api/health')
+    app.register_blueprint(league_bp, url_prefix='/api/league')
     app.register_blueprint(players_bp, url_prefix='/api')
+    app.register_blueprint(teams_bp, url_prefix='/api')
     
     # Health check endpoint
     @app.route('/health')
@@ -0,0 +1,66 @@
+"""
+Flask CLI commands for data maintenance jobs
+"""
+
+import json
+import logging
+import click
+
+logger = logging.getLogger(__name__)
+
+SEASON_TYPES = ['Regular Season', 'Playoffs']
+
+def register_commands(app):
+    """Register CLI commands on the application"""
+    
+    @app.cli.command('ingest-season')
+    @click.argument('season')
+    @click.option('--season-type', 'season_types', multiple=True, type=click.Choice(SEASON_TYPES),
+                  help='Season type to ingest (repeatable, default: all)')
+    def ingest_season(season, season_types):
+        """Ingest every shot of SEASON (e.g. 2023-24) into the local shot store"""
+        from app.services.ingestion_service import IngestionService
+        
+        ingestion_service = IngestionService()
+        
+        for season_type in season_types or SEASON_TYPES:
+            manifest = ingestion_service.ingest_season(season, season_type)
+            manifest.pop('player_ids', None)
+            click.echo(json.dumps(manifest))
+
+    
+    @app.cli.command('build-baselines')
+    @click.argument('season')
+    @click.option('--season-type', 'season_types', multiple=True, type=click.Choice(SEASON_TYPES),
+                  help='Season type to build (repeatable, default: all)')
+    def build_baselines(season, season_types):
+        """Build league zone baselines of SEASON from one league-wide call per season type"""
+        from app.services.baseline_service import BaselineService
+        
+        baseline_service = BaselineService()
+        
+        for season_type in season_types or SEASON_TYPES:
+            baselines = baseline_service.build_baselines(season, season_type)
+            click.echo(json.dumps({key: value for key, value in baselines.items() if key != 'zones'}))
+    
+    @app.cli.command('sync-season')
+    @click.argument('season', required=False)
+    @click.option('--season-type', 'season_types', multiple=True, type=click.Choice(SEASON_TYPES),
+                  help='Season type to sync (repeatable, default: all)')
+    @click.option('--player-id', 'player_ids', multiple=True, type=int,
+                  help='Only sync these players (repeatable, default: whole ingested season)')
+    def sync_season(season, season_types, player_ids):
+        """Append games played since the last sync of SEASON (default: current season)"""
+        from app.services.sync_service import SyncService
+        from app.utils.seasons import current_season
+        
+        season = season or current_season()
+        sync_service = SyncService()
+        
+        for season_type in season_types or SEASON_TYPES:
+            if player_ids:
+                for player_id in player_ids:
+                    shots = sync_service.sync_player(player_id, season, season_type)
+                    click.echo(json.dumps({'player_id': player_id, 'season_type': season_type, 'shots': len(shots)}))
+            else:
+                click.echo(json.dumps(sync_service.sync_season(season, season_type)))
\ No newline at end of file
@@ -1,9 +1,22 @@
 """
 Pydantic models for player data validation
+
+Responses are validated once, when data enters the cache; cached entries
+hold the validated model instances (or a ShotTable marked as validated),
+and routes assemble response envelopes around them with model_construct()
+and serialize with the compiled pydantic-core serializer.
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator, model_validator
+from typing import Any, List, Optional
+import logging
+
+from app.models.shot_table import ShotTable
+
+logger = logging.getLogger(__name__)
+
+# Four quarters plus overtime periods
+MAX_PERIOD = 10
 
 class PlayerResponse(BaseModel):
     """Player response model"""
@@ -17,13 +30,15 @@ class PlayerResponse(BaseModel):
     jerseyNumber: str = Field(..., description="Jersey number")
     imageUrl: Optional[str] = Field(None, description="Player headshot URL")
     
-    @validator('id')
+    @field_validator('id')
+    @classmethod
     def validate_player_id(cls, v):
         if v <= 0:
             raise ValueError('Player ID must be positive')
         return v
     
-    @validator('fullName')
+    @field_validator('fullName')
+    @classmethod
     def validate_full_name(cls, v):
         if not v.strip():
             raise ValueError('Full name cannot be empty')
@@ -41,13 +56,15 @@ class ShotResponse(BaseModel):
     timeRemaining: str = Field(..., description="Time remaining in period")
     shotZone: str = Field(..., description="Shot zone on court")
     
-    @validator('period')
+    @field_validator('period')
+    @classmethod
     def validate_period(cls, v):
-        if v < 1 or v > 4:
-            raise ValueError('Period must be between 1 and 4')
+        if v < 1 or v > MAX_PERIOD:
+            raise ValueError(f'Period must be between 1 and {MAX_PERIOD}')
         return v
     
-    @validator('shotDistance')
+    @field_validator('shotDistance')
+    @classmethod
     def validate_shot_distance(cls, v):
         if v < 0:
             raise ValueError('Shot distance cannot be negative')
@@ -63,17 +80,18 @@ class ShotStatsResponse(BaseModel):
     threePointPercentage: float = Field(..., description="Three point percentage")
     averageShotDistance: float = Field(..., description="Average shot distance")
     
-    @validator('fieldGoalPercentage', 'threePointPercentage')
+    @field_validator('fieldGoalPercentage', 'threePointPercentage')
+    @classmethod
     def validate_percentage(cls, v):
         if v < 0 or v > 1:
             raise ValueError('Percentage must be between 0 and 1')
         return v
     
-    @validator('totalMade')
-    def validate_made_vs_attempts(cls, v, values):
-        if 'totalAttempts' in values and v > values['totalAttempts']:
-            raise ValueError('Made shots cannot exceed total attempts')
-        return v
+    @model_validator(mode='after')
+    def validate_made_vs_attempts(self):
+        if self.totalMade > self.totalAttempts or self.threePointMade > self.threePointAttempts:
+            raise ValueError('Made shots cannot exceed attempts')
+        return self
 
 class PlayerSearchResponse(BaseModel):
     """Player search response model"""
@@ -81,11 +99,21 @@ class PlayerSearchResponse(BaseModel):
     query: str = Field(..., description="Search query used")
     count: int = Field(..., description="Number of results returned")
     
-    @validator('count')
-    def validate_count_matches_data(cls, v, values):
-        if 'data' in values and v != len(values['data']):
+    @model_validator(mode='after')
+    def validate_count_matches_data(self):
+        if self.count != len(self.data):
             raise ValueError('Count must match data length')
-        return v
+        return self
+
+class PlayerDetailResponse(BaseModel):
+    """Single player response model"""
+    data: PlayerResponse = Field(..., description="Player information")
+
+class PlayerStatsResponse(BaseModel):
+    """Player statistics response model"""
+    data: ShotStatsResponse = Field(..., description="Shooting statistics")
+    player_id: int = Field(..., description="Player ID")
+    season: str = Field(..., description="NBA season")
 
 class ShotDataResponse(BaseModel):
     """Shot data response model"""
@@ -95,7 +123,8 @@ class ShotDataResponse(BaseModel):
     season_type: str = Field(..., description="Season type")
     count: int = Field(..., description="Number of shots returned")
     
-    @validator('season')
+    @field_validator('season')
+    @classmethod
     def validate_season_format(cls, v):
         if not v or len(v) != 7 or v[4] != '-':
             raise ValueError('Season must be in format YYYY-YY')
@@ -105,13 +134,100 @@ class ErrorResponse(BaseModel):
     """Error response model"""
     error: dict = Field(..., description="Error details")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "error": {
-                    "code": "PLAYER_NOT_FOUND",
-                    "message": "Player with ID 999999 not found",
-                    "details": "Additional error details"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "error": {
+                "code": "PLAYER_NOT_FOUND",
+                "message": "Player with ID 999999 not found",
+                "details": "Additional error details"
             }
-        }
\ No newline at end of file
+        }
+    })
+
+# Compiled once; validating a list through an adapter stays in pydantic-core
+_PLAYER_LIST = TypeAdapter(List[PlayerResponse])
+_SHOT_LIST = TypeAdapter(List[ShotResponse])
+
+def validate_player(player: Any) -> PlayerResponse:
+    """
+    Validate a player dictionary
+    
+    Args:
+        player: Player dictionary (or an already validated model)
+    
+    Returns:
+        Validated player model
+    
+    Raises:
+        ValidationError: If the player is invalid
+    """
+    if isinstance(player, PlayerResponse):
+        return player
+    return PlayerResponse.model_validate(player)
+
+def validate_players(players: List[Any]) -> List[PlayerResponse]:
+    """
+    Validate a list of player dictionaries, dropping invalid entries
+    
+    Args:
+        players: Player dictionaries (or already validated models)
+    
+    Returns:
+        Validated player models
+    """
+    if all(isinstance(player, PlayerResponse) for player in players):
+        return players
+    
+    try:
+        return _PLAYER_LIST.validate_python(players)
+    except ValidationError as e:
+        invalid = _invalid_rows(e)
+        logger.warning(f"Dropping {len(invalid)} invalid players: {e.errors()[0]['msg']}")
+        return _PLAYER_LIST.validate_python([player for row, player in enumerate(players) if row not in invalid])
+
+def validate_stats(stats: Any) -> ShotStatsResponse:
+    """
+    Validate a shot statistics dictionary
+    
+    Args:
+        stats: Statistics dictionary (or an already validated model)
+    
+    Returns:
+        Validated statistics model
+    
+    Raises:
+        ValidationError: If the statistics are inconsistent
+    """
+    if isinstance(stats, ShotStatsResponse):
+        return stats
+    return ShotStatsResponse.model_validate(stats)
+
+def validate_shot_table(shots: ShotTable) -> ShotTable:
+    """
+    Validate every shot of a table, dropping invalid rows
+    
+    Tables are marked as validated, so the copies of one table kept under
+    several cache keys are only checked once.
+    
+    Args:
+        shots: Shot table
+    
+    Returns:
+        The table itself, or a copy without the invalid rows
+    """
+    if shots.validated:
+        return shots
+    
+    try:
+        _SHOT_LIST.validate_python(shots.to_dicts())
+    except ValidationError as e:
+        invalid = _invalid_rows(e)
+        logger.warning(f"Dropping {len(invalid)} invalid shots: {e.errors()[0]['msg']}")
+        shots = shots.take(row for row in range(len(shots)) if row not in invalid)
+    
+    shots.validated = True
+    return shots
+
+def _invalid_rows(error: ValidationError) -> set:
+    """List positions reported by a list validation error"""
+    return {details['loc'][0] for details in error.errors() if details['loc']}
\ No newline at end of file
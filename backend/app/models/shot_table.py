@@ -0,0 +1,408 @@
+"""
+Compact columnar shot container
+
+Shots are kept as typed `array` columns with integer game/event ids and
+interned zone/shot type codes instead of one dict per shot. Services and
+the cache pass ShotTable instances around; dictionaries are only built at
+the API edge with to_dicts().
+
+Every table carries a generation, replaced on every write. Appending
+(concat) keeps the generations of the tables it extends, with their row
+counts, so clients can ask for the rows added since any of them.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from array import array
+import json
+import struct
+import sys
+import threading
+import time
+
+# Column name -> array typecode
+COLUMNS = (
+    ('game_id', 'i'),
+    ('event_id', 'i'),
+    ('loc_x', 'h'),
+    ('loc_y', 'h'),
+    ('distance', 'H'),
+    ('made', 'B'),
+    ('period', 'B'),
+    ('clock', 'H'),          # seconds remaining in the period
+    ('zone', 'B'),           # code into ShotTable.zones
+    ('shot_type', 'B'),      # code into ShotTable.shot_types
+    ('game_date', 'i'),      # YYYYMMDD
+)
+
+# API shot fields copied straight from a column
+FIELD_COLUMNS = {
+    'locationX': 'loc_x',
+    'locationY': 'loc_y',
+    'shotDistance': 'distance',
+    'period': 'period'
+}
+
+# numpy dtypes matching the array typecodes above
+_NUMPY_DTYPES = {'i': 'int32', 'h': 'int16', 'H': 'uint16', 'B': 'uint8'}
+
+_MAGIC = b'SHT1'
+
+# Earlier generations remembered per table for deltas
+MAX_VERSIONS = 64
+
+_generation_lock = threading.Lock()
+_last_generation = 0
+
+
+def _new_generation() -> int:
+    """Increasing generation, unique within the process (microseconds since the epoch)"""
+    global _last_generation
+    with _generation_lock:
+        _last_generation = max(_last_generation + 1, time.time_ns() // 1000)
+        return _last_generation
+
+# Fields of the API shot dictionaries, in output order
+SHOT_FIELDS = ('id', 'locationX', 'locationY', 'shotDistance', 'shotMade',
+               'shotType', 'period', 'timeRemaining', 'shotZone')
+
+
+class ShotTable:
+    """Columnar, array-backed list of shots"""
+
+    def __init__(self, columns: Optional[Dict[str, array]] = None,
+                 zones: Optional[List[str]] = None, shot_types: Optional[List[str]] = None):
+        """
+        Initialize the table
+
+        Args:
+            columns: Column arrays keyed by name (empty columns if omitted)
+            zones: Shot zone names indexed by zone code
+            shot_types: Shot type names indexed by shot type code
+        """
+        columns = columns or {}
+        for name, typecode in COLUMNS:
+            setattr(self, name, columns.get(name, array(typecode)))
+        self.zones = [sys.intern(zone) for zone in (zones or [])]
+        self.shot_types = [sys.intern(shot_type) for shot_type in (shot_types or [])]
+        # Set once the rows passed response model validation (see validate_shot_table)
+        self.validated = False
+        self.generation = _new_generation()
+        # Row count of this and every earlier generation this table appends to
+        self.versions: Dict[int, int] = {self.generation: len(self)}
+
+    @classmethod
+    def empty(cls) -> 'ShotTable':
+        """Create a table without shots"""
+        return cls()
+
+    @classmethod
+    def from_frame(cls, shot_data) -> 'ShotTable':
+        """
+        Build a table from ShotChartDetail rows without per-row Python work
+
+        Args:
+            shot_data: ShotChartDetail data frame
+
+        Returns:
+            ShotTable with one row per shot
+        """
+        import pandas as pd
+
+        if shot_data.empty:
+            return cls.empty()
+
+        zone_codes, zones = pd.factorize(shot_data['SHOT_ZONE_BASIC'].astype(str))
+        type_codes, shot_types = pd.factorize(shot_data['SHOT_TYPE'].astype(str))
+
+        values = {
+            'game_id': shot_data['GAME_ID'].astype(int),
+            'event_id': shot_data['GAME_EVENT_ID'],
+            'loc_x': shot_data['LOC_X'],
+            'loc_y': shot_data['LOC_Y'],
+            'distance': shot_data['SHOT_DISTANCE'],
+            'made': shot_data['SHOT_MADE_FLAG'],
+            'period': shot_data['PERIOD'],
+            'clock': shot_data['MINUTES_REMAINING'] * 60 + shot_data['SECONDS_REMAINING'],
+            'zone': zone_codes,
+            'shot_type': type_codes,
+            'game_date': shot_data['GAME_DATE'].astype(int)
+        }
+
+        columns = {}
+        for name, typecode in COLUMNS:
+            column = values[name]
+            column = column.to_numpy() if hasattr(column, 'to_numpy') else column
+            columns[name] = array(typecode, column.astype(_NUMPY_DTYPES[typecode]).tobytes())
+
+        return cls(columns, list(zones), list(shot_types))
+
+    @classmethod
+    def from_dicts(cls, shots: List[Dict[str, Any]], game_date: int = 0) -> 'ShotTable':
+        """
+        Build a table from API shot dictionaries
+
+        Args:
+            shots: List of shot dictionaries
+            game_date: Game date (YYYYMMDD) to use, dicts do not carry one
+
+        Returns:
+            ShotTable with one row per shot
+        """
+        table = cls()
+        zone_codes: Dict[str, int] = {}
+        type_codes: Dict[str, int] = {}
+
+        for shot in shots:
+            _, game_id, event_id = shot['id'].split('_')
+            minutes, _, seconds = shot['timeRemaining'].partition(':')
+
+            table.game_id.append(int(game_id))
+            table.event_id.append(int(event_id))
+            table.loc_x.append(shot['locationX'])
+            table.loc_y.append(shot['locationY'])
+            table.distance.append(shot['shotDistance'])
+            table.made.append(1 if shot['shotMade'] else 0)
+            table.period.append(shot['period'])
+            table.clock.append(int(minutes) * 60 + int(seconds or 0))
+            table.zone.append(zone_codes.setdefault(shot['shotZone'], len(zone_codes)))
+            table.shot_type.append(type_codes.setdefault(shot['shotType'], len(type_codes)))
+            table.game_date.append(game_date)
+
+        table.zones = [sys.intern(zone) for zone in zone_codes]
+        table.shot_types = [sys.intern(shot_type) for shot_type in type_codes]
+        return table
+
+    def __len__(self) -> int:
+        return len(self.game_id)
+
+    def __repr__(self) -> str:
+        return f"ShotTable(rows={len(self)}, nbytes={self.nbytes})"
+
+    @property
+    def version(self) -> int:
+        """Version of the shot set sent to clients: its generation"""
+        return self.generation
+
+    def rows_at(self, version: int) -> Optional[int]:
+        """
+        Row count of an earlier version of this shot set
+
+        Rows at positions >= the returned count are exactly the shots added
+        since that version.
+
+        Returns:
+            Row count, or None if the table does not extend that version
+            (it was rebuilt, or the version is too old or unknown)
+        """
+        return self.versions.get(version)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the column buffers"""
+        return sum(getattr(self, name).itemsize * len(getattr(self, name)) for name, _ in COLUMNS)
+
+    def columns(self) -> Dict[str, array]:
+        """Column arrays keyed by name"""
+        return {name: getattr(self, name) for name, _ in COLUMNS}
+
+    def keys(self) -> Iterator[Tuple[int, int]]:
+        """Iterate (game_id, event_id) pairs identifying each shot"""
+        return zip(self.game_id, self.event_id)
+
+    def zone_codes(self, names: Iterable[str]) -> List[int]:
+        """Codes of the given zone names present in this table"""
+        return [self.zones.index(name) for name in names if name in self.zones]
+
+    def shot_type_codes(self, names: Iterable[str]) -> List[int]:
+        """Codes of the given shot type names present in this table"""
+        return [self.shot_types.index(name) for name in names if name in self.shot_types]
+
+    def take(self, positions: Iterable[int]) -> 'ShotTable':
+        """
+        Select rows by position
+
+        Args:
+            positions: Row positions to keep, in output order
+
+        Returns:
+            New ShotTable sharing this table's code lists
+        """
+        positions = list(positions)
+        columns = {}
+        for name, typecode in COLUMNS:
+            column = getattr(self, name)
+            columns[name] = array(typecode, [column[i] for i in positions])
+        table = ShotTable(columns, self.zones, self.shot_types)
+        table.validated = self.validated
+        return table
+
+    def concat(self, other: 'ShotTable') -> 'ShotTable':
+        """
+        Append another table's rows, remapping its zone/shot type codes
+
+        Args:
+            other: Table whose rows are appended
+
+        Returns:
+            New ShotTable with this table's rows followed by the other's, in a
+            new generation extending this table's (the same one if other is empty)
+        """
+        zones = list(self.zones)
+        shot_types = list(self.shot_types)
+        zone_map = [self._code_for(zones, zone) for zone in other.zones]
+        type_map = [self._code_for(shot_types, shot_type) for shot_type in other.shot_types]
+
+        columns = {}
+        for name, typecode in COLUMNS:
+            column = array(typecode, getattr(self, name))
+            if name == 'zone':
+                column.extend(zone_map[code] for code in other.zone)
+            elif name == 'shot_type':
+                column.extend(type_map[code] for code in other.shot_type)
+            else:
+                column.extend(getattr(other, name))
+            columns[name] = column
+        table = ShotTable(columns, zones, shot_types)
+        # Rows of validated (or empty) tables need no second validation
+        table.validated = all(part.validated or not part for part in (self, other))
+
+        if not other:
+            table.generation = self.generation
+            table.versions = dict(self.versions)
+        else:
+            versions = list(self.versions.items())[-(MAX_VERSIONS - 1):]
+            table.versions = dict(versions + [(table.generation, len(table))])
+        return table
+
+    @staticmethod
+    def _code_for(names: List[str], name: str) -> int:
+        """Code of a name in a code list, appending it if missing"""
+        if name not in names:
+            names.append(name)
+        return names.index(name)
+
+    def to_dicts(self, positions: Optional[Iterable[int]] = None,
+                 fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Build API shot dictionaries
+
+        Args:
+            positions: Row positions to include (all rows if omitted)
+            fields: SHOT_FIELDS to include (all if omitted); only these are computed
+
+        Returns:
+            List of shot dictionaries
+        """
+        if positions is None:
+            positions = range(len(self))
+
+        if fields is not None:
+            # Projection: build only the requested columns, then zip them into rows
+            fields = tuple(fields)
+            values = [self.field_values(field, positions) for field in fields]
+            return [dict(zip(fields, row)) for row in zip(*values)]
+
+        zones = self.zones
+        shot_types = self.shot_types
+        game_id, event_id = self.game_id, self.event_id
+        loc_x, loc_y, distance = self.loc_x, self.loc_y, self.distance
+        made, period, clock = self.made, self.period, self.clock
+        zone, shot_type = self.zone, self.shot_type
+
+        return [
+            {
+                'id': f"shot_{game_id[i]:010d}_{event_id[i]}",
+                'locationX': loc_x[i],
+                'locationY': loc_y[i],
+                'shotDistance': distance[i],
+                'shotMade': made[i] == 1,
+                'shotType': shot_types[shot_type[i]],
+                'period': period[i],
+                'timeRemaining': f"{clock[i] // 60}:{clock[i] % 60:02d}",
+                'shotZone': zones[zone[i]]
+            }
+            for i in positions
+        ]
+
+    def field_values(self, field: str, positions: Iterable[int]) -> List[Any]:
+        """
+        Values of one API shot field
+
+        Args:
+            field: One of SHOT_FIELDS
+            positions: Row positions, in output order
+
+        Returns:
+            List with one value per position
+        """
+        if field == 'id':
+            game_id, event_id = self.game_id, self.event_id
+            return [f"shot_{game_id[i]:010d}_{event_id[i]}" for i in positions]
+        if field == 'shotMade':
+            made = self.made
+            return [made[i] == 1 for i in positions]
+        if field == 'shotType':
+            shot_types, shot_type = self.shot_types, self.shot_type
+            return [shot_types[shot_type[i]] for i in positions]
+        if field == 'shotZone':
+            zones, zone = self.zones, self.zone
+            return [zones[zone[i]] for i in positions]
+        if field == 'timeRemaining':
+            clock = self.clock
+            return [f"{clock[i] // 60}:{clock[i] % 60:02d}" for i in positions]
+
+        column = getattr(self, FIELD_COLUMNS[field])
+        return [column[i] for i in positions]
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize into a compact binary blob (native byte order)
+
+        Returns:
+            Header followed by the raw column buffers
+        """
+        header = json.dumps({
+            'rows': len(self),
+            'zones': self.zones,
+            'shot_types': self.shot_types,
+            'generation': self.generation,
+            'versions': list(self.versions.items())
+        }).encode()
+        parts = [_MAGIC, struct.pack('<I', len(header)), header]
+        parts.extend(getattr(self, name).tobytes() for name, _ in COLUMNS)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data) -> 'ShotTable':
+        """
+        Deserialize a blob produced by to_bytes
+
+        Args:
+            data: bytes, memoryview or mmap holding the blob
+
+        Returns:
+            ShotTable with the stored rows
+        """
+        view = memoryview(data)
+        if bytes(view[:4]) != _MAGIC:
+            raise ValueError('Not a serialized ShotTable')
+
+        header_length = struct.unpack('<I', view[4:8])[0]
+        header = json.loads(bytes(view[8:8 + header_length]))
+        offset = 8 + header_length
+        rows = header['rows']
+
+        columns = {}
+        for name, typecode in COLUMNS:
+            column = array(typecode)
+            length = rows * column.itemsize
+            column.frombytes(view[offset:offset + length])
+            columns[name] = column
+            offset += length
+
+        table = cls(columns, header['zones'], header['shot_types'])
+        # Blobs written before generations were stored start a new one
+        if 'generation' in header:
+            table.generation = header['generation']
+            table.versions = {generation: count for generation, count in header['versions']}
+        return table
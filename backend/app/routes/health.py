@@ -2,7 +2,7 @@
 Health check endpoints for monitoring and deployment
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, jsonify
 import time
 import os
 
@@ -26,20 +26,50 @@ def health_check():
 def readiness_check():
     """
     Readiness check endpoint for Kubernetes deployments
-    Verifies that the service is ready to accept traffic
+    Ready once the player index is built, the warm set has loaded (up to the
+    allowed failure rate) and recent upstream error rate and latency are under
+    their thresholds
     """
+    from app.services.player_index import get_player_index
+    from app.services.upstream import get_retry_policy
+    
     try:
-        # Test NBA API connectivity (basic check)
-        from nba_api.stats.endpoints import commonplayerinfo
-        # This is a lightweight check - just import the module
+        config = current_app.config
+        
+        player_index = get_player_index().status()
+        warm_set = current_app.warmup.status()
+        warm_set['max_failure_rate'] = config['READY_MAX_WARM_FAILURE_RATE']
+        upstream = get_retry_policy().recent_health(config['READY_UPSTREAM_WINDOW'])
+        
+        # Too few recent calls say nothing about upstream health
+        upstream_sampled = upstream['calls'] >= config['READY_MIN_CALLS']
+        upstream_healthy = upstream['circuit_state'] != 'open' and (
+            not upstream_sampled or (
+                upstream['error_rate'] <= config['READY_MAX_ERROR_RATE'] and
+                (upstream['p95_ms'] is None or upstream['p95_ms'] <= config['READY_MAX_P95_MS'])
+            )
+        )
+        upstream['thresholds'] = {
+            'max_error_rate': config['READY_MAX_ERROR_RATE'],
+            'max_p95_ms': config['READY_MAX_P95_MS'],
+            'min_calls': config['READY_MIN_CALLS']
+        }
+        
+        checks = {
+            'player_index': player_index['built'],
+            'warm_set': current_app.warmup.ready(config['READY_MAX_WARM_FAILURE_RATE']),
+            'upstream': upstream_healthy
+        }
+        ready = all(checks.values())
         
         return jsonify({
-            'status': 'ready',
+            'status': 'ready' if ready else 'not_ready',
             'timestamp': int(time.time()),
-            'checks': {
-                'nba_api': 'available'
-            }
-        }), 200
+            'checks': checks,
+            'player_index': player_index,
+            'warm_set': warm_set,
+            'upstream': upstream
+        }), 200 if ready else 503
     except Exception as e:
         return jsonify({
             'status': 'not_ready',
@@ -56,4 +86,24 @@ def liveness_check():
     return jsonify({
         'status': 'alive',
         'timestamp': int(time.time())
-    }), 200
\ No newline at end of file
+    }), 200
+
+@health_bp.route('/upstream', methods=['GET'])
+def upstream_metrics():
+    """
+    Upstream NBA API metrics
+    Reports retry/hedge counters and latency percentiles per endpoint
+    """
+    from app.services.upstream import get_retry_policy
+    
+    return jsonify(get_retry_policy().snapshot()), 200
+
+@health_bp.route('/cache', methods=['GET'])
+def cache_stats():
+    """
+    Cache statistics
+    Reports cache configuration and value compression ratio/CPU time
+    """
+    from app.services.cache_service import CacheService
+    
+    return jsonify(CacheService().get_cache_stats()), 200
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+League-wide API endpoints
+"""
+
+from flask import Blueprint, request, jsonify, current_app
+from app.services.baseline_service import BaselineService
+from app.utils.validation import validate_season
+from app.utils.zone_baselines import expand_zone_baselines
+import logging
+
+logger = logging.getLogger(__name__)
+
+league_bp = Blueprint('league', __name__)
+
+@league_bp.route('/baselines', methods=['GET'])
+def get_league_baselines():
+    """
+    Get league-average attempts and FG% per court zone
+    Query parameters:
+    - season: NBA season (optional, default: 2023-24)
+    - season_type: Regular Season or Playoffs (optional, default: Regular Season)
+    """
+    try:
+        season = request.args.get('season', '2023-24')
+        validation_error = validate_season(season)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season_type = request.args.get('season_type', 'Regular Season')
+        
+        baselines = BaselineService().get_baselines(season, season_type)
+        if baselines is None:
+            return jsonify({
+                'error': {
+                    'code': 'BASELINES_NOT_FOUND',
+                    'message': f'League baselines for {season} {season_type} have not been built'
+                }
+            }), 404
+        
+        return jsonify({
+            'data': expand_zone_baselines(baselines['zones']),
+            'season': season,
+            'season_type': season_type,
+            'shots': baselines['shots'],
+            'last_game_date': baselines.get('last_game_date'),
+            'built_at': baselines.get('built_at')
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Error getting league baselines: {str(e)}")
+        return jsonify({
+            'error': {
+                'code': 'BASELINES_ERROR',
+                'message': 'Failed to get league baselines',
+                'details': str(e) if current_app.debug else None
+            }
+        }), 500
\ No newline at end of file
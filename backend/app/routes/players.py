@@ -3,13 +3,29 @@ Player-related API endpoints
 """
 
 from flask import Blueprint, request, jsonify, current_app
+from pydantic import BaseModel
+from app.models.player import PlayerDetailResponse, PlayerSearchResponse, PlayerStatsResponse
+from app.services.baseline_service import BaselineService
+from app.services.player_index import get_player_index
 from app.services.player_service import PlayerService
-from app.utils.validation import validate_player_search, validate_player_id
+from app.services.client_quota import QuotaExceededError
+from app.services.upstream import UpstreamError, CircuitOpenError, UpstreamRejectedError
+from app.utils.chart_render import MIMETYPES, chart_digest
+from app.utils.shot_encoding import (
+    ARROW_STREAM, MSGPACK, negotiate_encoding, encode_arrow, encode_msgpack
+)
+from app.utils.shot_format import format_shots, encode_cursor
+from app.utils.shot_stats import compute_shot_stats
+from app.utils.zone_baselines import player_zone_overlay
+from app.utils.validation import (
+    validate_player_search, validate_player_id, parse_player_ids, parse_shot_filters, parse_spatial_query,
+    parse_chart_options, parse_output_format, parse_shot_page, validate_season
+)
+import bisect
 import logging
+import math
 import time
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 players_bp = Blueprint('players', __name__)
@@ -17,6 +33,65 @@ players_bp = Blueprint('players', __name__)
 # Initialize player service
 player_service = PlayerService()
 
+# Seconds clients may reuse the unversioned player bundle before revalidating
+BUNDLE_MAX_AGE = 3600
+
+# Seconds clients and proxies may reuse a rendered chart before revalidating
+CHART_MAX_AGE = 1800
+
+def upstream_unavailable_response(error: UpstreamError):
+    """Build a 503 response for upstream failures with no fallback data (429 for exhausted client quotas)"""
+    if isinstance(error, QuotaExceededError):
+        response = jsonify({
+            'error': {
+                'code': 'QUOTA_EXCEEDED',
+                'message': 'Too many uncached requests, please retry later',
+                'details': str(error) if current_app.debug else None
+            }
+        })
+        response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+        return response, 429
+    
+    response = jsonify({
+        'error': {
+            'code': 'UPSTREAM_UNAVAILABLE',
+            'message': 'NBA stats service is temporarily unavailable',
+            'details': str(error) if current_app.debug else None
+        }
+    })
+    if isinstance(error, (CircuitOpenError, UpstreamRejectedError)):
+        response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+    return response, 503
+
+def model_response(model: BaseModel, status: int = 200):
+    """
+    Serialize a response model with the compiled pydantic-core serializer
+    
+    Envelopes are built with model_construct() around models validated when
+    they were cached, so nothing is validated again per request.
+    """
+    return current_app.response_class(model.model_dump_json(), status=status, mimetype='application/json')
+
+def shots_response(payload: dict, encoding: str, shots, positions=None, fields=None, output=None):
+    """
+    Build a shot list response in the negotiated encoding
+    
+    The shots are only formatted here, so Arrow responses never build the
+    per-shot JSON/MessagePack data.
+    """
+    if encoding == ARROW_STREAM:
+        response = current_app.response_class(encode_arrow(shots, positions, fields, payload),
+                                              mimetype=ARROW_STREAM)
+    else:
+        payload = {'data': format_shots(shots, positions=positions, fields=fields, **(output or {})), **payload}
+        if encoding == MSGPACK:
+            response = current_app.response_class(encode_msgpack(payload), mimetype=MSGPACK)
+        else:
+            response = jsonify(payload)
+    
+    response.headers['Vary'] = 'Accept'
+    return response
+
 @players_bp.route('/test', methods=['GET'])
 def test_endpoint():
     """Simple test endpoint to verify the API is working"""
@@ -38,7 +113,7 @@ def search_players():
         query = request.args.get('q', '').strip()
         limit = request.args.get('limit', 10, type=int)
         
-        logger.info(f"Player search request: query='{query}', limit={limit}")
+        logger.info("Player search request: query='%s', limit=%s", query, limit, extra={'event': 'player_search'})
         
         # Validate input
         validation_error = validate_player_search(query, limit)
@@ -49,13 +124,9 @@ def search_players():
         # Search players
         players = player_service.search_players(query, limit)
         
-        logger.info(f"Found {len(players)} players for query '{query}'")
+        logger.info("Found %d players for query '%s'", len(players), query, extra={'event': 'player_search'})
         
-        return jsonify({
-            'data': players,
-            'query': query,
-            'count': len(players)
-        }), 200
+        return model_response(PlayerSearchResponse.model_construct(data=players, query=query, count=len(players)))
         
     except Exception as e:
         logger.error(f"Error searching players: {str(e)}", exc_info=True)
@@ -67,6 +138,94 @@ def search_players():
             }
         }), 500
 
+@players_bp.route('/players/bundle', methods=['GET'])
+@players_bp.route('/players/bundle/<version>', methods=['GET'])
+def get_player_bundle(version=None):
+    """
+    Get the compact, content-hashed player list for client-side search
+    Path parameters:
+    - version: bundle version (optional); versioned URLs are immutable
+    """
+    try:
+        bundle = get_player_index().bundle()
+        
+        if version is not None and version != bundle['version']:
+            return jsonify({
+                'error': {
+                    'code': 'BUNDLE_VERSION_NOT_FOUND',
+                    'message': f'Player bundle version {version} is not available',
+                    'details': {'current_version': bundle['version']}
+                }
+            }), 404
+        
+        if request.if_none_match.contains(bundle['version']):
+            response = current_app.response_class(status=304)
+        elif 'gzip' in request.accept_encodings:
+            response = current_app.response_class(bundle['gzip'], mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = current_app.response_class(bundle['body'], mimetype='application/json')
+        
+        response.set_etag(bundle['version'])
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = (
+            'public, max-age=31536000, immutable' if version else f'public, max-age={BUNDLE_MAX_AGE}'
+        )
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error building player bundle: {str(e)}", exc_info=True)
+        return jsonify({
+            'error': {
+                'code': 'BUNDLE_ERROR',
+                'message': 'Failed to build player bundle',
+                'details': str(e) if current_app.debug else None
+            }
+        }), 500
+
+@players_bp.route('/players/compare', methods=['GET'])
+def compare_players():
+    """
+    Compare players' attempts and FG% per shot zone and distance band
+    Query parameters:
+    - ids: comma-separated player IDs, 2 to 10 (required); differences are relative to the first
+    - season: NBA season (optional, default: current season)
+    - season_type: Regular Season or Playoffs (optional, default: Regular Season)
+    """
+    try:
+        player_ids, validation_error = parse_player_ids(request.args.get('ids', ''))
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season = request.args.get('season', '2023-24')
+        validation_error = validate_season(season)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season_type = request.args.get('season_type', 'Regular Season')
+        
+        comparison = player_service.compare_players(player_ids, season, season_type)
+        
+        return jsonify({
+            'data': comparison,
+            'player_ids': player_ids,
+            'season': season,
+            'season_type': season_type
+        }), 200
+        
+    except UpstreamError as e:
+        logger.warning(f"Upstream unavailable for player comparison {player_ids}: {str(e)}")
+        return upstream_unavailable_response(e)
+    except Exception as e:
+        logger.error(f"Error comparing players: {str(e)}")
+        return jsonify({
+            'error': {
+                'code': 'COMPARISON_ERROR',
+                'message': 'Failed to compare players',
+                'details': str(e) if current_app.debug else None
+            }
+        }), 500
+
 @players_bp.route('/players/<int:player_id>', methods=['GET'])
 def get_player(player_id):
     """
@@ -91,7 +250,7 @@ def get_player(player_id):
                 }
             }), 404
         
-        return jsonify({'data': player}), 200
+        return model_response(PlayerDetailResponse.model_construct(data=player))
         
     except Exception as e:
         logger.error(f"Error getting player {player_id}: {str(e)}")
@@ -112,6 +271,19 @@ def get_player_shots(player_id):
     Query parameters:
     - season: NBA season (optional, default: current season)
     - season_type: Regular Season or Playoffs (optional, default: Regular Season)
+    - shot_made: true or false (optional)
+    - period: comma-separated periods (optional)
+    - shot_zone: comma-separated basic shot zones (optional)
+    - shot_type: comma-separated shot types, 2PT/3PT shorthands allowed (optional)
+    - min_distance, max_distance: shot distance range in feet (optional)
+    - min_clock, max_clock: seconds remaining in the period (optional)
+    - format: records, columnar or binned (optional, default: records)
+    - bin_size: bin side in feet for the binned format (optional, default: 2)
+    - fields: comma-separated shot fields to return, e.g. locationX,locationY,shotMade (optional)
+    - limit: page size for cursor pagination (optional, default: all shots)
+    - cursor: next_cursor of the previous page (optional)
+    - since_version: version of a previous response; only shots added since are returned (optional)
+    Accept: application/json (default), application/msgpack or application/vnd.apache.arrow.stream
     """
     try:
         # Validate input
@@ -119,20 +291,71 @@ def get_player_shots(player_id):
         if validation_error:
             return jsonify({'error': validation_error}), 400
         
+        filters, validation_error = parse_shot_filters(request.args)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        output, validation_error = parse_output_format(request.args)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        page, validation_error = parse_shot_page(request.args)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
         season = request.args.get('season', '2023-24')
+        validation_error = validate_season(season)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
         season_type = request.args.get('season_type', 'Regular Season')
         
-        # Get shot data
-        shots = player_service.get_player_shots(player_id, season, season_type)
+        # Positions into the cached table, filtered server-side from the cached index;
+        # only the requested page and fields are ever built
+        shots, positions = player_service.select_player_shots(player_id, season, season_type, filters)
+        if positions is None:
+            positions = range(len(shots))
         
-        return jsonify({
-            'data': shots,
+        # Delta: rows past the set's size at since_version are new. If the set does
+        # not extend that version (rebuilt or unknown), send it all.
+        since_version = page['since_version']
+        since_rows = shots.rows_at(since_version) if since_version is not None else None
+        delta = since_rows is not None
+        
+        total = len(positions)
+        start = bisect.bisect_left(positions, since_rows) if delta else 0
+        if page['cursor'] is not None:
+            start = max(start, bisect.bisect_right(positions, page['cursor']))
+        end = total if page['limit'] is None else min(start + page['limit'], total)
+        page_positions = positions[start:end]
+        
+        encoding = negotiate_encoding(request.accept_mimetypes,
+                                      allow_arrow=output['output_format'] != 'binned')
+        
+        response = {
+            'format': output['output_format'],
             'player_id': player_id,
             'season': season,
             'season_type': season_type,
-            'count': len(shots)
-        }), 200
+            'count': len(page_positions),
+            'version': shots.version
+        }
+        if filters:
+            response['filters'] = filters
+        if since_version is not None:
+            response['since_version'] = since_version
+            response['delta'] = delta
+        if page['fields']:
+            response['fields'] = page['fields']
+        if page['limit'] is not None or page['cursor'] is not None:
+            response['total'] = total
+            response['next_cursor'] = encode_cursor(positions[end - 1]) if start < end < total else None
+        
+        return shots_response(response, encoding, shots, page_positions, page['fields'], output), 200
         
+    except UpstreamError as e:
+        logger.warning(f"Upstream unavailable for shots of player {player_id}: {str(e)}")
+        return upstream_unavailable_response(e)
     except Exception as e:
         logger.error(f"Error getting shots for player {player_id}: {str(e)}")
         return jsonify({
@@ -143,6 +366,201 @@ def get_player_shots(player_id):
             }
         }), 500
 
+@players_bp.route('/players/<int:player_id>/shots/radius', methods=['GET'])
+def get_player_shots_near(player_id):
+    """
+    Get a player's shots within a radius of a court location
+    Path parameters:
+    - player_id: NBA player ID (required)
+    Query parameters:
+    - x, y: court location in shot coordinates (required)
+    - radius: radius in feet (required)
+    - include_shots: false to return only counts and FG% (optional, default: true)
+    - season, season_type and the /shots filters (optional)
+    """
+    return shot_region_response(player_id, 'radius')
+
+@players_bp.route('/players/<int:player_id>/shots/region', methods=['GET'])
+def get_player_shots_in_region(player_id):
+    """
+    Get a player's shots inside a polygon on the court
+    Path parameters:
+    - player_id: NBA player ID (required)
+    Query parameters:
+    - polygon: comma-separated x,y vertex pairs in shot coordinates (required)
+    - include_shots: false to return only counts and FG% (optional, default: true)
+    - season, season_type and the /shots filters (optional)
+    """
+    return shot_region_response(player_id, 'polygon')
+
+def shot_region_response(player_id: int, region: str):
+    """Run a radius/polygon query and build the stats and shots response"""
+    try:
+        validation_error = validate_player_id(player_id)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        filters, validation_error = parse_shot_filters(request.args)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        spatial, validation_error = parse_spatial_query(request.args, region)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season = request.args.get('season', '2023-24')
+        validation_error = validate_season(season)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season_type = request.args.get('season_type', 'Regular Season')
+        include_shots = request.args.get('include_shots', 'true').lower() not in ('false', '0')
+        
+        shots = player_service.get_filtered_player_shots(
+            player_id, season, season_type, {**filters, **spatial}
+        )
+        
+        data = compute_shot_stats(shots)
+        if include_shots:
+            data['shots'] = shots.to_dicts()
+        
+        response = {
+            'data': data,
+            'player_id': player_id,
+            'season': season,
+            'season_type': season_type,
+            'region': spatial
+        }
+        if filters:
+            response['filters'] = filters
+        
+        return jsonify(response), 200
+        
+    except UpstreamError as e:
+        logger.warning(f"Upstream unavailable for shots of player {player_id}: {str(e)}")
+        return upstream_unavailable_response(e)
+    except Exception as e:
+        logger.error(f"Error querying shot {region} for player {player_id}: {str(e)}")
+        return jsonify({
+            'error': {
+                'code': 'SHOTS_ERROR',
+                'message': 'Failed to get shot chart data',
+                'details': str(e) if current_app.debug else None
+            }
+        }), 500
+
+@players_bp.route('/players/<int:player_id>/chart.<fmt>', methods=['GET'])
+def get_player_chart(player_id, fmt):
+    """
+    Get a server-side rendered shot chart image
+    Path parameters:
+    - player_id: NBA player ID (required)
+    - fmt: png or svg (required)
+    Query parameters:
+    - mode: markers (made/missed) or hexbin (optional, default: markers)
+    - width: image width in pixels, 250, 500, 750, 1000 or 1500 (optional, default: 500)
+    - season, season_type and the /shots filters (optional)
+    """
+    try:
+        validation_error = validate_player_id(player_id)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        options, validation_error = parse_chart_options(request.args, fmt)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        filters, validation_error = parse_shot_filters(request.args)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season = request.args.get('season', '2023-24')
+        validation_error = validate_season(season)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season_type = request.args.get('season_type', 'Regular Season')
+        
+        shots = player_service.get_filtered_player_shots(player_id, season, season_type, filters)
+        
+        # The ETag is the content hash, so unchanged charts are answered without rendering
+        digest = chart_digest(shots, **options)
+        if request.if_none_match.contains(digest):
+            response = current_app.response_class(status=304)
+        else:
+            image = player_service.render_shot_chart(shots, digest, **options)
+            response = current_app.response_class(image, mimetype=MIMETYPES[fmt])
+        
+        response.set_etag(digest)
+        response.headers['Cache-Control'] = f'public, max-age={CHART_MAX_AGE}'
+        return response
+        
+    except UpstreamError as e:
+        logger.warning(f"Upstream unavailable for shots of player {player_id}: {str(e)}")
+        return upstream_unavailable_response(e)
+    except Exception as e:
+        logger.error(f"Error rendering chart for player {player_id}: {str(e)}")
+        return jsonify({
+            'error': {
+                'code': 'CHART_ERROR',
+                'message': 'Failed to render shot chart',
+                'details': str(e) if current_app.debug else None
+            }
+        }), 500
+
+@players_bp.route('/players/<int:player_id>/zones', methods=['GET'])
+def get_player_zones(player_id):
+    """
+    Compare a player's FG% per basic shot zone with the league average
+    Path parameters:
+    - player_id: NBA player ID (required)
+    Query parameters:
+    - season: NBA season (optional, default: current season)
+    - season_type: Regular Season or Playoffs (optional, default: Regular Season)
+    """
+    try:
+        validation_error = validate_player_id(player_id)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season = request.args.get('season', '2023-24')
+        validation_error = validate_season(season)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season_type = request.args.get('season_type', 'Regular Season')
+        
+        baselines = BaselineService().get_baselines(season, season_type)
+        if baselines is None:
+            return jsonify({
+                'error': {
+                    'code': 'BASELINES_NOT_FOUND',
+                    'message': f'League baselines for {season} {season_type} have not been built'
+                }
+            }), 404
+        
+        shots = player_service.get_player_shots(player_id, season, season_type)
+        
+        return jsonify({
+            'data': player_zone_overlay(shots, baselines['zones']),
+            'player_id': player_id,
+            'season': season,
+            'season_type': season_type
+        }), 200
+        
+    except UpstreamError as e:
+        logger.warning(f"Upstream unavailable for shots of player {player_id}: {str(e)}")
+        return upstream_unavailable_response(e)
+    except Exception as e:
+        logger.error(f"Error getting zones for player {player_id}: {str(e)}")
+        return jsonify({
+            'error': {
+                'code': 'ZONES_ERROR',
+                'message': 'Failed to compare player zones with league average',
+                'details': str(e) if current_app.debug else None
+            }
+        }), 500
+
 @players_bp.route('/players/<int:player_id>/stats', methods=['GET'])
 def get_player_stats(player_id):
     """
@@ -159,16 +577,18 @@ def get_player_stats(player_id):
             return jsonify({'error': validation_error}), 400
         
         season = request.args.get('season', '2023-24')
+        validation_error = validate_season(season)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
         
         # Get player stats
         stats = player_service.get_player_stats(player_id, season)
         
-        return jsonify({
-            'data': stats,
-            'player_id': player_id,
-            'season': season
-        }), 200
+        return model_response(PlayerStatsResponse.model_construct(data=stats, player_id=player_id, season=season))
         
+    except UpstreamError as e:
+        logger.warning(f"Upstream unavailable for stats of player {player_id}: {str(e)}")
+        return upstream_unavailable_response(e)
     except Exception as e:
         logger.error(f"Error getting stats for player {player_id}: {str(e)}")
         return jsonify({
@@ -0,0 +1,76 @@
+"""
+Team-related API endpoints
+"""
+
+from flask import Blueprint, request, jsonify, current_app
+from app.services.team_service import TeamService
+from app.services.upstream import UpstreamError
+from app.utils.shot_encoding import negotiate_encoding
+from app.utils.validation import validate_team_id, validate_season, parse_output_format
+from app.routes.players import shots_response, upstream_unavailable_response
+import logging
+
+logger = logging.getLogger(__name__)
+
+teams_bp = Blueprint('teams', __name__)
+
+@teams_bp.route('/teams/<int:team_id>/shots', methods=['GET'])
+def get_team_shots(team_id):
+    """
+    Get shot chart data for every player of a team
+    Path parameters:
+    - team_id: NBA team ID (required)
+    Query parameters:
+    - season: NBA season (optional, default: 2023-24)
+    - season_type: Regular Season or Playoffs (optional, default: Regular Season)
+    - format: records, columnar or binned (optional, default: records)
+    - bin_size: bin side in feet for the binned format (optional, default: 2)
+    Accept: application/json (default), application/msgpack or application/vnd.apache.arrow.stream
+    """
+    try:
+        validation_error = validate_team_id(team_id)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        output, validation_error = parse_output_format(request.args)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season = request.args.get('season', '2023-24')
+        validation_error = validate_season(season)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
+        
+        season_type = request.args.get('season_type', 'Regular Season')
+        
+        team_shots = TeamService().get_team_shots(team_id, season, season_type)
+        shots = team_shots['shots']
+        
+        encoding = negotiate_encoding(request.accept_mimetypes,
+                                      allow_arrow=output['output_format'] != 'binned')
+        
+        response = {
+            'format': output['output_format'],
+            'team_id': team_id,
+            'season': season,
+            'season_type': season_type,
+            'count': len(shots),
+            'source': team_shots['source']
+        }
+        if team_shots['player_ids']:
+            response['player_ids'] = team_shots['player_ids']
+        
+        return shots_response(response, encoding, shots, output=output), 200
+        
+    except UpstreamError as e:
+        logger.warning(f"Upstream unavailable for shots of team {team_id}: {str(e)}")
+        return upstream_unavailable_response(e)
+    except Exception as e:
+        logger.error(f"Error getting shots for team {team_id}: {str(e)}")
+        return jsonify({
+            'error': {
+                'code': 'TEAM_SHOTS_ERROR',
+                'message': 'Failed to get team shot chart data',
+                'details': str(e) if current_app.debug else None
+            }
+        }), 500
\ No newline at end of file
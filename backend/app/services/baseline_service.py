@@ -0,0 +1,166 @@
+"""
+League zone baselines built from bulk shot data
+
+Next to the baselines, the store keeps their coverage: the highest event
+id counted per game and player. Shot events of a player in a game arrive
+in increasing id order, so merges skip every row at or below it and the
+same shots are never counted twice, whichever player shards exist.
+"""
+
+from typing import Any, Dict, Optional
+from flask import current_app
+from datetime import datetime
+import logging
+import time
+
+from app.services.cache_service import CacheService
+from app.services.nba_api_service import NBAApiService
+from app.services.shot_store import ShotStore
+from app.utils.zone_baselines import compute_zone_baselines, merge_zone_baselines
+
+logger = logging.getLogger(__name__)
+
+
+class BaselineService:
+    """Service building, storing and looking up league-average zone baselines"""
+
+    def __init__(self, shot_store: Optional[ShotStore] = None):
+        """
+        Initialize the baseline service
+
+        Args:
+            shot_store: Store holding the baselines (defaults to the configured store)
+        """
+        self.shot_store = shot_store or ShotStore()
+        self.cache_service = CacheService()
+
+    def build_baselines(self, season: str, season_type: str = 'Regular Season') -> Dict[str, Any]:
+        """
+        Build baselines of a season/season type from one league-wide call
+
+        Args:
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+
+        Returns:
+            Stored baselines
+
+        Raises:
+            UpstreamError: If the bulk upstream request failed
+        """
+        started = time.monotonic()
+        shot_data = NBAApiService().get_league_shot_data(
+            season,
+            season_type,
+            timeout=current_app.config['NBA_API_BULK_TIMEOUT']
+        )
+
+        baselines = self.save_baselines(season, season_type, shot_data)
+        logger.info(f"Built {season} {season_type} zone baselines from {baselines['shots']} shots "
+                    f"in {time.monotonic() - started:.1f}s")
+        return baselines
+
+    def save_baselines(self, season: str, season_type: str, shot_data) -> Dict[str, Any]:
+        """
+        Compute and store baselines from an already fetched league frame
+
+        Args:
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            shot_data: League-wide ShotChartDetail data frame
+
+        Returns:
+            Stored baselines
+        """
+        baselines = {
+            'season': season,
+            'season_type': season_type,
+            'shots': len(shot_data),
+            'last_game_date': str(shot_data['GAME_DATE'].max()) if not shot_data.empty else None,
+            'built_at': datetime.utcnow().isoformat(),
+            'zones': compute_zone_baselines(shot_data)
+        }
+        with self.shot_store.lock(season, season_type, 'baselines'):
+            self.shot_store.save_baseline_coverage(season, season_type, self._coverage(shot_data, {}))
+            self._store(baselines)
+        return baselines
+
+    def merge_new_shots(self, season: str, season_type: str, new_shot_data) -> Optional[Dict[str, Any]]:
+        """
+        Add newly synced shots to stored baselines
+
+        Args:
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            new_shot_data: Fetched ShotChartDetail rows; rows already counted are skipped
+
+        Returns:
+            Updated baselines, or None if none were built for the season
+        """
+        if new_shot_data.empty:
+            return self.shot_store.load_baselines(season, season_type)
+
+        with self.shot_store.lock(season, season_type, 'baselines'):
+            baselines = self.shot_store.load_baselines(season, season_type)
+            if baselines is None:
+                return None
+
+            coverage = self.shot_store.load_baseline_coverage(season, season_type)
+            if coverage is None:
+                # Baselines built before coverage was kept count every game up to their last date
+                last_game_date = baselines.get('last_game_date') or ''
+                new_shot_data = new_shot_data[new_shot_data['GAME_DATE'].astype(str) > last_game_date]
+                coverage = {}
+            else:
+                new_shot_data = new_shot_data[[
+                    int(event_id) > coverage.get(str(int(game_id)), {}).get(str(int(player_id)), -1)
+                    for game_id, player_id, event_id in zip(new_shot_data['GAME_ID'], new_shot_data['PLAYER_ID'],
+                                                             new_shot_data['GAME_EVENT_ID'])
+                ]]
+            if new_shot_data.empty:
+                return baselines
+
+            baselines['zones'] = merge_zone_baselines(baselines['zones'], compute_zone_baselines(new_shot_data))
+            baselines['shots'] += len(new_shot_data)
+            baselines['last_game_date'] = max(
+                filter(None, [baselines.get('last_game_date'), str(new_shot_data['GAME_DATE'].max())])
+            )
+            baselines['built_at'] = datetime.utcnow().isoformat()
+            # Coverage first: a failure in between can only undercount, never double count
+            self.shot_store.save_baseline_coverage(season, season_type, self._coverage(new_shot_data, coverage))
+            self._store(baselines)
+        return baselines
+
+    def get_baselines(self, season: str, season_type: str = 'Regular Season') -> Optional[Dict[str, Any]]:
+        """
+        Look up the baselines of a season/season type
+
+        Returns:
+            Baselines from the cache or shot store, or None if never built
+        """
+        cached = self.cache_service.get_cached_response('league_baselines', season, season_type)
+        if cached is not None:
+            return cached
+
+        baselines = self.shot_store.load_baselines(season, season_type)
+        if baselines is not None:
+            self.cache_service.set_cached_response('league_baselines', baselines, season, season_type)
+        return baselines
+
+    @staticmethod
+    def _coverage(shot_data, coverage: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+        """Raise coverage to the highest event id per game and player in shot_data"""
+        if shot_data.empty:
+            return coverage
+
+        highest = shot_data.groupby([shot_data['GAME_ID'].astype(int), 'PLAYER_ID'])['GAME_EVENT_ID'].max()
+        for (game_id, player_id), event_id in highest.items():
+            players = coverage.setdefault(str(int(game_id)), {})
+            players[str(int(player_id))] = max(players.get(str(int(player_id)), -1), int(event_id))
+        return coverage
+
+    def _store(self, baselines: Dict[str, Any]):
+        """Write baselines to the shot store and refresh the cached copy"""
+        season, season_type = baselines['season'], baselines['season_type']
+        self.shot_store.save_baselines(season, season_type, baselines)
+        self.cache_service.set_cached_response('league_baselines', baselines, season, season_type)
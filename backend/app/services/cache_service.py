@@ -7,8 +7,14 @@ from flask import current_app
 import logging
 import json
 import hashlib
+import threading
+import time
+from collections import Counter
 from datetime import datetime, timedelta
 
+from app.models.player import validate_player, validate_players, validate_shot_table, validate_stats
+from app.models.shot_table import ShotTable
+
 logger = logging.getLogger(__name__)
 
 class CacheService:
@@ -18,12 +24,34 @@ class CacheService:
     CACHE_TIMEOUTS = {
         'player_search': 3600,      # 1 hour
         'player_info': 3600,        # 1 hour
-        'player_shots': 1800,       # 30 minutes
+        'player_shots': 1800,       # 30 minutes fresh, then kept as last known good value
         'player_stats': 1800,       # 30 minutes
+        'team_shots': 1800,         # 30 minutes, rewritten on every sync of an ingested season
+        'roster': 21600,            # 6 hours
         'seasons': 86400,           # 24 hours
+        'league_baselines': 86400,  # 24 hours, rewritten on every ingest/sync
+        'rendered_chart': 86400,    # 24 hours, keyed by content hash so never stale
+        'negative': 120,            # 2 minutes for genuine "no data" answers
+        'last_known_good': 86400,   # 24 hours fallback copy served while upstream is down
         'default': 900              # 15 minutes
     }
     
+    # Response model validation run when entries of these types are cached
+    VALIDATORS = {
+        'player_search': validate_players,
+        'player_info': validate_player,
+        'player_stats': validate_stats,
+        'player_shots': validate_shot_table,
+        'team_shots': lambda entry: {**entry, 'shots': validate_shot_table(entry['shots'])}
+    }
+    
+    # Hits per cache key, used to pick hot entries for snapshots; once more
+    # than MAX_TRACKED_KEYS keys are counted, the colder half is dropped and
+    # the remaining counts are halved so old popularity fades
+    MAX_TRACKED_KEYS = 10000
+    _hits = Counter()
+    _hits_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize the cache service"""
         self.cache_prefix = "nba_shotchart:"
@@ -75,19 +103,41 @@ class CacheService:
         cache_key = self._get_cache_key(key_type, *args, **kwargs)
         
         try:
-            cached_data = current_app.cache.get(cache_key)
+            cached_data = self._decompress(current_app.cache.get(cache_key))
             
             if cached_data is not None:
-                logger.info(f"Cache hit for key: {cache_key}")
+                self._count_hit(cache_key)
+                logger.info("Cache hit for key: %s", cache_key, extra={'event': 'cache_hit'})
                 return cached_data
             else:
-                logger.debug(f"Cache miss for key: {cache_key}")
+                logger.debug("Cache miss for key: %s", cache_key, extra={'event': 'cache_miss'})
                 return None
                 
         except Exception as e:
             logger.error(f"Error retrieving from cache: {str(e)}")
             return None
     
+    def has_cached_response(self, key_type: str, *args, **kwargs) -> bool:
+        """
+        Check whether data is cached without reading or counting it as a hit
+        
+        Args:
+            key_type: Type of cache key
+            *args: Positional arguments for the key
+            **kwargs: Keyword arguments for the key
+            
+        Returns:
+            True if an unexpired entry exists
+        """
+        if not hasattr(current_app, 'cache'):
+            return False
+        
+        try:
+            return bool(current_app.cache.has(self._get_cache_key(key_type, *args, **kwargs)))
+        except Exception as e:
+            logger.error(f"Error checking cache: {str(e)}")
+            return False
+    
     def set_cached_response(self, key_type: str, data: Any, *args, **kwargs) -> bool:
         """
         Store data in cache with appropriate TTL
@@ -101,22 +151,185 @@ class CacheService:
         Returns:
             True if successfully cached, False otherwise
         """
+        timeout = self.CACHE_TIMEOUTS.get(key_type, self.CACHE_TIMEOUTS['default'])
+        return self._store(key_type, data, timeout, *args, **kwargs)
+    
+    def set_negative_response(self, key_type: str, data: Any, *args, **kwargs) -> bool:
+        """
+        Store a genuine empty upstream answer with a short TTL
+        
+        Args:
+            key_type: Type of cache key
+            data: Empty result to cache (e.g. [] or zeroed stats)
+            *args: Positional arguments for the key
+            **kwargs: Keyword arguments for the key
+            
+        Returns:
+            True if successfully cached, False otherwise
+        """
+        return self._store(key_type, data, self.CACHE_TIMEOUTS['negative'], *args, **kwargs)
+    
+    def set_last_known_good(self, key_type: str, data: Any, *args, **kwargs) -> bool:
+        """
+        Store a long-lived fallback copy of a successful upstream result
+        
+        Args:
+            key_type: Type of cache key the data belongs to
+            data: Data to keep as last known good value
+            *args: Positional arguments for the key
+            **kwargs: Keyword arguments for the key
+            
+        Returns:
+            True if successfully cached, False otherwise
+        """
+        return self.set_cached_response('last_known_good', data, key_type, *args, **kwargs)
+    
+    def get_last_known_good(self, key_type: str, *args, **kwargs) -> Optional[Any]:
+        """
+        Retrieve the last known good value for a key
+        
+        Args:
+            key_type: Type of cache key the data belongs to
+            *args: Positional arguments for the key
+            **kwargs: Keyword arguments for the key
+            
+        Returns:
+            Last known good data or None if not available
+        """
+        # Player shots are their own last known good value, see set_player_shots
+        if key_type == 'player_shots':
+            return self.get_player_shots(*args, stale=True, **kwargs)
+        return self.get_cached_response('last_known_good', key_type, *args, **kwargs)
+    
+    def set_player_shots(self, shots: ShotTable, player_id: int, season: str, season_type: str) -> bool:
+        """
+        Cache a player's shots
+        
+        Shot tables are large, so a single entry serves both purposes: it is
+        fresh for the player_shots TTL and then kept until the last_known_good
+        TTL as fallback, instead of storing a second copy. Empty results are
+        cached with the short negative TTL only.
+        
+        Args:
+            shots: Shot table
+            player_id: NBA player ID
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            
+        Returns:
+            True if successfully cached, False otherwise
+        """
+        if not hasattr(current_app, 'cache'):
+            logger.warning("Cache not available")
+            return False
+        
+        if shots:
+            fresh_for, timeout = self.CACHE_TIMEOUTS['player_shots'], self.CACHE_TIMEOUTS['last_known_good']
+        else:
+            fresh_for = timeout = self.CACHE_TIMEOUTS['negative']
+        
+        try:
+            entry = {'shots': validate_shot_table(shots), 'fresh_until': time.time() + fresh_for}
+        except Exception as e:
+            logger.error(f"Error storing in cache: {str(e)}")
+            return False
+        
+        return self._put(self._get_cache_key('player_shots', player_id, season, season_type), entry, timeout)
+    
+    def get_player_shots(self, player_id: int, season: str, season_type: str,
+                         stale: bool = False) -> Optional[ShotTable]:
+        """
+        Retrieve a player's cached shots
+        
+        Args:
+            player_id: NBA player ID
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            stale: Also return shots past their fresh TTL (last known good value)
+            
+        Returns:
+            Shot table or None if not cached (or no longer fresh)
+        """
+        entry = self.get_cached_response('player_shots', player_id, season, season_type)
+        # Bare tables restored from snapshots written before entries carried a fresh time
+        if not isinstance(entry, dict) or (not stale and entry['fresh_until'] <= time.time()):
+            return None
+        return entry['shots']
+    
+    def validate(self, key_type: str, data: Any) -> Any:
+        """
+        Validate data against the response model of its cache entry type
+        
+        Services cache and return the validated value, so hits are served
+        without validating again. Validated values pass through unchanged.
+        
+        Args:
+            key_type: Type of cache key
+            data: Data to validate
+            
+        Returns:
+            Validated data (models for players and stats, a validated ShotTable
+            for shots), or the data itself for types without a response model
+            
+        Raises:
+            ValidationError: If a single player or stats entry is invalid
+        """
+        validator = self.VALIDATORS.get(key_type)
+        return data if validator is None or data is None else validator(data)
+    
+    def _store(self, key_type: str, data: Any, timeout: int, *args, **kwargs) -> bool:
+        """Store data in cache under the generated key with an explicit TTL"""
         if not hasattr(current_app, 'cache'):
             logger.warning("Cache not available")
             return False
         
         cache_key = self._get_cache_key(key_type, *args, **kwargs)
-        timeout = self.CACHE_TIMEOUTS.get(key_type, self.CACHE_TIMEOUTS['default'])
         
         try:
-            current_app.cache.set(cache_key, data, timeout=timeout)
-            logger.info(f"Cached data for key: {cache_key} (TTL: {timeout}s)")
+            # Last known good values are keyed by the type of the data they hold
+            data = self.validate(args[0] if key_type == 'last_known_good' else key_type, data)
+        except Exception as e:
+            logger.error(f"Error storing in cache: {str(e)}")
+            return False
+        
+        return self._put(cache_key, data, timeout)
+    
+    def _put(self, cache_key: str, data: Any, timeout: int) -> bool:
+        """Store already validated data under a cache key with an explicit TTL"""
+        try:
+            current_app.cache.set(cache_key, self._compress(data), timeout=timeout)
+            logger.info("Cached data for key: %s (TTL: %ss)", cache_key, timeout, extra={'event': 'cache_store'})
             return True
             
         except Exception as e:
             logger.error(f"Error storing in cache: {str(e)}")
             return False
     
+    @classmethod
+    def _count_hit(cls, cache_key: str):
+        """Count a hit, decaying the counters when too many keys are tracked"""
+        with cls._hits_lock:
+            cls._hits[cache_key] += 1
+            if len(cls._hits) > cls.MAX_TRACKED_KEYS:
+                hottest = cls._hits.most_common(cls.MAX_TRACKED_KEYS // 2)
+                cls._hits = Counter({key: (count + 1) // 2 for key, count in hottest})
+    
+    @classmethod
+    def hit_counts(cls) -> Dict[str, int]:
+        """Get a copy of the per-key hit counters"""
+        with cls._hits_lock:
+            return dict(cls._hits)
+    
+    def _compress(self, data: Any) -> Any:
+        """Compress a value above the size threshold if compression is configured"""
+        compressor = getattr(current_app, 'cache_compressor', None)
+        return compressor.compress(data) if compressor else data
+    
+    def _decompress(self, data: Any) -> Any:
+        """Restore a value that may have been stored compressed"""
+        compressor = getattr(current_app, 'cache_compressor', None)
+        return compressor.decompress(data) if compressor else data
+    
     def invalidate_cache(self, pattern: str) -> int:
         """
         Invalidate cache entries matching a pattern
@@ -197,6 +410,14 @@ class CacheService:
             ]
         }
         
+        compressor = getattr(current_app, 'cache_compressor', None)
+        if compressor:
+            stats['compression'] = compressor.stats()
+        
+        snapshotter = getattr(current_app, 'cache_snapshotter', None)
+        if snapshotter:
+            stats['snapshot'] = snapshotter.stats()
+        
         return stats
     
     def warm_cache(self, player_ids: List[int], seasons: List[str]) -> Dict[str, int]:
@@ -234,7 +455,7 @@ class CacheService:
                         try:
                             shots = nba_service.get_shot_chart_data(player_id, season)
                             if shots:
-                                self.set_cached_response('player_shots', shots, player_id, season, 'Regular Season')
+                                self.set_player_shots(shots, player_id, season, 'Regular Season')
                                 stats['shots_warmed'] += 1
                             
                             stats_data = nba_service.get_player_stats(player_id, season)
@@ -0,0 +1,209 @@
+"""
+Cache persistence across restarts
+
+Hot SimpleCache entries are written, still serialized and with their
+absolute expiry, to a single snapshot file on graceful shutdown and on a
+schedule. When a process starts serving, the file is memory-mapped and
+entries that have not expired are put back without unpickling them, so new
+workers come up warm. Like the warm-up, this is started by the first
+request, so CLI commands (ingest, sync) never overwrite the server's
+snapshot.
+"""
+
+from typing import Any, Dict, Optional
+from datetime import datetime
+import atexit
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b'NBACS1'
+
+
+class CacheSnapshotter:
+    """Snapshots and restores the entries of an in-memory cache backend"""
+
+    def __init__(self, app, path: str, max_entries: int = 2000, min_ttl: int = 60, interval: int = 300):
+        """
+        Initialize the snapshotter
+
+        Args:
+            app: Flask application owning the cache
+            path: Snapshot file path
+            max_entries: Maximum number of (hottest) entries to keep
+            min_ttl: Entries with less remaining TTL (seconds) are not kept
+            interval: Seconds between scheduled snapshots (0 snapshots on shutdown only)
+        """
+        self.app = app
+        self.path = path
+        self.max_entries = max_entries
+        self.min_ttl = min_ttl
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._started = False
+        self._timer: Optional[threading.Thread] = None
+        self.last_snapshot: Dict[str, Any] = {}
+        self.last_restore: Dict[str, Any] = {}
+
+    def _entries(self) -> Optional[Dict[str, Any]]:
+        """The backend's raw entry dict, or None if the backend has no local entries"""
+        backend = getattr(self.app.cache, 'cache', None)
+        entries = getattr(backend, '_cache', None)
+        return entries if isinstance(entries, dict) else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Write the hottest unexpired entries to the snapshot file
+
+        Returns:
+            Snapshot summary with entry count and size
+        """
+        from app.services.cache_service import CacheService
+
+        entries = self._entries()
+        if entries is None:
+            logger.warning("Cache backend does not support snapshots")
+            return {}
+
+        with self._lock:
+            started = time.monotonic()
+            now = time.time()
+            hits = CacheService.hit_counts()
+
+            candidates = []
+            for key, (expires, value) in list(entries.items()):
+                if expires != 0 and expires - now < self.min_ttl:
+                    continue
+                candidates.append((hits.get(key, 0), key, expires, value))
+
+            candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+            candidates = candidates[:self.max_entries]
+
+            index = []
+            offset = 0
+            for _, key, expires, value in candidates:
+                index.append([key, expires, offset, len(value)])
+                offset += len(value)
+
+            header = json.dumps(index).encode()
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(_MAGIC)
+                f.write(struct.pack('<I', len(header)))
+                f.write(header)
+                for _, _, _, value in candidates:
+                    f.write(value)
+            os.replace(tmp_path, self.path)
+
+            self.last_snapshot = {
+                'timestamp': datetime.utcnow().isoformat(),
+                'entries': len(candidates),
+                'bytes': offset,
+                'duration_ms': round((time.monotonic() - started) * 1000, 1)
+            }
+
+        logger.info(f"Cache snapshot written: {self.last_snapshot}")
+        return self.last_snapshot
+
+    def restore(self) -> Dict[str, Any]:
+        """
+        Load unexpired entries from the snapshot file into the cache
+
+        Returns:
+            Restore summary with loaded and expired entry counts
+        """
+        entries = self._entries()
+        if entries is None or not os.path.exists(self.path):
+            return {}
+
+        started = time.monotonic()
+        try:
+            with open(self.path, 'rb') as f:
+                snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not open cache snapshot {self.path}: {str(e)}")
+            return {}
+
+        view = memoryview(snapshot)
+        if bytes(view[:len(_MAGIC)]) != _MAGIC:
+            logger.error(f"Ignoring invalid cache snapshot {self.path}")
+            return {}
+
+        header_start = len(_MAGIC) + 4
+        header_length = struct.unpack('<I', view[len(_MAGIC):header_start])[0]
+        index = json.loads(bytes(view[header_start:header_start + header_length]))
+        data_start = header_start + header_length
+
+        now = time.time()
+        loaded = 0
+        expired = 0
+        for key, expires, offset, length in index:
+            if expires != 0 and expires <= now:
+                expired += 1
+                continue
+            if key in entries:
+                continue
+            # Values stay backed by the mapped file until overwritten
+            start = data_start + offset
+            entries[key] = (expires, view[start:start + length])
+            loaded += 1
+
+        self._mmap = snapshot
+        self.last_restore = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'entries': loaded,
+            'expired': expired,
+            'duration_ms': round((time.monotonic() - started) * 1000, 1)
+        }
+        logger.info(f"Cache snapshot restored: {self.last_restore}")
+        return self.last_restore
+
+    def ensure_started(self):
+        """
+        Restore the snapshot, then snapshot on shutdown and periodically
+
+        Registered as a before_request hook; only the first call does anything.
+        """
+        if self._started:
+            return
+
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        self.restore()
+        atexit.register(self._safe_snapshot)
+
+        if self.interval > 0:
+            def run():
+                while True:
+                    time.sleep(self.interval)
+                    self._safe_snapshot()
+
+            self._timer = threading.Thread(target=run, name='cache-snapshot', daemon=True)
+            self._timer.start()
+
+    def _safe_snapshot(self):
+        """Snapshot without letting errors escape a timer or exit handler"""
+        try:
+            self.snapshot()
+        except Exception as e:
+            logger.error(f"Cache snapshot failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the last snapshot and restore summaries"""
+        return {
+            'path': self.path,
+            'last_snapshot': self.last_snapshot,
+            'last_restore': self.last_restore
+        }
@@ -0,0 +1,147 @@
+"""
+Per-client quotas on upstream calls
+
+Calls are charged before they queue for an upstream slot, so an
+over-quota client is turned away without delaying anyone else; calls the
+circuit breaker or scheduler then reject are refunded, and cache hits are
+never counted. Counters live in the cache backend (CACHE_TYPE), which
+makes them shared across workers whenever the backend is (RedisCache
+increments atomically). With SimpleCache each worker counts on its own,
+so a client may make up to limit calls per worker.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+from flask import current_app, has_request_context, request
+import hashlib
+import logging
+import threading
+import time
+
+from app.services.upstream import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaExceededError(UpstreamError):
+    """Raised without calling upstream when a client used up its upstream quota"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ClientQuota:
+    """Fixed-window count of upstream calls per client (issued API key or IP address)"""
+
+    KEY_PREFIX = 'nba_shotchart:quota:'
+
+    def __init__(self, limit: int = 60, window: int = 60, key_header: str = 'X-API-Key',
+                 api_keys: Optional[Iterable[str]] = None):
+        """
+        Initialize the quota
+
+        Args:
+            limit: Upstream calls a client may cause per window (0 disables quotas)
+            window: Window length in seconds
+            key_header: Request header carrying a client's API key
+            api_keys: Issued API keys; other key header values are ignored
+        """
+        self.limit = limit
+        self.window = window
+        self.key_header = key_header
+        # Only digests are kept, so issued keys never end up in logs or cache keys
+        self._issued = {self._digest(api_key) for api_key in (api_keys or []) if api_key}
+        # SimpleCache.inc() is a get and a set, so threads of a worker take turns
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ClientQuota':
+        """Build a quota from Flask application config"""
+        return cls(
+            limit=config.get('CLIENT_QUOTA', 60),
+            window=config.get('CLIENT_QUOTA_WINDOW', 60),
+            key_header=config.get('CLIENT_QUOTA_KEY_HEADER', 'X-API-Key'),
+            api_keys=config.get('CLIENT_API_KEYS', [])
+        )
+
+    @staticmethod
+    def _digest(api_key: str) -> str:
+        """Short digest identifying an API key"""
+        return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+    def client_id(self) -> str:
+        """
+        Identify the client of the current request by API key, else by IP address
+
+        Unknown keys are treated like no key, so rotating made-up keys does
+        not give a client fresh buckets.
+        """
+        api_key = request.headers.get(self.key_header)
+        if api_key:
+            digest = self._digest(api_key)
+            if digest in self._issued:
+                return f'key:{digest}'
+        return f'ip:{request.remote_addr}'
+
+    def charge(self) -> Optional[str]:
+        """
+        Count one upstream call against the client of the current request
+
+        Returns:
+            Counter key to pass to refund(), or None if nothing was counted
+
+        Raises:
+            QuotaExceededError: If the client is over its quota for the current window
+        """
+        if not self.limit:
+            return None
+
+        now = time.time()
+        window_start = int(now // self.window * self.window)
+        client = self.client_id()
+        key = f'{self.KEY_PREFIX}{client}:{window_start}'
+
+        backend = current_app.cache.cache
+        try:
+            with self._lock:
+                # add() only sets the expiry of a new window's counter
+                backend.add(key, 0, timeout=self.window * 2)
+                count = backend.inc(key)
+        except Exception as e:
+            logger.error(f"Error counting upstream quota of {client}: {str(e)}")
+            return None
+
+        # Counting is best effort; a backend error lets the call through
+        if count is not None and count > self.limit:
+            raise QuotaExceededError(
+                f"Client {client} exceeded {self.limit} upstream calls per {self.window}s",
+                window_start + self.window - now
+            )
+        return key
+
+    def refund(self, key: str):
+        """Take back a charge whose call never reached upstream"""
+        backend = current_app.cache.cache
+        try:
+            with self._lock:
+                backend.dec(key)
+        except Exception as e:
+            logger.error(f"Error refunding upstream quota ({key}): {str(e)}")
+
+
+def charge_client_quota() -> Optional[str]:
+    """
+    Count an upstream call against the current request's client, if quotas are configured
+
+    Returns:
+        Counter key for refund_client_quota(), or None if nothing was counted
+    """
+    if has_request_context() and hasattr(current_app, 'client_quota'):
+        return current_app.client_quota.charge()
+    return None
+
+
+def refund_client_quota(key: Optional[str]):
+    """Refund a charge made by charge_client_quota()"""
+    if key is not None:
+        current_app.client_quota.refund(key)
@@ -0,0 +1,90 @@
+"""
+Bulk ingestion of league-wide shot data into the local shot store
+"""
+
+from typing import Any, Dict, List, Optional
+from flask import current_app
+from datetime import datetime
+import logging
+import time
+
+from app.models.shot_table import ShotTable
+from app.services.baseline_service import BaselineService
+from app.services.nba_api_service import NBAApiService
+from app.services.shot_store import ShotStore
+from app.utils.shot_stats import compute_shot_stats
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionService:
+    """Service pulling whole seasons in one upstream call and sharding them by player"""
+
+    def __init__(self, shot_store: Optional[ShotStore] = None):
+        """
+        Initialize the ingestion service
+
+        Args:
+            shot_store: Store to write into (defaults to the configured store)
+        """
+        self.shot_store = shot_store or ShotStore()
+        self.nba_service = NBAApiService()
+
+    def ingest_season(self, season: str, season_type: str = 'Regular Season') -> Dict[str, Any]:
+        """
+        Ingest every shot of a season/season type
+
+        Args:
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+
+        Returns:
+            Ingestion manifest with player and shot counts
+
+        Raises:
+            UpstreamError: If the bulk upstream request failed
+        """
+        started = time.monotonic()
+        shot_data = self.nba_service.get_league_shot_data(
+            season,
+            season_type,
+            timeout=current_app.config['NBA_API_BULK_TIMEOUT']
+        )
+
+        player_ids: List[int] = []
+        total_shots = 0
+
+        for player_id, player_data in shot_data.groupby('PLAYER_ID', sort=False):
+            shots = ShotTable.from_frame(player_data)
+            meta = {'last_game_date': str(player_data['GAME_DATE'].max()), 'total_distance': sum(shots.distance)}
+
+            with self.shot_store.lock(season, season_type, f'player_{int(player_id)}'):
+                self.shot_store.save_player(int(player_id), season, season_type, shots,
+                                            compute_shot_stats(shots), meta)
+            player_ids.append(int(player_id))
+            total_shots += len(shots)
+
+        team_ids: List[int] = []
+        for team_id, team_data in shot_data.groupby('TEAM_ID', sort=False):
+            with self.shot_store.lock(season, season_type, f'team_{int(team_id)}'):
+                self.shot_store.save_team_shots(int(team_id), season, season_type, ShotTable.from_frame(team_data))
+            team_ids.append(int(team_id))
+
+        manifest = {
+            'season': season,
+            'season_type': season_type,
+            'player_count': len(player_ids),
+            'player_ids': player_ids,
+            'team_ids': team_ids,
+            'shots': total_shots,
+            'last_game_date': str(shot_data['GAME_DATE'].max()) if not shot_data.empty else None,
+            'ingested_at': datetime.utcnow().isoformat(),
+            'duration_seconds': round(time.monotonic() - started, 2)
+        }
+        self.shot_store.save_manifest(season, season_type, manifest)
+
+        # League zone baselines come from the same frame, no extra upstream call
+        BaselineService(self.shot_store).save_baselines(season, season_type, shot_data)
+
+        logger.info(f"Ingested {total_shots} shots for {len(player_ids)} players in {season} {season_type}")
+        return manifest
@@ -2,11 +2,15 @@
 NBA API service for interfacing with the nba_api library
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 import logging
-import time
 from datetime import datetime
 
+from app.models.shot_table import ShotTable
+from app.services.client_quota import charge_client_quota, refund_client_quota
+from app.services.player_index import get_player_index
+from app.services.upstream import get_retry_policy, CircuitOpenError, UpstreamError, UpstreamRejectedError
+
 # Check if pandas is available
 try:
     import pandas as pd
@@ -21,19 +25,37 @@ class NBAApiService:
     
     def __init__(self):
         """Initialize the NBA API service"""
-        self.request_delay = 0.6  # 600ms delay between requests to avoid rate limiting
-        self.last_request_time = 0
-        
-    def _rate_limit(self):
-        """Implement rate limiting to avoid NBA API throttling"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+        self.policy = get_retry_policy()
+    
+    def _call_upstream(self, endpoint: str, request: Callable[[float], Any],
+                       timeout: Optional[float] = None) -> Any:
+        """
+        Run an upstream request with prioritized rate limiting, timeouts and retries
         
-        if time_since_last < self.request_delay:
-            sleep_time = self.request_delay - time_since_last
-            time.sleep(sleep_time)
+        Calls made while serving a request are scheduled as interactive and
+        counted against the requesting client's quota before they queue for
+        a slot, so over-quota clients never take slots from others; calls the
+        circuit breaker or scheduler turn away are refunded. Everything else
+        (warmup, ingestion, CLI sync) is scheduled as background work.
         
-        self.last_request_time = time.time()
+        Args:
+            endpoint: Endpoint name used for metrics
+            request: Callable receiving the per-attempt timeout in seconds
+            timeout: Per-attempt timeout override in seconds
+            
+        Returns:
+            Result of the request
+            
+        Raises:
+            QuotaExceededError: If the requesting client used up its upstream quota
+        """
+        quota_key = charge_client_quota()
+        try:
+            return self.policy.call(endpoint, request, timeout=timeout)
+        except (CircuitOpenError, UpstreamRejectedError) as e:
+            if not getattr(e, 'attempts_sent', 0):
+                refund_client_quota(quota_key)
+            raise
     
     def search_players(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -47,123 +69,149 @@ class NBAApiService:
             List of player dictionaries
         """
         try:
-            self._rate_limit()
-            
-            from nba_api.stats.static import players
-            
-            # Get all players
-            all_players = players.get_players()
-            
-            # Filter players by query
-            query_lower = query.lower()
-            matching_players = []
+            # Local, typo-tolerant lookup in the player index; no upstream call
+            matching_players = [
+                self._format_player(player) for player in get_player_index().search(query, limit)
+            ]
             
-            for player in all_players:
-                full_name = player['full_name'].lower()
-                first_name = player['first_name'].lower()
-                last_name = player['last_name'].lower()
-                
-                if (query_lower in full_name or 
-                    query_lower in first_name or 
-                    query_lower in last_name):
-                    
-                    formatted_player = {
-                        'id': player['id'],
-                        'firstName': player['first_name'],
-                        'lastName': player['last_name'],
-                        'fullName': player['full_name'],
-                        'teamId': 0,  # Static data doesn't include current team
-                        'teamName': '',
-                        'position': '',
-                        'jerseyNumber': '',
-                        'imageUrl': f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player['id']}.png"
-                    }
-                    matching_players.append(formatted_player)
-                    
-                    if len(matching_players) >= limit:
-                        break
-            
-            logger.info(f"Found {len(matching_players)} players matching '{query}'")
+            logger.info("Found %d players matching '%s'", len(matching_players), query,
+                        extra={'event': 'player_search'})
             return matching_players
             
         except Exception as e:
             logger.error(f"Error searching players with NBA API: {str(e)}")
             return []
     
-    def get_player_info(self, player_id: int) -> Optional[Dict[str, Any]]:
+    def get_player_info(self, player_id: int, include_details: bool = True) -> Optional[Dict[str, Any]]:
         """
         Get detailed player information
         
         Args:
             player_id: NBA player ID
+            include_details: Whether to fetch team/position details from the API
             
         Returns:
             Player information dictionary or None if not found
+            
+        Raises:
+            UpstreamError: If the details request failed
         """
         try:
-            self._rate_limit()
-            
             from nba_api.stats.endpoints import commonplayerinfo
-            from nba_api.stats.static import players
             
             # Get basic player info from static data
-            player_info = players.find_player_by_id(player_id)
+            player_index = get_player_index()
+            player_info = player_index.get(player_id)
             if not player_info:
                 logger.warning(f"Player not found in static data: {player_id}")
                 return None
             
-            # Get additional info from API
-            if PANDAS_AVAILABLE:
-                try:
-                    self._rate_limit()
-                    player_details = commonplayerinfo.CommonPlayerInfo(player_id=player_id)
-                    player_data = player_details.get_data_frames()[0]
-                    
-                    if not player_data.empty:
-                        row = player_data.iloc[0]
-                        team_id = row.get('TEAM_ID', 0)
-                        team_name = row.get('TEAM_NAME', '')
-                        position = row.get('POSITION', '')
-                        jersey = row.get('JERSEY', '')
-                    else:
-                        team_id = 0
-                        team_name = ''
-                        position = ''
-                        jersey = ''
-                        
-                except Exception as api_error:
-                    logger.warning(f"Could not get detailed info for player {player_id}: {str(api_error)}")
-                    team_id = 0
-                    team_name = ''
-                    position = ''
-                    jersey = ''
-            else:
-                # Fallback when pandas is not available
-                team_id = 0
-                team_name = ''
-                position = ''
-                jersey = ''
-            
-            formatted_player = {
-                'id': player_info['id'],
-                'firstName': player_info['first_name'],
-                'lastName': player_info['last_name'],
-                'fullName': player_info['full_name'],
-                'teamId': team_id,
-                'teamName': team_name,
-                'position': position,
-                'jerseyNumber': str(jersey) if jersey else '',
-                'imageUrl': f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id}.png"
-            }
+            # The roster table covers every rostered player; players missing
+            # from a loaded roster are not on a team, so only ask the API per
+            # player while no roster is available
+            if player_index.has_roster or not (PANDAS_AVAILABLE and include_details):
+                formatted_player = self._format_player(player_info)
+                logger.info(f"Retrieved player info for {player_info['full_name']}")
+                return formatted_player
+            
+            try:
+                player_data = self._call_upstream(
+                    'commonplayerinfo',
+                    lambda timeout: commonplayerinfo.CommonPlayerInfo(
+                        player_id=player_id,
+                        timeout=timeout
+                    ).get_data_frames()[0]
+                )
+            except UpstreamError as api_error:
+                logger.warning(f"Could not get detailed info for player {player_id}: {str(api_error)}")
+                raise
+            
+            details = None
+            if not player_data.empty:
+                row = player_data.iloc[0]
+                details = {
+                    'teamId': int(row.get('TEAM_ID', 0) or 0),
+                    'teamName': row.get('TEAM_NAME', '') or '',
+                    'position': row.get('POSITION', '') or '',
+                    'jerseyNumber': str(row.get('JERSEY', '') or '')
+                }
             
+            formatted_player = self._format_player(player_info, details)
             logger.info(f"Retrieved player info for {player_info['full_name']}")
             return formatted_player
             
+        except UpstreamError:
+            raise
         except Exception as e:
             logger.error(f"Error getting player info: {str(e)}")
             return None
     
-    def get_shot_chart_data(self, player_id: int, season: str, season_type: str = 'Regular Season') -> List[Dict[str, Any]]:
+    def _format_player(self, player: Dict[str, Any], details: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Build the API player dictionary from a static player entry
+        
+        Args:
+            player: Static player entry
+            details: Team/position/jersey details (looked up in the roster table if omitted)
+            
+        Returns:
+            Player dictionary
+        """
+        if details is None:
+            details = get_player_index().roster_entry(player['id']) or {}
+        
+        return {
+            'id': player['id'],
+            'firstName': player['first_name'],
+            'lastName': player['last_name'],
+            'fullName': player['full_name'],
+            'teamId': details.get('teamId', 0),
+            'teamName': details.get('teamName', ''),
+            'position': details.get('position', ''),
+            'jerseyNumber': details.get('jerseyNumber', ''),
+            'imageUrl': f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player['id']}.png"
+        }
+    
+    def get_roster(self, season: Optional[str] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Get team, position and jersey of every rostered player in one call
+        
+        Args:
+            season: NBA season (defaults to the current season)
+            
+        Returns:
+            Roster details keyed by player ID
+            
+        Raises:
+            UpstreamError: If the upstream request failed
+        """
+        from nba_api.stats.endpoints import playerindex
+        from app.utils.seasons import current_season
+        
+        season = season or current_season()
+        roster_data = self._call_upstream(
+            'playerindex',
+            lambda timeout: playerindex.PlayerIndex(
+                season=season,
+                timeout=timeout
+            ).get_data_frames()[0]
+        )
+        
+        roster = {}
+        for row in roster_data.fillna('').itertuples(index=False):
+            if not row.TEAM_ID:
+                continue
+            roster[int(row.PERSON_ID)] = {
+                'teamId': int(row.TEAM_ID),
+                'teamName': row.TEAM_NAME or '',
+                'position': row.POSITION or '',
+                'jerseyNumber': str(row.JERSEY_NUMBER or '')
+            }
+        
+        logger.info(f"Retrieved roster of {len(roster)} players for {season}")
+        return roster
+    
+    def get_shot_chart_data(self, player_id: int, season: str, season_type: str = 'Regular Season') -> ShotTable:
         """
         Get shot chart data for a player
         
@@ -173,53 +221,101 @@ class NBAApiService:
             season_type: Type of season (Regular Season, Playoffs)
             
         Returns:
-            List of shot dictionaries
+            Shot table, empty only if upstream has no shots
+            
+        Raises:
+            UpstreamError: If the upstream request failed
         """
         if not PANDAS_AVAILABLE:
             logger.warning(f"Pandas not available, cannot retrieve shot data for player {player_id}")
-            return []
+            return ShotTable.empty()
             
         try:
-            self._rate_limit()
-            
-            from nba_api.stats.endpoints import shotchartdetail
-            
-            # Get shot chart data
-            shot_chart = shotchartdetail.ShotChartDetail(
-                team_id=0,
-                player_id=player_id,
-                season_nullable=season,
-                season_type_all_star=season_type,
-                context_measure_simple='FGA'
-            )
-            
-            shot_data = shot_chart.get_data_frames()[0]
+            shot_data = self.get_shot_chart_frame(player_id, season, season_type)
             
             if shot_data.empty:
                 logger.warning(f"No shot data found for player {player_id} in {season}")
-                return []
-            
-            shots = []
-            for _, row in shot_data.iterrows():
-                shot = {
-                    'id': f"shot_{row['GAME_ID']}_{row['GAME_EVENT_ID']}",
-                    'locationX': int(row['LOC_X']),
-                    'locationY': int(row['LOC_Y']),
-                    'shotDistance': int(row['SHOT_DISTANCE']),
-                    'shotMade': bool(row['SHOT_MADE_FLAG']),
-                    'shotType': str(row['SHOT_TYPE']),
-                    'period': int(row['PERIOD']),
-                    'timeRemaining': str(row['MINUTES_REMAINING']) + ':' + str(row['SECONDS_REMAINING']).zfill(2),
-                    'shotZone': str(row['SHOT_ZONE_BASIC'])
-                }
-                shots.append(shot)
+                return ShotTable.empty()
+            
+            shots = ShotTable.from_frame(shot_data)
             
             logger.info(f"Retrieved {len(shots)} shots for player {player_id}")
             return shots
             
         except Exception as e:
             logger.error(f"Error getting shot chart data: {str(e)}")
-            return []
+            raise
+    
+    def get_shot_chart_frame(self, player_id: int, season: str, season_type: str = 'Regular Season',
+                             date_from: Optional[str] = None) -> 'pd.DataFrame':
+        """
+        Get raw shot chart rows for a player
+        
+        Args:
+            player_id: NBA player ID
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            date_from: Only include games on or after this date (MM/DD/YYYY)
+            
+        Returns:
+            Raw ShotChartDetail data frame
+            
+        Raises:
+            UpstreamError: If the upstream request failed
+        """
+        from nba_api.stats.endpoints import shotchartdetail
+        
+        return self._call_upstream(
+            'shotchartdetail',
+            lambda timeout: shotchartdetail.ShotChartDetail(
+                team_id=0,
+                player_id=player_id,
+                season_nullable=season,
+                season_type_all_star=season_type,
+                context_measure_simple='FGA',
+                date_from_nullable=date_from or '',
+                timeout=timeout
+            ).get_data_frames()[0]
+        )
+    
+    def get_league_shot_data(self, season: str, season_type: str = 'Regular Season',
+                             timeout: Optional[float] = None, date_from: Optional[str] = None) -> 'pd.DataFrame':
+        """
+        Get every shot of a season in a single upstream call
+        
+        Args:
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            timeout: Per-attempt timeout override, bulk responses are large
+            date_from: Only include games on or after this date (MM/DD/YYYY)
+            
+        Returns:
+            Raw ShotChartDetail data frame for all players
+            
+        Raises:
+            UpstreamError: If the upstream request failed
+        """
+        if not PANDAS_AVAILABLE:
+            raise RuntimeError("Pandas is required for bulk shot ingestion")
+        
+        from nba_api.stats.endpoints import shotchartdetail
+        
+        shot_data = self._call_upstream(
+            'shotchartdetail_league',
+            lambda attempt_timeout: shotchartdetail.ShotChartDetail(
+                team_id=0,
+                player_id=0,
+                season_nullable=season,
+                season_type_all_star=season_type,
+                context_measure_simple='FGA',
+                date_from_nullable=date_from or '',
+                timeout=attempt_timeout
+            ).get_data_frames()[0],
+            timeout=timeout
+        )
+        
+        logger.info(f"Retrieved {len(shot_data)} league shots for {season} {season_type}")
+        return shot_data
     
     def get_player_stats(self, player_id: int, season: str) -> Dict[str, Any]:
         """
@@ -230,7 +326,10 @@ class NBAApiService:
             season: NBA season (e.g., "2023-24")
             
         Returns:
-            Statistics dictionary
+            Statistics dictionary, zeroed only if upstream has no stats
+            
+        Raises:
+            UpstreamError: If the upstream request failed or returned unusable data
         """
         if not PANDAS_AVAILABLE:
             logger.warning(f"Pandas not available, cannot retrieve stats for player {player_id}")
@@ -245,27 +344,32 @@ class NBAApiService:
             }
             
         try:
-            self._rate_limit()
-            
             # Try different endpoints for stats based on player activity
             try:
                 from nba_api.stats.endpoints import playerdashboardbyyearoveryear
                 
                 # Get player stats
-                player_stats = playerdashboardbyyearoveryear.PlayerDashboardByYearOverYear(
-                    player_id=player_id,
-                    season=season
+                stats_data = self._call_upstream(
+                    'playerdashboardbyyearoveryear',
+                    lambda timeout: playerdashboardbyyearoveryear.PlayerDashboardByYearOverYear(
+                        player_id=player_id,
+                        season=season,
+                        timeout=timeout
+                    ).get_data_frames()[0]
                 )
                 
-                stats_data = player_stats.get_data_frames()[0]
-                
-            except Exception as dashboard_error:
+            except UpstreamError as dashboard_error:
                 logger.warning(f"Dashboard stats failed for player {player_id}, trying career stats: {str(dashboard_error)}")
                 
                 # Fallback to career stats
                 from nba_api.stats.endpoints import playercareerstats
-                career_stats = playercareerstats.PlayerCareerStats(player_id=player_id)
-                stats_data = career_stats.get_data_frames()[0]
+                stats_data = self._call_upstream(
+                    'playercareerstats',
+                    lambda timeout: playercareerstats.PlayerCareerStats(
+                        player_id=player_id,
+                        timeout=timeout
+                    ).get_data_frames()[0]
+                )
                 
                 # Filter for the specific season if available
                 if not stats_data.empty:
@@ -303,14 +407,8 @@ class NBAApiService:
             logger.info(f"Retrieved stats for player {player_id}")
             return stats
             
+        except UpstreamError:
+            raise
         except Exception as e:
             logger.error(f"Error getting player stats: {str(e)}")
-            return {
-                'totalAttempts': 0,
-                'totalMade': 0,
-                'fieldGoalPercentage': 0.0,
-                'threePointAttempts': 0,
-                'threePointMade': 0,
-                'threePointPercentage': 0.0,
-                'averageShotDistance': 0.0
-            }
\ No newline at end of file
+            raise UpstreamError(f"Unusable stats response for player {player_id}: {str(e)}") from e
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+In-memory index of all NBA players
+
+The static nba_api player list is loaded once per process and kept keyed
+by player id, so lookups and searches do not rebuild it per request. A
+roster table with current team, position and jersey of every rostered
+player is loaded in one bulk call and refreshed periodically.
+"""
+
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from flask import current_app, has_app_context
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from app.utils.name_search import NameSearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerIndex:
+    """Process-wide player list keyed by player id"""
+
+    # Score bonus that ranks active players above similar inactive matches
+    ACTIVE_BOOST = 0.15
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.players: List[Dict[str, Any]] = []
+        self.by_id: Dict[int, Dict[str, Any]] = {}
+        self.built_at: Optional[str] = None
+        self.build_seconds: Optional[float] = None
+        self.search_index: Optional[NameSearchIndex] = None
+        self.roster: Dict[int, Dict[str, Any]] = {}
+        self.roster_loaded_at: Optional[str] = None
+        self._bundle: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_built(self) -> bool:
+        """Whether the index has been built"""
+        return self.built_at is not None
+
+    def build(self) -> 'PlayerIndex':
+        """
+        Load the static player list into the index
+
+        Returns:
+            The index itself
+        """
+        from nba_api.stats.static import players
+
+        with self._lock:
+            started = time.monotonic()
+            all_players = players.get_players()
+
+            self.by_id = {player['id']: player for player in all_players}
+            self.search_index = NameSearchIndex([player['full_name'] for player in all_players])
+            self.players = all_players
+            self._bundle = None
+            self.build_seconds = round(time.monotonic() - started, 3)
+            self.built_at = datetime.utcnow().isoformat()
+
+        logger.info(f"Player index built with {len(self.players)} players in {self.build_seconds}s")
+        return self
+
+    def ensure_built(self) -> 'PlayerIndex':
+        """Build the index if it has not been built yet"""
+        if not self.is_built:
+            self.build()
+        return self
+
+    def get(self, player_id: int) -> Optional[Dict[str, Any]]:
+        """Get a player's static entry, or None if unknown"""
+        return self.ensure_built().by_id.get(player_id)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find players by name, tolerating typos
+
+        Results are ranked by match tier (exact, prefix, substring, fuzzy),
+        then by similarity with a boost for active players.
+
+        Args:
+            query: Search query string
+            limit: Maximum number of results
+
+        Returns:
+            Static player entries, best match first
+        """
+        self.ensure_built()
+        matches = self.search_index.search(query)
+
+        def rank(position: int):
+            tier, score = matches[position]
+            player = self.players[position]
+            boost = self.ACTIVE_BOOST if self.is_active(player) else 0
+            return (-tier, -(score + boost), player['full_name'])
+
+        return [self.players[position] for position in sorted(matches, key=rank)[:limit]]
+
+    def is_active(self, player: Dict[str, Any]) -> bool:
+        """Whether a player is active per static data or the roster table"""
+        return bool(player['is_active']) or player['id'] in self.roster
+
+    def bundle(self) -> Dict[str, Any]:
+        """
+        Get the compact player list bundle for client-side search
+
+        Built once per index build or roster refresh. Rows are
+        [id, full name, active (0/1)] and the version is a hash of the body.
+
+        Returns:
+            Dictionary with version, JSON body and its gzip encoding
+        """
+        self.ensure_built()
+
+        bundle = self._bundle
+        if bundle is None:
+            rows = [
+                [player['id'], player['full_name'], 1 if self.is_active(player) else 0]
+                for player in self.players
+            ]
+            payload = json.dumps(rows, separators=(',', ':'), ensure_ascii=False)
+            version = hashlib.sha256(payload.encode()).hexdigest()[:16]
+            body = f'{{"version":"{version}","fields":["id","name","active"],"players":{payload}}}'.encode()
+
+            bundle = {
+                'version': version,
+                'body': body,
+                'gzip': gzip.compress(body, compresslevel=9, mtime=0)
+            }
+            self._bundle = bundle
+            logger.info(f"Player bundle {version} built: {len(body)}B, {len(bundle['gzip'])}B gzipped")
+        return bundle
+
+    @property
+    def has_roster(self) -> bool:
+        """Whether a roster table has been loaded"""
+        return self.roster_loaded_at is not None
+
+    def refresh_roster(self, season: Optional[str] = None) -> int:
+        """
+        Reload the roster table with one bulk upstream call
+
+        Args:
+            season: NBA season (defaults to the current season)
+
+        Returns:
+            Number of rostered players
+
+        Raises:
+            UpstreamError: If the upstream request failed
+        """
+        from app.services.nba_api_service import NBAApiService
+
+        roster = NBAApiService().get_roster(season)
+
+        # Swap the whole map so readers never see a partial roster
+        self.roster = roster
+        self.roster_loaded_at = datetime.utcnow().isoformat()
+        self._bundle = None
+        return len(roster)
+
+    def roster_entry(self, player_id: int) -> Optional[Dict[str, Any]]:
+        """Get a player's team/position/jersey details, or None if not rostered"""
+        return self.roster.get(player_id)
+
+    def status(self) -> Dict[str, Any]:
+        """Get build state and size of the index and roster table"""
+        return {
+            'built': self.is_built,
+            'players': len(self.players),
+            'built_at': self.built_at,
+            'build_seconds': self.build_seconds,
+            'roster_players': len(self.roster),
+            'roster_loaded_at': self.roster_loaded_at
+        }
+
+
+_default_index: Optional[PlayerIndex] = None
+
+
+def get_player_index() -> PlayerIndex:
+    """
+    Get the player index for the current application
+
+    Returns:
+        The app's index, or a process-wide default outside an app context
+    """
+    global _default_index
+
+    if has_app_context() and hasattr(current_app, 'player_index'):
+        return current_app.player_index
+
+    if _default_index is None:
+        _default_index = PlayerIndex()
+    return _default_index
@@ -2,9 +2,18 @@
 Player service for handling NBA player data operations
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from flask import current_app
 import logging
+import time
+
+from app.models.player import PlayerResponse, ShotStatsResponse
+from app.models.shot_table import ShotTable
+from app.services.shot_store import ShotStore
+from app.services.upstream import UpstreamError
+from app.utils.seasons import current_season
+from app.utils.shot_index import index_for
+from app.utils.shot_stats import empty_shot_stats
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +25,7 @@ class PlayerService:
         from app.services.cache_service import CacheService
         self.cache_service = CacheService()
     
-    def search_players(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def search_players(self, query: str, limit: int = 10) -> List[PlayerResponse]:
         """
         Search for NBA players by name with caching
         
@@ -25,23 +34,23 @@ class PlayerService:
             limit: Maximum number of results
             
         Returns:
-            List of player dictionaries
+            List of validated player models
         """
         # Try to get from cache first
         cached_result = self.cache_service.get_cached_response('player_search', query.lower(), limit)
-        if cached_result:
+        if cached_result is not None:
             return cached_result
         
         try:
             from app.services.nba_api_service import NBAApiService
             nba_service = NBAApiService()
             
-            players = nba_service.search_players(query, limit)
+            players = self.cache_service.validate('player_search', nba_service.search_players(query, limit))
             
             # Cache the result
             self.cache_service.set_cached_response('player_search', players, query.lower(), limit)
             
-            logger.info(f"Found {len(players)} players for query: {query}")
+            logger.info("Found %d players for query: %s", len(players), query, extra={'event': 'player_search'})
             return players
             
         except Exception as e:
@@ -49,7 +58,7 @@ class PlayerService:
             # Return empty list instead of sample data
             return []
     
-    def get_player_info(self, player_id: int) -> Optional[Dict[str, Any]]:
+    def get_player_info(self, player_id: int) -> Optional[PlayerResponse]:
         """
         Get detailed player information with caching
         
@@ -57,22 +66,37 @@ class PlayerService:
             player_id: NBA player ID
             
         Returns:
-            Player information dictionary or None if not found
+            Validated player model or None if not found
         """
         # Try to get from cache first
         cached_result = self.cache_service.get_cached_response('player_info', player_id)
-        if cached_result:
+        if cached_result is not None:
             return cached_result
         
         try:
             from app.services.nba_api_service import NBAApiService
             nba_service = NBAApiService()
             
-            player = nba_service.get_player_info(player_id)
+            try:
+                player = nba_service.get_player_info(player_id)
+            except UpstreamError as upstream_error:
+                stale = self.cache_service.get_last_known_good('player_info', player_id)
+                if stale is not None:
+                    logger.warning(f"Serving last known good player info for {player_id}: {str(upstream_error)}")
+                    return stale
+                
+                # Static data is still good enough to render the player header
+                logger.warning(f"Serving static player info for {player_id}: {str(upstream_error)}")
+                return self.cache_service.validate(
+                    'player_info', nba_service.get_player_info(player_id, include_details=False)
+                )
             
             if player:
+                player = self.cache_service.validate('player_info', player)
+                
                 # Cache the result
                 self.cache_service.set_cached_response('player_info', player, player_id)
+                self.cache_service.set_last_known_good('player_info', player, player_id)
                 
                 logger.info(f"Retrieved player info for ID: {player_id}")
                 return player
@@ -85,7 +109,7 @@ class PlayerService:
             # Return None instead of sample data
             return None
     
-    def get_player_shots(self, player_id: int, season: str, season_type: str = 'Regular Season') -> List[Dict[str, Any]]:
+    def get_player_shots(self, player_id: int, season: str, season_type: str = 'Regular Season') -> ShotTable:
         """
         Get shot chart data for a player with caching
         
@@ -95,31 +119,135 @@ class PlayerService:
             season_type: Type of season (Regular Season, Playoffs)
             
         Returns:
-            List of shot dictionaries
+            Shot table (converted to dicts only at the API edge)
+            
+        Raises:
+            UpstreamError: If upstream failed and no last known good data exists
         """
         # Try to get from cache first
-        cached_result = self.cache_service.get_cached_response('player_shots', player_id, season, season_type)
-        if cached_result:
+        cached_result = self.cache_service.get_player_shots(player_id, season, season_type)
+        if cached_result is not None:
             return cached_result
         
+        # The in-progress season is synced incrementally instead of re-fetched
+        if season == current_season():
+            return self._sync_current_season_shots(player_id, season, season_type)
+        
+        # Then the local shot store filled by bulk season ingestion
+        stored_shots = self._get_stored_shots(player_id, season, season_type)
+        if stored_shots is not None:
+            stored_shots = self.cache_service.validate('player_shots', stored_shots)
+            self.cache_service.set_player_shots(stored_shots, player_id, season, season_type)
+            return stored_shots
+        
         try:
             from app.services.nba_api_service import NBAApiService
             nba_service = NBAApiService()
             
-            shots = nba_service.get_shot_chart_data(player_id, season, season_type)
+            try:
+                shots = nba_service.get_shot_chart_data(player_id, season, season_type)
+            except UpstreamError as upstream_error:
+                return self._serve_last_known_good(upstream_error, 'player_shots', player_id, season, season_type)
             
-            # Cache the result
-            self.cache_service.set_cached_response('player_shots', shots, player_id, season, season_type)
+            # Cache the result, keeping genuine "no shots" answers only briefly
+            shots = self.cache_service.validate('player_shots', shots)
+            self.cache_service.set_player_shots(shots, player_id, season, season_type)
             
             logger.info(f"Retrieved {len(shots)} shots for player {player_id}")
             return shots
             
+        except UpstreamError:
+            raise
         except Exception as e:
             logger.error(f"Error getting player shots: {str(e)}")
-            # Return empty list instead of sample data
-            return []
+            # Return empty table instead of sample data
+            return ShotTable.empty()
+    
+    def get_filtered_player_shots(self, player_id: int, season: str, season_type: str = 'Regular Season',
+                                  filters: Optional[Dict[str, Any]] = None) -> ShotTable:
+        """
+        Get a player's shots matching server-side filters
+        
+        Args:
+            player_id: NBA player ID
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            filters: Keyword filters accepted by ShotIndex.query
+            
+        Returns:
+            Shot table with the matching shots
+        """
+        shots, positions = self.select_player_shots(player_id, season, season_type, filters)
+        return shots if positions is None else shots.take(positions)
+    
+    def select_player_shots(self, player_id: int, season: str, season_type: str = 'Regular Season',
+                            filters: Optional[Dict[str, Any]] = None) -> Tuple[ShotTable, Optional[List[int]]]:
+        """
+        Find a player's shots matching server-side filters without copying them
+        
+        Args:
+            player_id: NBA player ID
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            filters: Keyword filters accepted by ShotIndex.query
+            
+        Returns:
+            Tuple of (cached shot table, ascending positions of the matching
+            shots or None if every shot matches)
+        """
+        shots = self.get_player_shots(player_id, season, season_type)
+        if not filters or not shots:
+            return shots, None
+        
+        return shots, index_for(shots).query(**filters)
+    
+    def compare_players(self, player_ids: List[int], season: str,
+                        season_type: str = 'Regular Season') -> Dict[str, Any]:
+        """
+        Compare players' attempts and FG% per shot zone and distance band
+        
+        Args:
+            player_ids: NBA player IDs; the first one is the reference for differences
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            
+        Returns:
+            Aggregate 'zones' and 'distanceBands' tables with one value per player
+        """
+        from app.utils.shot_comparison import compare_shot_tables
+        
+        tables = [self.get_player_shots(player_id, season, season_type) for player_id in player_ids]
+        return compare_shot_tables(tables)
+    
+    def render_shot_chart(self, shots: ShotTable, digest: str, fmt: str, mode: str, width: int) -> bytes:
+        """
+        Get a rendered shot chart, rendering it only on a cache miss
+        
+        Args:
+            shots: Shots to draw
+            digest: Content hash of the shots and options (see chart_digest)
+            fmt: 'png' or 'svg'
+            mode: 'markers' or 'hexbin'
+            width: Image width in pixels
+            
+        Returns:
+            Image bytes
+        """
+        from app.utils.chart_render import RENDERERS
+        
+        cached = self.cache_service.get_cached_response('rendered_chart', digest)
+        if cached is not None:
+            return cached
+        
+        started = time.monotonic()
+        image = RENDERERS[fmt](shots, mode=mode, width=width)
+        logger.info(f"Rendered {fmt} {mode} chart of {len(shots)} shots ({len(image)} bytes) "
+                    f"in {(time.monotonic() - started) * 1000:.1f}ms")
+        
+        self.cache_service.set_cached_response('rendered_chart', image, digest)
+        return image
     
-    def get_player_stats(self, player_id: int, season: str) -> Dict[str, Any]:
+    def get_player_stats(self, player_id: int, season: str) -> ShotStatsResponse:
         """
         Get shooting statistics for a player with caching
         
@@ -128,37 +256,49 @@ class PlayerService:
             season: NBA season (e.g., "2023-24")
             
         Returns:
-            Statistics dictionary
+            Validated statistics model
+            
+        Raises:
+            UpstreamError: If upstream failed and no last known good data exists
         """
         # Try to get from cache first
         cached_result = self.cache_service.get_cached_response('player_stats', player_id, season)
-        if cached_result:
+        if cached_result is not None:
             return cached_result
         
+        # Then the stats precomputed at ingestion time
+        stored_stats = self._get_stored_stats(player_id, season, 'Regular Season')
+        if stored_stats is not None:
+            stored_stats = self.cache_service.validate('player_stats', stored_stats)
+            self.cache_service.set_cached_response('player_stats', stored_stats, player_id, season)
+            return stored_stats
+        
         try:
             from app.services.nba_api_service import NBAApiService
             nba_service = NBAApiService()
             
-            stats = nba_service.get_player_stats(player_id, season)
+            try:
+                stats = nba_service.get_player_stats(player_id, season)
+            except UpstreamError as upstream_error:
+                return self._serve_last_known_good(upstream_error, 'player_stats', player_id, season)
             
-            # Cache the result
-            self.cache_service.set_cached_response('player_stats', stats, player_id, season)
+            # Cache the result, keeping genuine "no stats" answers only briefly
+            stats = self.cache_service.validate('player_stats', stats)
+            if stats.totalAttempts:
+                self.cache_service.set_cached_response('player_stats', stats, player_id, season)
+                self.cache_service.set_last_known_good('player_stats', stats, player_id, season)
+            else:
+                self.cache_service.set_negative_response('player_stats', stats, player_id, season)
             
             logger.info(f"Retrieved stats for player {player_id}")
             return stats
             
+        except UpstreamError:
+            raise
         except Exception as e:
             logger.error(f"Error getting player stats: {str(e)}")
             # Return empty stats instead of sample data
-            return {
-                'totalAttempts': 0,
-                'totalMade': 0,
-                'fieldGoalPercentage': 0.0,
-                'threePointAttempts': 0,
-                'threePointMade': 0,
-                'threePointPercentage': 0.0,
-                'averageShotDistance': 0.0
-            }
+            return self.cache_service.validate('player_stats', empty_shot_stats())
     
     def get_available_seasons(self) -> List[str]:
         """
@@ -169,7 +309,7 @@ class PlayerService:
         """
         # Try to get from cache first
         cached_result = self.cache_service.get_cached_response('seasons')
-        if cached_result:
+        if cached_result is not None:
             return cached_result
         
         # Generate seasons from 1996-97 to current
@@ -186,4 +326,101 @@ class PlayerService:
         self.cache_service.set_cached_response('seasons', seasons)
         
         logger.info(f"Generated {len(seasons)} available seasons")
-        return seasons
\ No newline at end of file
+        return seasons
+    
+    def _sync_current_season_shots(self, player_id: int, season: str, season_type: str) -> ShotTable:
+        """
+        Get in-progress season shots, fetching only games since the last sync
+        
+        Args:
+            player_id: NBA player ID
+            season: NBA season (e.g., "2024-25")
+            season_type: Type of season (Regular Season, Playoffs)
+            
+        Returns:
+            Shot table
+            
+        Raises:
+            UpstreamError: If upstream failed and neither stored nor last known good data exists
+        """
+        from app.services.sync_service import SyncService
+        
+        try:
+            return SyncService().sync_player(player_id, season, season_type)
+        except UpstreamError as upstream_error:
+            stored_shots = self._get_stored_shots(player_id, season, season_type)
+            if stored_shots:
+                logger.warning(f"Serving stored shots for player {player_id} after failed sync: {str(upstream_error)}")
+                return stored_shots
+            return self._serve_last_known_good(upstream_error, 'player_shots', player_id, season, season_type)
+    
+    def _get_stored_shots(self, player_id: int, season: str, season_type: str) -> Optional[ShotTable]:
+        """
+        Look up a player's shots in the local shot store
+        
+        Args:
+            player_id: NBA player ID
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            
+        Returns:
+            Stored shot table, an empty table if the season was ingested
+            without this player, or None if the season is not stored
+        """
+        try:
+            shot_store = ShotStore()
+            shots = shot_store.load_player_shots(player_id, season, season_type)
+            if shots is not None:
+                return shots
+            
+            if shot_store.has_season(season, season_type):
+                return ShotTable.empty()
+            
+        except Exception as e:
+            logger.error(f"Error reading shot store: {str(e)}")
+        
+        return None
+    
+    def _get_stored_stats(self, player_id: int, season: str, season_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a player's precomputed stats in the local shot store
+        
+        Returns:
+            Stored stats, zeroed stats if the season was ingested without
+            this player, or None if the season is not stored
+        """
+        try:
+            shot_store = ShotStore()
+            stats = shot_store.load_player_stats(player_id, season, season_type)
+            if stats is not None:
+                return stats
+            
+            if shot_store.has_season(season, season_type):
+                return empty_shot_stats()
+            
+        except Exception as e:
+            logger.error(f"Error reading shot store: {str(e)}")
+        
+        return None
+    
+    def _serve_last_known_good(self, error: UpstreamError, key_type: str, *args) -> Any:
+        """
+        Fall back to the last known good value after an upstream failure
+        
+        Args:
+            error: The upstream error that occurred
+            key_type: Type of cache key
+            *args: Positional arguments for the key
+            
+        Returns:
+            Last known good data
+            
+        Raises:
+            UpstreamError: If no last known good data exists
+        """
+        stale = self.cache_service.get_last_known_good(key_type, *args)
+        if stale is None:
+            raise error
+        
+        logger.warning(f"Serving last known good {key_type} for {args}: {str(error)}")
+        return stale
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""
+Local on-disk store for ingested shot data
+
+Shots are sharded per season, season type and player so any player's
+chart can be served without an upstream call once a season is ingested.
+Each player has a binary ShotTable shard plus a small JSON file with
+precomputed stats and sync metadata. The same shots are also sharded per
+team, so team charts need neither upstream calls nor per-player reads.
+
+Files are replaced atomically, but read/modify/write updates (syncs,
+baseline and team shard merges) must hold the file's lock() so that
+concurrent request threads, workers and CLI runs do not lose updates.
+"""
+
+from typing import Any, Dict, Iterator, Optional
+from flask import current_app, has_app_context
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import logging
+import os
+import re
+import threading
+
+from app.models.shot_table import ShotTable
+
+# Check if advisory file locks are available (POSIX)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# In-process locks by lock file path, used where fcntl is not available
+_local_locks: Dict[str, threading.Lock] = {}
+_local_locks_guard = threading.Lock()
+
+# Seasons are used as directory names, so only YYYY-YY is accepted
+SEASON_PATTERN = re.compile(r'\d{4}-\d{2}')
+
+
+class ShotStore:
+    """File-backed store of per-player shots, stats and sync metadata"""
+
+    def __init__(self, base_dir: Optional[str] = None):
+        """
+        Initialize the shot store
+
+        Args:
+            base_dir: Root directory of the store (defaults to SHOT_STORE_DIR config)
+        """
+        if base_dir is None:
+            if has_app_context():
+                base_dir = current_app.config['SHOT_STORE_DIR']
+            else:
+                base_dir = os.getenv('SHOT_STORE_DIR', 'data/shot_store')
+        self.base_dir = base_dir
+
+    @staticmethod
+    def _slug(value: str) -> str:
+        """Make a season type safe to use as a directory name"""
+        return re.sub(r'[^a-z0-9]+', '_', value.lower()).strip('_')
+
+    def _season_dir(self, season: str, season_type: str) -> str:
+        """Directory holding one season/season type
+
+        Raises:
+            ValueError: If the season is not in YYYY-YY format
+        """
+        if not isinstance(season, str) or not SEASON_PATTERN.fullmatch(season):
+            raise ValueError(f'Invalid season for shot store: {season!r}')
+        return os.path.join(self.base_dir, season, self._slug(season_type))
+
+    def _player_path(self, player_id: int, season: str, season_type: str, extension: str = 'json') -> str:
+        """Shard file of one player"""
+        return os.path.join(self._season_dir(season, season_type), 'players', f'{player_id}.{extension}')
+
+    def _team_path(self, team_id: int, season: str, season_type: str) -> str:
+        """Shot shard file of one team"""
+        return os.path.join(self._season_dir(season, season_type), 'teams', f'{team_id}.shots')
+
+    @contextmanager
+    def lock(self, season: str, season_type: str, name: str) -> Iterator[None]:
+        """
+        Hold the exclusive lock of one stored file while updating it
+
+        Uses an flock()ed lock file, shared by threads and processes; without
+        fcntl only threads of this process are serialized.
+
+        Args:
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            name: Name of the locked file (e.g. "baselines", "player_2544", "team_1610612747")
+        """
+        path = os.path.join(self._season_dir(season, season_type), 'locks', f'{name}.lock')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if not FCNTL_AVAILABLE:
+            with _local_locks_guard:
+                local_lock = _local_locks.setdefault(path, threading.Lock())
+            with local_lock:
+                yield
+            return
+
+        with open(path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _write_json(path: str, payload: Any):
+        """Atomically write a JSON file"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _write_bytes(path: str, payload: bytes):
+        """Atomically write a binary file"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Any]:
+        """Read a JSON file, returning None if it is missing or corrupt"""
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading shot store file {path}: {str(e)}")
+            return None
+
+    def save_player(self, player_id: int, season: str, season_type: str,
+                    shots: ShotTable, stats: Dict[str, Any],
+                    meta: Optional[Dict[str, Any]] = None):
+        """
+        Store a player's shots with precomputed stats
+
+        Args:
+            player_id: NBA player ID
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            shots: Shot table
+            stats: Statistics computed from the shots
+            meta: Extra metadata (e.g. last synced game date, exact distance sum)
+        """
+        # Shots first, so a reader never sees stats for shots that are not written yet
+        self._write_bytes(self._player_path(player_id, season, season_type, 'shots'), shots.to_bytes())
+        payload = {
+            'stats': stats,
+            'meta': {**(meta or {}), 'updated_at': datetime.utcnow().isoformat()}
+        }
+        self._write_json(self._player_path(player_id, season, season_type), payload)
+
+    def load_player(self, player_id: int, season: str, season_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a player's stored entry
+
+        Returns:
+            Dictionary with shots (ShotTable), stats and meta, or None if not stored
+        """
+        entry = self._read_json(self._player_path(player_id, season, season_type))
+        if entry is None:
+            return None
+
+        if 'shots' in entry:
+            # Shards written before shots were stored as binary tables
+            entry['shots'] = ShotTable.from_dicts(entry['shots'])
+            return entry
+
+        try:
+            with open(self._player_path(player_id, season, season_type, 'shots'), 'rb') as f:
+                entry['shots'] = ShotTable.from_bytes(f.read())
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading shots of player {player_id} from shot store: {str(e)}")
+            return None
+        return entry
+
+    def load_player_shots(self, player_id: int, season: str, season_type: str) -> Optional[ShotTable]:
+        """Load a player's stored shots, or None if not stored"""
+        entry = self.load_player(player_id, season, season_type)
+        return entry['shots'] if entry else None
+
+    def load_player_stats(self, player_id: int, season: str, season_type: str) -> Optional[Dict[str, Any]]:
+        """Load a player's precomputed stats, or None if not stored"""
+        entry = self._read_json(self._player_path(player_id, season, season_type))
+        return entry['stats'] if entry else None
+
+    def save_team_shots(self, team_id: int, season: str, season_type: str, shots: ShotTable):
+        """Store every shot a team took in a season/season type"""
+        self._write_bytes(self._team_path(team_id, season, season_type), shots.to_bytes())
+
+    def load_team_shots(self, team_id: int, season: str, season_type: str) -> Optional[ShotTable]:
+        """Load a team's stored shots, or None if not stored"""
+        try:
+            with open(self._team_path(team_id, season, season_type), 'rb') as f:
+                return ShotTable.from_bytes(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading shots of team {team_id} from shot store: {str(e)}")
+            return None
+
+    def save_manifest(self, season: str, season_type: str, manifest: Dict[str, Any]):
+        """Store the ingestion manifest of a season/season type"""
+        self._write_json(os.path.join(self._season_dir(season, season_type), 'manifest.json'), manifest)
+
+    def load_manifest(self, season: str, season_type: str) -> Optional[Dict[str, Any]]:
+        """Load the ingestion manifest of a season/season type, or None if not ingested"""
+        return self._read_json(os.path.join(self._season_dir(season, season_type), 'manifest.json'))
+
+    def save_baselines(self, season: str, season_type: str, baselines: Dict[str, Any]):
+        """Store the league zone baselines of a season/season type"""
+        self._write_json(os.path.join(self._season_dir(season, season_type), 'baselines.json'), baselines)
+
+    def load_baselines(self, season: str, season_type: str) -> Optional[Dict[str, Any]]:
+        """Load the league zone baselines of a season/season type, or None if not built"""
+        return self._read_json(os.path.join(self._season_dir(season, season_type), 'baselines.json'))
+
+    def save_baseline_coverage(self, season: str, season_type: str, coverage: Dict[str, Dict[str, int]]):
+        """Store which shots the zone baselines count (game id -> player id -> highest event id)"""
+        self._write_json(os.path.join(self._season_dir(season, season_type), 'baselines_coverage.json'), coverage)
+
+    def load_baseline_coverage(self, season: str, season_type: str) -> Optional[Dict[str, Dict[str, int]]]:
+        """Load the zone baseline coverage, or None if baselines were built without it"""
+        return self._read_json(os.path.join(self._season_dir(season, season_type), 'baselines_coverage.json'))
+
+    def has_season(self, season: str, season_type: str) -> bool:
+        """Whether a full season/season type has been ingested"""
+        return self.load_manifest(season, season_type) is not None
@@ -0,0 +1,210 @@
+"""
+Incremental shot sync for the in-progress season
+
+Remembers the last synced game date per player/season in the shot store
+and only asks upstream for games on or after it, appending new shots and
+updating derived stats, league zone baselines, team shards and cache
+entries in place. A player's shard is locked from load to append, so
+concurrent syncs of one player never count the same new shots twice.
+Shards are saved before the league baselines and team shards are updated;
+those dedup fetched rows against what they already hold, so a failure in
+between is repaired by the next sync instead of counting shots twice.
+"""
+
+from typing import Any, Dict, Optional
+from flask import current_app
+import logging
+
+from app.models.shot_table import ShotTable
+from app.services.baseline_service import BaselineService
+from app.services.cache_service import CacheService
+from app.services.nba_api_service import NBAApiService
+from app.services.shot_store import ShotStore
+from app.services.team_service import TeamService
+from app.utils.seasons import game_date_to_api
+from app.utils.shot_stats import compute_shot_stats, merge_shot_stats
+
+# Check if pandas is available
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class SyncService:
+    """Service appending newly played games to stored shot data"""
+
+    def __init__(self, shot_store: Optional[ShotStore] = None):
+        """
+        Initialize the sync service
+
+        Args:
+            shot_store: Store to sync into (defaults to the configured store)
+        """
+        self.shot_store = shot_store or ShotStore()
+        self.cache_service = CacheService()
+        self.nba_service = NBAApiService()
+        self.baseline_service = BaselineService(self.shot_store)
+        self.team_service = TeamService(self.shot_store)
+
+    def sync_player(self, player_id: int, season: str, season_type: str = 'Regular Season') -> ShotTable:
+        """
+        Bring one player's stored shots up to date
+
+        Args:
+            player_id: NBA player ID
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+
+        Returns:
+            Full, up to date table of the player's shots
+
+        Raises:
+            UpstreamError: If the upstream request failed
+        """
+        if not PANDAS_AVAILABLE:
+            logger.warning(f"Pandas not available, cannot sync shots of player {player_id}")
+            return self.shot_store.load_player_shots(player_id, season, season_type) or ShotTable.empty()
+
+        # Held across the upstream call: a concurrent sync of the same player
+        # waits, then finds the shots already stored
+        with self.shot_store.lock(season, season_type, f'player_{player_id}'):
+            entry = self.shot_store.load_player(player_id, season, season_type)
+            last_game_date = entry['meta'].get('last_game_date') if entry else None
+
+            shot_data = self.nba_service.get_shot_chart_frame(
+                player_id,
+                season,
+                season_type,
+                date_from=game_date_to_api(last_game_date) if last_game_date else None
+            )
+
+            new_last_game_date = str(shot_data['GAME_DATE'].max()) if not shot_data.empty else last_game_date
+            new_rows = self._new_rows(entry, shot_data)
+            shots = self._apply(player_id, season, season_type, entry,
+                                ShotTable.from_frame(new_rows), new_last_game_date)
+            self.baseline_service.merge_new_shots(season, season_type, shot_data)
+            self.team_service.merge_new_shots(season, season_type, shot_data)
+            return shots
+
+    def sync_season(self, season: str, season_type: str = 'Regular Season') -> Dict[str, Any]:
+        """
+        Bring a whole ingested season up to date with one league-wide call
+
+        Args:
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+
+        Returns:
+            Sync summary with the number of updated players and new shots
+
+        Raises:
+            ValueError: If the season has not been ingested yet
+            UpstreamError: If the upstream request failed
+        """
+        manifest = self.shot_store.load_manifest(season, season_type)
+        if manifest is None:
+            raise ValueError(f"{season} {season_type} has not been ingested yet")
+
+        last_game_date = manifest.get('last_game_date')
+        shot_data = self.nba_service.get_league_shot_data(
+            season,
+            season_type,
+            timeout=current_app.config['NBA_API_BULK_TIMEOUT'],
+            date_from=game_date_to_api(last_game_date) if last_game_date else None
+        )
+
+        player_ids = set(manifest.get('player_ids', []))
+        new_shot_count = 0
+        updated_players = 0
+
+        for player_id, player_data in shot_data.groupby('PLAYER_ID', sort=False):
+            player_id = int(player_id)
+            with self.shot_store.lock(season, season_type, f'player_{player_id}'):
+                entry = self.shot_store.load_player(player_id, season, season_type)
+                new_rows = self._new_rows(entry, player_data)
+
+                self._apply(player_id, season, season_type, entry,
+                            ShotTable.from_frame(new_rows),
+                            str(player_data['GAME_DATE'].max()))
+
+            if not new_rows.empty:
+                new_shot_count += len(new_rows)
+                updated_players += 1
+            player_ids.add(player_id)
+
+        if not shot_data.empty:
+            last_game_date = str(shot_data['GAME_DATE'].max())
+            self.baseline_service.merge_new_shots(season, season_type, shot_data)
+            self.team_service.merge_new_shots(season, season_type, shot_data)
+
+        manifest.update({
+            'player_ids': sorted(player_ids),
+            'player_count': len(player_ids),
+            'shots': manifest.get('shots', 0) + new_shot_count,
+            'last_game_date': last_game_date
+        })
+        self.shot_store.save_manifest(season, season_type, manifest)
+
+        summary = {
+            'season': season,
+            'season_type': season_type,
+            'updated_players': updated_players,
+            'new_shots': new_shot_count,
+            'last_game_date': last_game_date
+        }
+        logger.info(f"Synced {season} {season_type}: {summary}")
+        return summary
+
+    @staticmethod
+    def _new_rows(entry: Optional[Dict[str, Any]], shot_data):
+        """
+        Drop fetched rows that are already stored
+
+        The date window is inclusive, so the last synced game comes back again.
+
+        Returns:
+            ShotChartDetail rows of shots not in the stored entry
+        """
+        if entry is None or shot_data.empty:
+            return shot_data
+
+        known_keys = set(entry['shots'].keys())
+        fetched_keys = zip(shot_data['GAME_ID'].astype(int), shot_data['GAME_EVENT_ID'].astype(int))
+        return shot_data[[key not in known_keys for key in fetched_keys]]
+
+    def _apply(self, player_id: int, season: str, season_type: str, entry: Optional[Dict[str, Any]],
+               new_shots: ShotTable, last_game_date: Optional[str]) -> ShotTable:
+        """
+        Append new shots to a stored entry and refresh the derived data
+
+        Returns:
+            Full table of the player's shots after the append
+        """
+        if entry is None:
+            shots = new_shots
+            stats = compute_shot_stats(shots)
+            total_distance = sum(shots.distance)
+        else:
+            shots = entry['shots'].concat(new_shots)
+            # Entries stored before the distance sum was kept need one full scan
+            previous_distance = entry['meta'].get('total_distance')
+            if previous_distance is None:
+                previous_distance = sum(entry['shots'].distance)
+            stats = merge_shot_stats(entry['stats'], new_shots, previous_distance)
+            total_distance = previous_distance + sum(new_shots.distance)
+
+        if entry is None or new_shots:
+            self.shot_store.save_player(player_id, season, season_type, shots, stats,
+                                        {'last_game_date': last_game_date, 'total_distance': total_distance})
+
+        shots = self.cache_service.validate('player_shots', shots)
+        self.cache_service.set_player_shots(shots, player_id, season, season_type)
+        if shots and season_type == 'Regular Season':
+            self.cache_service.set_cached_response('player_stats', stats, player_id, season)
+
+        logger.info(f"Synced player {player_id} {season} {season_type}: {len(new_shots)} new shots")
+        return shots
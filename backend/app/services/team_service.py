@@ -0,0 +1,119 @@
+"""
+Team shot charts merged from the shot store or from roster members' shots
+"""
+
+from typing import Any, Dict, List, Optional
+import logging
+
+from app.models.shot_table import ShotTable
+from app.services.cache_service import CacheService
+from app.services.shot_store import ShotStore
+
+logger = logging.getLogger(__name__)
+
+
+class TeamService:
+    """Service serving every shot of a team for a season/season type"""
+
+    def __init__(self, shot_store: Optional[ShotStore] = None):
+        """
+        Initialize the team service
+
+        Args:
+            shot_store: Store holding team shards (defaults to the configured store)
+        """
+        self.shot_store = shot_store or ShotStore()
+        self.cache_service = CacheService()
+
+    def get_team_shots(self, team_id: int, season: str, season_type: str = 'Regular Season') -> Dict[str, Any]:
+        """
+        Get a team's shots with caching
+
+        Ingested seasons are served from the team shard of the shot store.
+        Otherwise the shots of the season's roster members are merged; those
+        go through the player shot cache and the shared upstream rate limit
+        (player shots carry no team, so a traded player's shots for other
+        teams are included there).
+
+        Args:
+            team_id: NBA team ID
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+
+        Returns:
+            Dictionary with 'shots' (ShotTable), 'source' ('store' or 'roster')
+            and 'player_ids' (roster members merged, empty for the store)
+
+        Raises:
+            UpstreamError: If the roster or a member's shots could not be fetched
+        """
+        cached = self.cache_service.get_cached_response('team_shots', team_id, season, season_type)
+        if cached is not None:
+            return cached
+
+        shots = self.shot_store.load_team_shots(team_id, season, season_type)
+        if shots is not None:
+            result = {'shots': shots, 'source': 'store', 'player_ids': []}
+        else:
+            player_ids = self._roster_player_ids(team_id, season)
+            result = {'shots': self._merge_player_shots(player_ids, season, season_type),
+                      'source': 'roster', 'player_ids': player_ids}
+
+        result = self.cache_service.validate('team_shots', result)
+        self.cache_service.set_cached_response('team_shots', result, team_id, season, season_type)
+        logger.info(f"Loaded {len(result['shots'])} shots of team {team_id} {season} {season_type} "
+                    f"from {result['source']}")
+        return result
+
+    def merge_new_shots(self, season: str, season_type: str, new_shot_data):
+        """
+        Append newly synced shots to the team shards of an ingested season
+
+        Args:
+            season: NBA season (e.g., "2023-24")
+            season_type: Type of season (Regular Season, Playoffs)
+            new_shot_data: Fetched ShotChartDetail rows; rows already in a shard are skipped
+        """
+        if new_shot_data.empty or not self.shot_store.has_season(season, season_type):
+            return
+
+        for team_id, team_data in new_shot_data.groupby('TEAM_ID', sort=False):
+            team_id = int(team_id)
+            new_shots = ShotTable.from_frame(team_data)
+            with self.shot_store.lock(season, season_type, f'team_{team_id}'):
+                stored = self.shot_store.load_team_shots(team_id, season, season_type)
+                if stored is not None:
+                    known_keys = set(stored.keys())
+                    new_shots = new_shots.take(
+                        position for position, key in enumerate(new_shots.keys()) if key not in known_keys
+                    )
+                    if not new_shots:
+                        continue
+                shots = stored.concat(new_shots) if stored is not None else new_shots
+                self.shot_store.save_team_shots(team_id, season, season_type, shots)
+
+            self.cache_service.set_cached_response(
+                'team_shots', {'shots': shots, 'source': 'store', 'player_ids': []},
+                team_id, season, season_type
+            )
+
+    def _roster_player_ids(self, team_id: int, season: str) -> List[int]:
+        """IDs of the players on a team's roster in a season (one cached call for all teams)"""
+        roster = self.cache_service.get_cached_response('roster', season)
+        if roster is None:
+            from app.services.nba_api_service import NBAApiService
+            roster = NBAApiService().get_roster(season)
+            self.cache_service.set_cached_response('roster', roster, season)
+
+        return sorted(player_id for player_id, entry in roster.items() if entry['teamId'] == team_id)
+
+    @staticmethod
+    def _merge_player_shots(player_ids: List[int], season: str, season_type: str) -> ShotTable:
+        """Concatenate roster members' shots, each fetched through the player cache"""
+        from app.services.player_service import PlayerService
+
+        player_service = PlayerService()
+        shots = ShotTable.empty()
+        for player_id in player_ids:
+            shots = shots.concat(player_service.get_player_shots(player_id, season, season_type))
+        return shots
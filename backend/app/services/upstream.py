@@ -0,0 +1,649 @@
+"""
+Upstream call policy for the NBA stats API
+
+Wraps every stats.nba.com call with a circuit breaker, a priority
+scheduler spacing attempts out, a per-attempt timeout, retries with
+exponential jittered backoff and optional hedged requests, and keeps
+rolling latency metrics per endpoint.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from collections import deque
+from datetime import datetime
+from flask import current_app, has_app_context, has_request_context
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamError(Exception):
+    """Raised when an upstream call fails after all retry attempts"""
+
+
+class UpstreamTimeoutError(UpstreamError):
+    """Raised when a single upstream attempt exceeds its timeout"""
+
+
+class CircuitOpenError(UpstreamError):
+    """Raised without calling upstream while the circuit breaker is open"""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UpstreamRejectedError(UpstreamError):
+    """Raised without calling upstream when the scheduler queue is full or the wait deadline passed"""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+        # Attempts of the rejected call already sent upstream (rejected retries)
+        self.attempts_sent = 0
+
+
+# Scheduler priorities, served in this order
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+
+class UpstreamScheduler:
+    """
+    Priority scheduler handing out upstream call slots
+
+    Slots are spaced at least min_interval apart across all callers.
+    Waiting interactive calls always get the next slot; background calls
+    only get slots no interactive call is waiting for. Each priority has
+    a queue depth limit and a maximum wait, so a background backlog is
+    shed instead of growing without bound.
+    """
+
+    def __init__(self, min_interval: float = 0.6, max_depth: Optional[Dict[str, int]] = None,
+                 max_wait: Optional[Dict[str, float]] = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            min_interval: Minimum seconds between two upstream attempts
+            max_depth: Maximum number of waiting calls per priority
+            max_wait: Maximum seconds a call may wait for a slot per priority
+        """
+        self.min_interval = min_interval
+        self.max_depth = {INTERACTIVE: 32, BACKGROUND: 64, **(max_depth or {})}
+        self.max_wait = {INTERACTIVE: 10.0, BACKGROUND: 120.0, **(max_wait or {})}
+
+        self._queue: List[List[Any]] = []
+        self._sequence = itertools.count()
+        self._next_slot = 0.0
+        self._cond = threading.Condition()
+        self._depth = {priority: 0 for priority in PRIORITIES}
+        self._waits = {priority: deque(maxlen=200) for priority in PRIORITIES}
+        self.counters = {
+            priority: {'granted': 0, 'rejected_full': 0, 'expired': 0}
+            for priority in PRIORITIES
+        }
+
+    @staticmethod
+    def current_priority() -> str:
+        """Priority of calls made by the current thread: interactive while serving a request"""
+        return INTERACTIVE if has_request_context() else BACKGROUND
+
+    def acquire(self, priority: str, max_wait: Optional[float] = None) -> float:
+        """
+        Wait for the next upstream slot available to a priority
+
+        Args:
+            priority: INTERACTIVE or BACKGROUND
+            max_wait: Seconds to wait at most (the priority's maximum if omitted or larger)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            UpstreamRejectedError: If the priority's queue is full or no slot
+                was granted before the wait deadline
+        """
+        started = time.monotonic()
+        limit = self.max_wait[priority] if max_wait is None else min(max_wait, self.max_wait[priority])
+        deadline = started + limit
+
+        with self._cond:
+            if self._depth[priority] >= self.max_depth[priority]:
+                self.counters[priority]['rejected_full'] += 1
+                raise UpstreamRejectedError(
+                    f"Upstream {priority} queue is full ({self.max_depth[priority]} waiting)",
+                    self._backlog_seconds(started)
+                )
+
+            waiter = [PRIORITIES.index(priority), next(self._sequence)]
+            heapq.heappush(self._queue, waiter)
+            self._depth[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._queue[0] is waiter and now >= self._next_slot:
+                        heapq.heappop(self._queue)
+                        self._next_slot = now + self.min_interval
+                        self.counters[priority]['granted'] += 1
+                        self._waits[priority].append(now - started)
+                        return now - started
+
+                    if now >= deadline:
+                        self._queue.remove(waiter)
+                        heapq.heapify(self._queue)
+                        self.counters[priority]['expired'] += 1
+                        raise UpstreamRejectedError(
+                            f"No upstream slot for {priority} call within {limit:.1f}s",
+                            self._backlog_seconds(now)
+                        )
+
+                    # Only the head of the queue waits for the slot time; the
+                    # others sleep until they are notified or their deadline
+                    timeout = deadline - now
+                    if self._queue[0] is waiter:
+                        timeout = min(timeout, self._next_slot - now)
+                    self._cond.wait(timeout)
+            finally:
+                self._depth[priority] -= 1
+                self._cond.notify_all()
+
+    def try_acquire(self, priority: str) -> bool:
+        """
+        Take the next slot only if it is free now and no call is waiting for it
+
+        Args:
+            priority: INTERACTIVE or BACKGROUND
+
+        Returns:
+            Whether a slot was granted
+        """
+        with self._cond:
+            now = time.monotonic()
+            if self._queue or now < self._next_slot:
+                return False
+
+            self._next_slot = now + self.min_interval
+            self.counters[priority]['granted'] += 1
+            self._waits[priority].append(0.0)
+            return True
+
+    def _backlog_seconds(self, now: float) -> float:
+        """Seconds until every currently waiting call got its slot"""
+        return max(0.0, self._next_slot - now) + len(self._queue) * self.min_interval
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get per-priority queue depth, limits, counters and wait percentiles (in milliseconds)"""
+        with self._cond:
+            priorities = {}
+            for priority in PRIORITIES:
+                waits = sorted(self._waits[priority])
+                p95 = waits[min(len(waits) - 1, int(round(0.95 * (len(waits) - 1))))] if waits else None
+                priorities[priority] = {
+                    'waiting': self._depth[priority],
+                    'max_depth': self.max_depth[priority],
+                    'max_wait': self.max_wait[priority],
+                    **self.counters[priority],
+                    'p95_wait_ms': round(p95 * 1000, 1) if p95 is not None else None
+                }
+
+        return {'min_interval': self.min_interval, 'priorities': priorities}
+
+
+class CircuitBreaker:
+    """Circuit breaker that fails fast after repeated upstream failures"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Initialize the circuit breaker
+
+        Args:
+            failure_threshold: Consecutive failed calls before the circuit opens
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current breaker state"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """
+        Check whether a call may proceed
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a trial call in flight
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.reset_timeout:
+                raise CircuitOpenError('NBA API circuit breaker is open', self.reset_timeout - elapsed)
+
+            if self._trial_in_flight:
+                raise CircuitOpenError('NBA API circuit breaker trial call in progress', 1.0)
+
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+
+    def release_trial(self):
+        """Give back a half-open trial call that never reached upstream"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("NBA API circuit breaker closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failed call, opening the circuit at the threshold"""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"NBA API circuit breaker opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get breaker state and failure count"""
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'failure_threshold': self.failure_threshold,
+            'reset_timeout': self.reset_timeout
+        }
+
+
+class LatencyTracker:
+    """Rolling latency window and outcome counters for one upstream endpoint"""
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize the tracker
+
+        Args:
+            window: Number of most recent latencies kept for percentiles
+        """
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.counters = {
+            'calls': 0,
+            'attempts': 0,
+            'retries': 0,
+            'timeouts': 0,
+            'failures': 0,
+            'rejected': 0,
+            'hedges_sent': 0,
+            'hedges_skipped': 0,
+            'hedges_won': 0
+        }
+
+    def increment(self, counter: str, amount: int = 1):
+        """Increment an outcome counter"""
+        with self._lock:
+            self.counters[counter] += amount
+
+    def record_latency(self, seconds: float):
+        """Record the latency of a successful call"""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def record_outcome(self, ok: bool, seconds: float):
+        """Record the result and total duration (retries included) of a call"""
+        with self._lock:
+            self._outcomes.append((time.monotonic(), ok, seconds))
+
+    def recent_outcomes(self, window_seconds: float) -> List[Tuple[bool, float]]:
+        """Get (ok, seconds) of the calls that finished within the last window_seconds"""
+        cutoff = time.monotonic() - window_seconds
+        with self._lock:
+            return [(ok, seconds) for finished, ok, seconds in self._outcomes if finished >= cutoff]
+
+    @property
+    def sample_count(self) -> int:
+        """Number of latencies currently in the window"""
+        return len(self._latencies)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """
+        Get a latency percentile over the current window
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds or None if no samples were recorded
+        """
+        with self._lock:
+            samples = sorted(self._latencies)
+
+        if not samples:
+            return None
+
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get counters and latency percentiles (in milliseconds)"""
+        with self._lock:
+            counters = dict(self.counters)
+
+        latency = {}
+        for pct in (50, 95, 99):
+            value = self.percentile(pct)
+            latency[f'p{pct}_ms'] = round(value * 1000, 1) if value is not None else None
+
+        return {**counters, 'samples': self.sample_count, 'latency': latency}
+
+
+class RetryPolicy:
+    """Retry, timeout and hedging policy shared by all upstream calls"""
+
+    def __init__(self, timeout: float = 30, retries: int = 3, backoff_base: float = 0.5,
+                 backoff_cap: float = 8.0, hedge_enabled: bool = False,
+                 hedge_percentile: float = 95, hedge_min_samples: int = 20,
+                 max_workers: int = 8, breaker: Optional[CircuitBreaker] = None,
+                 scheduler: Optional[UpstreamScheduler] = None):
+        """
+        Initialize the retry policy
+
+        Args:
+            timeout: Per-attempt timeout in seconds
+            retries: Number of retries after the first attempt
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_cap: Maximum backoff delay in seconds
+            hedge_enabled: Whether to send a hedged second request for slow attempts
+            hedge_percentile: Latency percentile after which a hedge is sent
+            hedge_min_samples: Samples required before hedging kicks in
+            max_workers: Size of the thread pool running upstream attempts
+            breaker: Circuit breaker guarding all calls (a default one if omitted)
+            scheduler: Scheduler spacing out attempts (a default one if omitted)
+        """
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.scheduler = scheduler or UpstreamScheduler()
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='nba-upstream')
+        self._trackers: Dict[str, LatencyTracker] = {}
+        self._trackers_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'RetryPolicy':
+        """Build a policy from Flask application config"""
+        return cls(
+            timeout=config.get('NBA_API_TIMEOUT', 30),
+            retries=config.get('NBA_API_RETRIES', 3),
+            backoff_base=config.get('NBA_API_BACKOFF_BASE', 0.5),
+            backoff_cap=config.get('NBA_API_BACKOFF_CAP', 8.0),
+            hedge_enabled=config.get('NBA_API_HEDGE', False),
+            hedge_percentile=config.get('NBA_API_HEDGE_PERCENTILE', 95),
+            max_workers=config.get('NBA_API_WORKERS', 8),
+            breaker=CircuitBreaker(
+                failure_threshold=config.get('NBA_API_BREAKER_THRESHOLD', 5),
+                reset_timeout=config.get('NBA_API_BREAKER_RESET', 30)
+            ),
+            scheduler=UpstreamScheduler(
+                min_interval=config.get('NBA_API_MIN_INTERVAL', 0.6),
+                max_depth={
+                    INTERACTIVE: config.get('NBA_API_QUEUE_DEPTH_INTERACTIVE', 32),
+                    BACKGROUND: config.get('NBA_API_QUEUE_DEPTH_BACKGROUND', 64)
+                },
+                max_wait={
+                    INTERACTIVE: config.get('NBA_API_QUEUE_WAIT_INTERACTIVE', 10.0),
+                    BACKGROUND: config.get('NBA_API_QUEUE_WAIT_BACKGROUND', 120.0)
+                }
+            )
+        )
+
+    def tracker(self, endpoint: str) -> LatencyTracker:
+        """Get (or create) the latency tracker for an endpoint"""
+        with self._trackers_lock:
+            if endpoint not in self._trackers:
+                self._trackers[endpoint] = LatencyTracker()
+            return self._trackers[endpoint]
+
+    def backoff_delay(self, retry: int) -> float:
+        """
+        Get the delay before a retry using full jitter
+
+        Args:
+            retry: Zero-based retry number
+
+        Returns:
+            Delay in seconds
+        """
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** retry)))
+
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        """
+        Get how long to wait before sending a hedged request
+
+        Returns:
+            Delay in seconds or None if hedging is disabled or lacks samples
+        """
+        if not self.hedge_enabled:
+            return None
+
+        tracker = self.tracker(endpoint)
+        if tracker.sample_count < self.hedge_min_samples:
+            return None
+
+        delay = tracker.percentile(self.hedge_percentile)
+        if delay is None or delay >= self.timeout:
+            return None
+        return delay
+
+    def call(self, endpoint: str, request: Callable[[float], Any], timeout: Optional[float] = None,
+             priority: Optional[str] = None) -> Any:
+        """
+        Run an upstream request under the policy
+
+        Every attempt first waits for a scheduler slot. Rejections by the
+        scheduler are not retried and do not count as upstream failures;
+        a half-open breaker trial claimed for the call is given back.
+
+        Args:
+            endpoint: Endpoint name used for metrics
+            request: Callable receiving the per-attempt timeout in seconds
+            timeout: Per-attempt timeout override (e.g. for bulk requests)
+            priority: Scheduler priority (interactive inside a request, background otherwise)
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            UpstreamRejectedError: If the scheduler queue is full or the wait deadline passed
+            UpstreamError: If every attempt failed or timed out
+        """
+        priority = priority or self.scheduler.current_priority()
+        tracker = self.tracker(endpoint)
+        tracker.increment('calls')
+        
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            tracker.increment('rejected')
+            raise
+        
+        last_error = None
+        started = time.monotonic()
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                tracker.increment('retries')
+                time.sleep(self.backoff_delay(attempt - 1))
+
+            try:
+                self.scheduler.acquire(priority)
+            except UpstreamRejectedError as e:
+                tracker.increment('rejected')
+                self.breaker.release_trial()
+                e.attempts_sent = attempt
+                raise
+
+            try:
+                result = self._attempt(endpoint, request, tracker, timeout or self.timeout, priority)
+                self.breaker.record_success()
+                tracker.record_outcome(True, time.monotonic() - started)
+                return result
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Upstream {endpoint} attempt {attempt + 1}/{self.retries + 1} failed: {str(e)}")
+
+        tracker.increment('failures')
+        tracker.record_outcome(False, time.monotonic() - started)
+        self.breaker.record_failure()
+        raise UpstreamError(f"{endpoint} failed after {self.retries + 1} attempts: {last_error}") from last_error
+
+    def _attempt(self, endpoint: str, request: Callable[[float], Any], tracker: LatencyTracker,
+                 timeout: float, priority: str) -> Any:
+        """
+        Run a single attempt, hedging it if it runs past the hedge delay
+
+        A hedge is another upstream call, so it is only sent if a scheduler
+        slot is free right away; it never waits in or jumps the queue.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+
+        tracker.increment('attempts')
+        primary = self._executor.submit(request, timeout)
+        pending = {primary}
+
+        hedge_delay = self.hedge_delay(endpoint)
+        if hedge_delay is not None and hedge_delay < timeout:
+            done, _ = wait(pending, timeout=hedge_delay)
+            if not done:
+                if self.scheduler.try_acquire(priority):
+                    tracker.increment('hedges_sent')
+                    pending.add(self._executor.submit(request, timeout))
+                else:
+                    tracker.increment('hedges_skipped')
+
+        last_error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+
+                if future is not primary:
+                    tracker.increment('hedges_won')
+                tracker.record_latency(time.monotonic() - started)
+                return result
+
+        if pending:
+            tracker.increment('timeouts')
+            raise UpstreamTimeoutError(f"{endpoint} timed out after {timeout}s")
+        raise last_error
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get policy settings and per-endpoint metrics"""
+        with self._trackers_lock:
+            trackers = dict(self._trackers)
+
+        return {
+            'timestamp': datetime.utcnow().isoformat(),
+            'timeout': self.timeout,
+            'retries': self.retries,
+            'hedge_enabled': self.hedge_enabled,
+            'circuit_breaker': self.breaker.snapshot(),
+            'scheduler': self.scheduler.snapshot(),
+            'endpoints': {name: tracker.snapshot() for name, tracker in trackers.items()}
+        }
+
+    def recent_health(self, window_seconds: float = 300) -> Dict[str, Any]:
+        """
+        Get error rate and latency of recent calls across all endpoints
+
+        Args:
+            window_seconds: How far back to look
+
+        Returns:
+            Call and failure counts, error rate and p95 call latency in milliseconds
+        """
+        with self._trackers_lock:
+            trackers = list(self._trackers.values())
+
+        outcomes = [outcome for tracker in trackers for outcome in tracker.recent_outcomes(window_seconds)]
+        failures = sum(1 for ok, _ in outcomes if not ok)
+        latencies = sorted(seconds for ok, seconds in outcomes if ok)
+
+        p95 = None
+        if latencies:
+            p95 = round(latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))] * 1000, 1)
+
+        return {
+            'window_seconds': window_seconds,
+            'calls': len(outcomes),
+            'failures': failures,
+            'error_rate': round(failures / len(outcomes), 3) if outcomes else 0.0,
+            'p95_ms': p95,
+            'circuit_state': self.breaker.state
+        }
+
+
+_default_policy: Optional[RetryPolicy] = None
+
+
+def get_retry_policy() -> RetryPolicy:
+    """
+    Get the retry policy for the current application
+
+    Returns:
+        The app's configured policy, or a process-wide default outside an app context
+    """
+    global _default_policy
+
+    if has_app_context() and hasattr(current_app, 'upstream_policy'):
+        return current_app.upstream_policy
+
+    if _default_policy is None:
+        _default_policy = RetryPolicy()
+    return _default_policy
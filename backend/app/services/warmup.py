@@ -0,0 +1,179 @@
+"""
+Startup warm-up of the player index and a configured warm set
+
+Runs once per process in a background thread, started by the first
+request (usually the readiness probe) so CLI commands never trigger it.
+The same thread then keeps the roster table fresh.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Builds the player index and loads the warm set of player shots"""
+
+    def __init__(self, app, player_ids: List[int], seasons: List[str],
+                 season_type: str = 'Regular Season', roster_refresh_interval: int = 21600,
+                 retry_passes: int = 3, retry_interval: float = 30):
+        """
+        Initialize the warm-up
+
+        Args:
+            app: Flask application
+            player_ids: Players whose shots are loaded
+            seasons: Seasons loaded for every player
+            season_type: Season type loaded
+            roster_refresh_interval: Seconds between roster table refreshes (0 loads it once)
+            retry_passes: Extra passes over warm set entries that failed to load
+            retry_interval: Seconds between passes
+        """
+        self.app = app
+        self.season_type = season_type
+        self.roster_refresh_interval = roster_refresh_interval
+        self.retry_passes = retry_passes
+        self.retry_interval = retry_interval
+        self.targets: List[Tuple[int, str]] = [
+            (player_id, season) for player_id in player_ids for season in seasons
+        ]
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.loaded = 0
+        self.failed = 0
+        self.errors = 0
+
+    @classmethod
+    def from_config(cls, app) -> 'Warmup':
+        """Build the warm-up from WARM_* config"""
+        return cls(
+            app,
+            player_ids=app.config.get('WARM_PLAYER_IDS', []),
+            seasons=app.config.get('WARM_SEASONS', []),
+            roster_refresh_interval=app.config.get('ROSTER_REFRESH_INTERVAL', 21600),
+            retry_passes=app.config.get('WARM_RETRY_PASSES', 3),
+            retry_interval=app.config.get('WARM_RETRY_INTERVAL', 30)
+        )
+
+    def ensure_started(self):
+        """Start the warm-up thread unless it already runs or ran"""
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self.started_at = datetime.utcnow().isoformat()
+                self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Build the player index and roster, load the warm set (retrying failed entries), then refresh the roster"""
+        from app.services.player_index import get_player_index
+        from app.services.player_service import PlayerService
+
+        with self.app.app_context():
+            player_index = get_player_index()
+            try:
+                player_index.ensure_built()
+            except Exception as e:
+                logger.error(f"Error building player index: {str(e)}")
+                self.errors += 1
+
+            self._refresh_roster(player_index)
+
+            player_service = PlayerService()
+            pending = self.targets
+            for attempt in range(self.retry_passes + 1):
+                if attempt:
+                    time.sleep(self.retry_interval)
+                pending = self._load(player_service, pending)
+                self.failed = len(pending)
+                if not pending:
+                    break
+
+        self.finished_at = datetime.utcnow().isoformat()
+        logger.info(
+            f"Warm-up finished: {self.loaded} of {len(self.targets)} warm set entries loaded, "
+            f"{self.failed} failed, {self.errors} errors"
+        )
+
+        if self.roster_refresh_interval > 0:
+            while True:
+                time.sleep(self.roster_refresh_interval)
+                with self.app.app_context():
+                    self._refresh_roster(player_index)
+
+    def _load(self, player_service, targets: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+        """Load the shots of each warm set entry, returning the entries that failed"""
+        failed = []
+        for player_id, season in targets:
+            try:
+                player_service.get_player_shots(player_id, season, self.season_type)
+                self.loaded += 1
+            except Exception as e:
+                logger.error(f"Error warming shots for player {player_id}, season {season}: {str(e)}")
+                self.errors += 1
+                failed.append((player_id, season))
+        return failed
+
+    def _refresh_roster(self, player_index):
+        """Reload the roster table, keeping the previous one if the call fails"""
+        try:
+            count = player_index.refresh_roster()
+            logger.info(f"Roster table refreshed with {count} players")
+        except Exception as e:
+            logger.error(f"Error refreshing roster table: {str(e)}")
+
+    @property
+    def finished(self) -> bool:
+        """Whether the warm-up passes ran through, whatever their errors"""
+        return self.finished_at is not None
+
+    def ready(self, max_failure_rate: float = 0.0) -> bool:
+        """
+        Whether the warm set is loaded
+
+        Args:
+            max_failure_rate: Share of warm set entries allowed to have failed every pass
+
+        Returns:
+            True once the warm-up finished with at most that share of entries failed
+        """
+        if not self.finished:
+            return False
+        return self.failed <= max_failure_rate * len(self.targets)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get warm-up progress and how much of the warm set is currently cached
+
+        `loaded` counts entries loaded by the warm-up pass; `cached` is the
+        live count of entries still cached (fresh or only kept as last known
+        good value), which drops as entries expire and is informational only.
+        Must be called inside an application context.
+        """
+        from app.services.cache_service import CacheService
+
+        cache_service = CacheService()
+        cached = sum(
+            1 for player_id, season in self.targets
+            if cache_service.has_cached_response('player_shots', player_id, season, self.season_type)
+        )
+
+        return {
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'finished': self.finished,
+            'warm_set': len(self.targets),
+            'loaded': self.loaded,
+            'failed': self.failed,
+            'cached': cached,
+            'errors': self.errors
+        }
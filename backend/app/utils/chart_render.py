@@ -0,0 +1,350 @@
+"""
+Server-side shot chart rendering to SVG and PNG
+
+Charts are drawn in shot coordinates (tenths of a foot, hoop at 0,0) on a
+half court with the basket at the top. SVG output is built as a string;
+PNG output is rasterized with numpy masks over the pixel grid and encoded
+with zlib, so neither needs an imaging library. Markers and hexbins are
+computed for all shots at once rather than drawn shot by shot.
+"""
+
+from typing import Dict, List, Tuple
+from functools import lru_cache
+import hashlib
+import json
+import struct
+import zlib
+import numpy as np
+
+from app.models.shot_table import ShotTable
+
+# Bumped whenever the drawing changes, so cached renders are not reused
+RENDER_VERSION = 1
+
+FORMATS = ('png', 'svg')
+MODES = ('markers', 'hexbin')
+
+# Image widths in pixels; a fixed set keeps the court layer cache small
+WIDTHS = (250, 500, 750, 1000, 1500)
+DEFAULT_WIDTH = 500
+
+# Court extent in shot coordinates
+COURT_LEFT, COURT_RIGHT = -250, 250
+COURT_TOP, COURT_BOTTOM = -47.5, 422.5
+COURT_WIDTH = COURT_RIGHT - COURT_LEFT
+COURT_HEIGHT = COURT_BOTTOM - COURT_TOP
+
+# Hexbin cell radius in shot coordinates
+HEX_SIZE = 15
+
+BACKGROUND = (250, 247, 240)
+LINE = (60, 60, 60)
+MADE = (34, 139, 34)
+MISSED = (200, 40, 40)
+COLD = (40, 90, 200)
+HOT = (220, 40, 40)
+
+# Straight court lines: (x1, y1, x2, y2)
+_SEGMENTS = (
+    (COURT_LEFT, COURT_TOP, COURT_RIGHT, COURT_TOP),          # baseline
+    (COURT_LEFT, COURT_TOP, COURT_LEFT, COURT_BOTTOM),        # sidelines
+    (COURT_RIGHT, COURT_TOP, COURT_RIGHT, COURT_BOTTOM),
+    (COURT_LEFT, COURT_BOTTOM, COURT_RIGHT, COURT_BOTTOM),    # half court line
+    (-80, COURT_TOP, -80, 142.5),                             # paint
+    (80, COURT_TOP, 80, 142.5),
+    (-60, COURT_TOP, -60, 142.5),
+    (60, COURT_TOP, 60, 142.5),
+    (-80, 142.5, 80, 142.5),                                  # free throw line
+    (-30, -7.5, 30, -7.5),                                    # backboard
+    (-220, COURT_TOP, -220, 92.5),                            # corner threes
+    (220, COURT_TOP, 220, 92.5),
+)
+
+# Court arcs: (center x, center y, radius, lowest y drawn)
+_ARCS = (
+    (0, 0, 7.5, None),                   # hoop
+    (0, 0, 40, 0),                       # restricted area
+    (0, 142.5, 60, None),                # free throw circle
+    (0, 0, 237.5, 92.5),                 # three point arc
+    (0, COURT_BOTTOM, 60, None),         # center circle
+)
+
+
+def _hex_bins(xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Axial (q, r) coordinates of the pointy-top hexagons containing points
+
+    Args:
+        xs, ys: Point coordinates in shot coordinates
+
+    Returns:
+        Rounded q and r arrays
+    """
+    q = (np.sqrt(3) / 3 * xs - ys / 3) / HEX_SIZE
+    r = (2 / 3 * ys) / HEX_SIZE
+    s = -q - r
+
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def _hex_key(q: np.ndarray, r: np.ndarray) -> np.ndarray:
+    """Single integer key per hexagon"""
+    return (q + 1000) * 2000 + (r + 1000)
+
+
+def _hexbin(shots: ShotTable) -> Dict[str, np.ndarray]:
+    """
+    Bin shots into hexagons
+
+    Returns:
+        Hexagon keys, centers, attempts and FG% arrays (one entry per hexagon)
+    """
+    xs = np.frombuffer(shots.loc_x, dtype=np.int16).astype(np.float64)
+    ys = np.frombuffer(shots.loc_y, dtype=np.int16).astype(np.float64)
+    made = np.frombuffer(shots.made, dtype=np.uint8)
+
+    q, r = _hex_bins(xs, ys)
+    keys, inverse = np.unique(_hex_key(q, r), return_inverse=True)
+    attempts = np.bincount(inverse, minlength=len(keys))
+    makes = np.bincount(inverse, weights=made, minlength=len(keys))
+
+    hex_q = keys // 2000 - 1000
+    hex_r = keys % 2000 - 1000
+    return {
+        'keys': keys,
+        'x': HEX_SIZE * np.sqrt(3) * (hex_q + hex_r / 2),
+        'y': HEX_SIZE * 1.5 * hex_r,
+        'attempts': attempts,
+        'percentage': makes / np.maximum(attempts, 1)
+    }
+
+
+def _hex_colors(percentage: np.ndarray) -> np.ndarray:
+    """Blend from cold to hot between 30% and 60% FG"""
+    t = np.clip((percentage - 0.3) / 0.3, 0, 1)[:, None]
+    return (np.array(COLD) * (1 - t) + np.array(HOT) * t).astype(np.uint8)
+
+
+def _hex_opacity(attempts: np.ndarray) -> np.ndarray:
+    """Opacity growing with the attempts of a hexagon relative to the busiest one"""
+    if not len(attempts):
+        return np.empty(0)
+    return 0.35 + 0.65 * np.sqrt(attempts / attempts.max())
+
+
+def _rgb(color) -> str:
+    """SVG color string of an RGB tuple"""
+    return f'rgb({color[0]},{color[1]},{color[2]})'
+
+
+def render_svg(shots: ShotTable, mode: str = 'markers', width: int = 500) -> bytes:
+    """
+    Render a shot chart as SVG
+
+    Args:
+        shots: Shots to draw
+        mode: 'markers' (made/missed) or 'hexbin'
+        width: Image width in pixels; the height follows the court aspect ratio
+
+    Returns:
+        UTF-8 encoded SVG document
+    """
+    height = round(width * COURT_HEIGHT / COURT_WIDTH)
+    parts: List[str] = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="{COURT_LEFT} {COURT_TOP} {COURT_WIDTH} {COURT_HEIGHT}">',
+        f'<rect x="{COURT_LEFT}" y="{COURT_TOP}" width="{COURT_WIDTH}" height="{COURT_HEIGHT}" '
+        f'fill="{_rgb(BACKGROUND)}"/>'
+    ]
+
+    if mode == 'hexbin':
+        bins = _hexbin(shots)
+        angles = np.radians(np.arange(6) * 60 + 30)
+        corner_x = bins['x'][:, None] + HEX_SIZE * np.cos(angles)
+        corner_y = bins['y'][:, None] + HEX_SIZE * np.sin(angles)
+        colors = _hex_colors(bins['percentage'])
+        opacity = _hex_opacity(bins['attempts'])
+        for cx, cy, color, alpha in zip(corner_x, corner_y, colors, opacity):
+            points = ' '.join(f'{x:.1f},{y:.1f}' for x, y in zip(cx, cy))
+            parts.append(f'<polygon points="{points}" fill="{_rgb(color)}" fill-opacity="{alpha:.2f}"/>')
+    else:
+        xs = np.frombuffer(shots.loc_x, dtype=np.int16)
+        ys = np.frombuffer(shots.loc_y, dtype=np.int16)
+        made = np.frombuffer(shots.made, dtype=np.uint8).astype(bool)
+        parts.append(f'<g fill="{_rgb(MADE)}" fill-opacity="0.75">')
+        parts.extend(f'<circle cx="{x}" cy="{y}" r="4"/>' for x, y in zip(xs[made], ys[made]))
+        parts.append('</g>')
+        parts.append(f'<g stroke="{_rgb(MISSED)}" stroke-width="1.5" stroke-opacity="0.75">')
+        parts.extend(f'<path d="M{x - 3} {y - 3}l6 6m0 -6l-6 6"/>' for x, y in zip(xs[~made], ys[~made]))
+        parts.append('</g>')
+
+    parts.append(f'<g fill="none" stroke="{_rgb(LINE)}" stroke-width="2">')
+    parts.extend(f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}"/>' for x1, y1, x2, y2 in _SEGMENTS)
+    for cx, cy, radius, min_y in _ARCS:
+        if min_y is None:
+            parts.append(f'<circle cx="{cx}" cy="{cy}" r="{radius}"/>')
+        else:
+            # Arc between the points where the circle crosses y = min_y, through the far side
+            half = np.sqrt(max(radius ** 2 - (min_y - cy) ** 2, 0))
+            parts.append(f'<path d="M{cx - half:.1f} {min_y} A{radius} {radius} 0 {int(min_y < cy)} 0 '
+                         f'{cx + half:.1f} {min_y}"/>')
+    parts.append('</g></svg>')
+    return ''.join(parts).encode('utf-8')
+
+
+@lru_cache(maxsize=len(WIDTHS))
+def _court_layer(width: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Court line mask and pixel-center shot coordinates for an image width
+
+    Returns:
+        (line mask, x grid, y grid); cached because the court never changes
+    """
+    height = round(width * COURT_HEIGHT / COURT_WIDTH)
+    scale = width / COURT_WIDTH
+    half_line = max(1.0, 1.2 / scale)
+
+    grid_y, grid_x = np.mgrid[0:height, 0:width].astype(np.float32)
+    grid_x = (grid_x + 0.5) / scale + COURT_LEFT
+    grid_y = (grid_y + 0.5) / scale + COURT_TOP
+
+    mask = np.zeros((height, width), dtype=bool)
+    for x1, y1, x2, y2 in _SEGMENTS:
+        x1, x2 = max(x1, COURT_LEFT + half_line), min(x2, COURT_RIGHT - half_line)
+        y1, y2 = max(y1, COURT_TOP + half_line), min(y2, COURT_BOTTOM - half_line)
+        mask |= ((grid_x >= x1 - half_line) & (grid_x <= x2 + half_line) &
+                 (grid_y >= y1 - half_line) & (grid_y <= y2 + half_line))
+    for cx, cy, radius, min_y in _ARCS:
+        ring = np.abs(np.hypot(grid_x - cx, grid_y - cy) - radius) <= half_line
+        if min_y is not None:
+            ring &= grid_y >= min_y
+        mask |= ring
+
+    for array in (mask, grid_x, grid_y):
+        array.setflags(write=False)
+    return mask, grid_x, grid_y
+
+
+def _stamp(image: np.ndarray, xs: np.ndarray, ys: np.ndarray, offsets: np.ndarray, color) -> None:
+    """Paint a pixel stencil centered on every point in one indexing operation"""
+    if not len(xs):
+        return
+    height, width = image.shape[:2]
+    px = (xs[:, None] + offsets[None, :, 0]).ravel()
+    py = (ys[:, None] + offsets[None, :, 1]).ravel()
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    image[py[inside], px[inside]] = color
+
+
+def _stencils(scale: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Filled disc and X stencils as (dx, dy) pixel offsets"""
+    radius = max(2, round(4 * scale))
+    dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    disc = np.stack([dx[dx ** 2 + dy ** 2 <= radius ** 2], dy[dx ** 2 + dy ** 2 <= radius ** 2]], axis=1)
+
+    arm = max(2, round(3 * scale))
+    steps = np.arange(-arm, arm + 1)
+    cross = np.concatenate([
+        np.stack([steps, steps], axis=1), np.stack([steps, -steps], axis=1),
+        np.stack([steps + 1, steps], axis=1), np.stack([steps + 1, -steps], axis=1)
+    ])
+    return disc, cross
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    """
+    Encode an RGB image as PNG
+
+    Args:
+        image: (height, width, 3) uint8 array
+
+    Returns:
+        PNG file bytes
+    """
+    height, width = image.shape[:2]
+    rows = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 0] = 0  # no per-row filter
+    rows[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n' +
+            chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)) +
+            chunk(b'IEND', b''))
+
+
+def render_png(shots: ShotTable, mode: str = 'markers', width: int = 500) -> bytes:
+    """
+    Render a shot chart as PNG
+
+    Args:
+        shots: Shots to draw
+        mode: 'markers' (made/missed) or 'hexbin'
+        width: Image width in pixels; the height follows the court aspect ratio
+
+    Returns:
+        PNG file bytes
+    """
+    lines, grid_x, grid_y = _court_layer(width)
+    scale = width / COURT_WIDTH
+    image = np.empty(lines.shape + (3,), dtype=np.uint8)
+    image[:] = BACKGROUND
+
+    if mode == 'hexbin':
+        bins = _hexbin(shots)
+        if len(bins['keys']):
+            # Hexagon of every pixel, looked up among the hexagons that have shots
+            q, r = _hex_bins(grid_x, grid_y)
+            pixel_keys = _hex_key(q, r)
+            slots = np.clip(np.searchsorted(bins['keys'], pixel_keys), 0, len(bins['keys']) - 1)
+            covered = bins['keys'][slots] == pixel_keys
+
+            colors = _hex_colors(bins['percentage']).astype(np.float32)
+            alpha = _hex_opacity(bins['attempts']).astype(np.float32)[:, None]
+            blended = (colors * alpha + np.array(BACKGROUND, dtype=np.float32) * (1 - alpha)).astype(np.uint8)
+            image[covered] = blended[slots[covered]]
+    else:
+        xs = np.round((np.frombuffer(shots.loc_x, dtype=np.int16) - COURT_LEFT) * scale).astype(np.int64)
+        ys = np.round((np.frombuffer(shots.loc_y, dtype=np.int16) - COURT_TOP) * scale).astype(np.int64)
+        made = np.frombuffer(shots.made, dtype=np.uint8).astype(bool)
+        disc, cross = _stencils(scale)
+        _stamp(image, xs[~made], ys[~made], cross, MISSED)
+        _stamp(image, xs[made], ys[made], disc, MADE)
+
+    image[lines] = LINE
+    return encode_png(image)
+
+
+RENDERERS = {'png': render_png, 'svg': render_svg}
+MIMETYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+def chart_digest(shots: ShotTable, fmt: str, mode: str, width: int) -> str:
+    """
+    Content hash of a chart: identical shots and options render identical bytes
+
+    Args:
+        shots: Shots to draw
+        fmt: 'png' or 'svg'
+        mode: 'markers' or 'hexbin'
+        width: Image width in pixels
+
+    Returns:
+        Hex digest used as cache key and ETag
+    """
+    digest = hashlib.sha256(f'{RENDER_VERSION}:{fmt}:{mode}:{width}:'.encode())
+    # Rows and code lists only: tables with equal content but different
+    # generations (every take() or re-fetch) must share their renders
+    digest.update(json.dumps([shots.zones, shots.shot_types]).encode())
+    for column in shots.columns().values():
+        digest.update(column.tobytes())
+    return digest.hexdigest()[:32]
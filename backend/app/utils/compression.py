@@ -0,0 +1,197 @@
+"""
+Transparent compression of large cache values
+"""
+
+from typing import Any, Dict
+import itertools
+import logging
+import pickle
+import sys
+import threading
+import time
+import zlib
+
+# zstandard is optional, zlib is always available
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Elements of a container looked at when estimating its size
+_SAMPLE_ITEMS = 16
+
+
+def estimated_size(value: Any, depth: int = 3) -> int:
+    """
+    Cheaply estimate the pickled size of a value
+
+    Buffers and shot tables report their exact size; containers are
+    extrapolated from a sample of their elements, so large values cost a
+    bounded amount of work instead of a full pickle.
+
+    Args:
+        value: Value to estimate
+        depth: Levels of nested containers to look into
+
+    Returns:
+        Estimated size in bytes
+    """
+    if isinstance(value, (bytes, bytearray, memoryview, str)):
+        return len(value)
+    if hasattr(value, 'nbytes'):
+        return value.nbytes
+    if depth <= 0:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        if not value:
+            return 0
+        sample = list(itertools.islice(value.items(), _SAMPLE_ITEMS))
+        sampled = sum(estimated_size(key, depth - 1) + estimated_size(item, depth - 1) for key, item in sample)
+        return sampled * len(value) // len(sample)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if not value:
+            return 0
+        sample = list(itertools.islice(value, _SAMPLE_ITEMS))
+        return sum(estimated_size(item, depth - 1) for item in sample) * len(value) // len(sample)
+    if hasattr(value, '__dict__'):
+        return estimated_size(vars(value), depth - 1)
+    return sys.getsizeof(value)
+
+
+class CompressedValue:
+    """Cache envelope holding a compressed, pickled value"""
+
+    __slots__ = ('codec', 'payload', 'raw_size')
+
+    def __init__(self, codec: str, payload: bytes, raw_size: int):
+        self.codec = codec
+        self.payload = payload
+        self.raw_size = raw_size
+
+    def __getstate__(self):
+        return (self.codec, self.payload, self.raw_size)
+
+    def __setstate__(self, state):
+        self.codec, self.payload, self.raw_size = state
+
+
+class ValueCompressor:
+    """Compresses values above a size threshold and tracks ratio and CPU cost"""
+
+    def __init__(self, codec: str = 'zlib', level: int = 6, threshold: int = 16384):
+        """
+        Initialize the compressor
+
+        Args:
+            codec: 'zstd', 'zlib' or 'none' (zstd falls back to zlib if not installed)
+            level: Compression level of the codec
+            threshold: Minimum (estimated) pickled size in bytes before a value is compressed
+        """
+        if codec == 'zstd' and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed, falling back to zlib cache compression")
+            codec = 'zlib'
+
+        self.codec = codec
+        self.level = level
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'values_compressed': 0,
+            'values_skipped': 0,
+            'values_decompressed': 0,
+            'raw_bytes': 0,
+            'compressed_bytes': 0,
+            'compress_cpu_seconds': 0.0,
+            'decompress_cpu_seconds': 0.0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ValueCompressor':
+        """Build a compressor from Flask application config"""
+        return cls(
+            codec=config.get('CACHE_COMPRESSION', 'zlib'),
+            level=config.get('CACHE_COMPRESSION_LEVEL', 6),
+            threshold=config.get('CACHE_COMPRESSION_THRESHOLD', 16384)
+        )
+
+    def _count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def compress(self, value: Any) -> Any:
+        """
+        Compress a value if it is large enough
+
+        Args:
+            value: Value about to be cached
+
+        Returns:
+            CompressedValue envelope, or the value unchanged
+        """
+        if self.codec == 'none' or value is None:
+            return value
+
+        # Small values are stored as they are; the cache backend pickles
+        # them anyway, so only values worth compressing are pickled here
+        if estimated_size(value) < self.threshold:
+            self._count(values_skipped=1)
+            return value
+
+        started = time.thread_time()
+        raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if self.codec == 'zstd':
+            payload = zstandard.ZstdCompressor(level=self.level).compress(raw)
+        else:
+            payload = zlib.compress(raw, self.level)
+
+        self._count(
+            values_compressed=1,
+            raw_bytes=len(raw),
+            compressed_bytes=len(payload),
+            compress_cpu_seconds=time.thread_time() - started
+        )
+        return CompressedValue(self.codec, payload, len(raw))
+
+    def decompress(self, value: Any) -> Any:
+        """
+        Restore a value read from the cache
+
+        Args:
+            value: Cached value, possibly a CompressedValue envelope
+
+        Returns:
+            The original value
+        """
+        if not isinstance(value, CompressedValue):
+            return value
+
+        started = time.thread_time()
+        if value.codec == 'zstd':
+            raw = zstandard.ZstdDecompressor().decompress(value.payload, max_output_size=value.raw_size)
+        else:
+            raw = zlib.decompress(value.payload)
+        result = pickle.loads(raw)
+
+        self._count(values_decompressed=1, decompress_cpu_seconds=time.thread_time() - started)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Get compression counters, ratio and CPU time"""
+        with self._lock:
+            stats = dict(self._stats)
+
+        stats['codec'] = self.codec
+        stats['level'] = self.level
+        stats['threshold'] = self.threshold
+        stats['compression_ratio'] = (
+            round(stats['raw_bytes'] / stats['compressed_bytes'], 2) if stats['compressed_bytes'] else None
+        )
+        stats['compress_cpu_seconds'] = round(stats['compress_cpu_seconds'], 4)
+        stats['decompress_cpu_seconds'] = round(stats['decompress_cpu_seconds'], 4)
+        return stats
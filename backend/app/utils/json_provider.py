@@ -0,0 +1,59 @@
+"""
+Fast JSON provider for API responses
+
+Serializes with orjson when it is installed. Output matches Flask's default
+provider (sorted keys, indentation in debug mode, RFC 822 datetimes via the
+same default hook); anything orjson rejects, such as integers above 64 bits,
+falls back to the standard library encoder.
+"""
+
+from typing import Any
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is optional, the stdlib encoder is always available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# dumps() keyword arguments with an orjson equivalent
+_SUPPORTED_DUMPS_KWARGS = {'indent', 'separators'}
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider encoding with orjson"""
+
+    def _encode(self, obj: Any, indent: bool = False) -> bytes:
+        """Encode to UTF-8 JSON bytes, raising TypeError for unsupported values"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize to a JSON string (stdlib for options orjson does not have)"""
+        if set(kwargs) - _SUPPORTED_DUMPS_KWARGS:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._encode(obj, bool(kwargs.get('indent'))).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        """Deserialize from a JSON string or bytes"""
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Build a JSON response from bytes, without an intermediate str"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._encode(obj, indent) + b'\n'
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,150 @@
+"""
+Non-blocking, structured logging
+
+Request threads only put records on a bounded in-memory queue; a
+QueueListener thread formats and writes them. Messages on hot paths use
+lazy %-style arguments, which are merged in the listener, and events
+logged on every request (cache hits, searches) can be sampled. Output is
+one JSON object per line carrying the id of the request that logged it.
+"""
+
+from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+import atexit
+import json
+import logging
+import queue
+import random
+import uuid
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Listener of the most recently configured app, stopped when reconfiguring
+_listener: Optional[QueueListener] = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler leaving all formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue is in-process, so records (args and exc_info included)
+        # are handed over as they are instead of being formatted here
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        # Never block a request on a full queue; drop the record instead
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the id of the current request to records"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = g.get('request_id') if has_request_context() else None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the records of high-frequency events"""
+
+    def __init__(self, rates: Dict[str, float]):
+        """
+        Initialize the filter
+
+        Args:
+            rates: Fraction of records kept per event name (the record's
+                `event` extra); records of other events are always kept
+        """
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(getattr(record, 'event', None))
+        if rate is None:
+            return True
+
+        # Kept records say how many they stand for
+        record.sample_rate = rate
+        return rate > 0 and random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None)
+        }
+        for extra in ('event', 'sample_rate'):
+            if hasattr(record, extra):
+                entry[extra] = getattr(record, extra)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(app):
+    """
+    Route all logging through a queue and assign request ids
+
+    Replaces the root logger's handlers, so it also takes over from
+    logging.basicConfig(). The request id is taken from the X-Request-ID
+    header if present, generated otherwise, and echoed in the response.
+
+    Args:
+        app: Flask application (uses LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE
+            and LOG_SAMPLE_RATES from its config)
+    """
+    global _listener
+
+    stream_handler = logging.StreamHandler()
+    if app.config['LOG_FORMAT'] == 'json':
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.Queue(maxsize=app.config['LOG_QUEUE_SIZE'])
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(app.config['LOG_SAMPLE_RATES']))
+    queue_handler.addFilter(RequestIdFilter())
+
+    if _listener is None:
+        atexit.register(_stop_listener)
+    else:
+        _listener.stop()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(app.config['LOG_LEVEL'])
+
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER, '')[:64] or uuid.uuid4().hex
+
+    @app.after_request
+    def echo_request_id(response):
+        if 'request_id' in g:
+            response.headers[REQUEST_ID_HEADER] = g.request_id
+        return response
+
+
+def _stop_listener():
+    """Flush queued records at exit"""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
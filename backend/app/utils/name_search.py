@@ -0,0 +1,128 @@
+"""
+Typo-tolerant, ranked player name search
+
+Names are normalized (accents and punctuation stripped, lowercased) and
+indexed three ways at build time: exact names, sorted name tokens and
+full names for prefix lookups, and trigram posting lists for substring
+and fuzzy matches. A query touches only the posting lists of its own
+trigrams, so it stays well under a millisecond over the full historical
+player list.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+import re
+import unicodedata
+
+# Match tiers, best first
+EXACT = 3
+PREFIX = 2
+SUBSTRING = 1
+FUZZY = 0
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a name and strip accents and punctuation ("Jokić" -> "jokic")"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    ascii_name = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(' ', ascii_name.lower()).strip()
+
+
+def _trigrams(name: str) -> set:
+    """Trigrams of a normalized name padded with word boundaries"""
+    padded = f' {name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameSearchIndex:
+    """Exact, prefix and trigram indexes over a list of names"""
+
+    # Fuzzy candidates scored per query, by number of shared trigrams
+    MAX_FUZZY_CANDIDATES = 64
+    MIN_FUZZY_SCORE = 0.45
+
+    def __init__(self, names: Sequence[str]):
+        """
+        Build the index
+
+        Args:
+            names: Display names (positions in this list are returned by search)
+        """
+        self.names = [normalize_name(name) for name in names]
+
+        self._exact: Dict[str, List[int]] = {}
+        tokens: List[Tuple[str, int]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._gram_counts: List[int] = []
+
+        for position, name in enumerate(self.names):
+            self._exact.setdefault(name, []).append(position)
+            tokens.extend((token, position) for token in name.split())
+
+            grams = _trigrams(name)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+        tokens.sort()
+        self._tokens = [token for token, _ in tokens]
+        self._token_positions = [position for _, position in tokens]
+
+        sorted_names = sorted((name, position) for position, name in enumerate(self.names))
+        self._sorted_names = [name for name, _ in sorted_names]
+        self._sorted_name_positions = [position for _, position in sorted_names]
+
+    def search(self, query: str) -> Dict[int, Tuple[int, float]]:
+        """
+        Find names matching a query
+
+        Args:
+            query: Raw search query
+
+        Returns:
+            Match tier and similarity score (0..1) keyed by name position
+        """
+        query = normalize_name(query)
+        if not query:
+            return {}
+
+        matches: Dict[int, Tuple[int, float]] = {}
+
+        for position in self._exact.get(query, ()):
+            matches[position] = (EXACT, 1.0)
+
+        # Any name token, or the full name, starting with the query
+        for keys, positions in ((self._tokens, self._token_positions),
+                                (self._sorted_names, self._sorted_name_positions)):
+            start = bisect_left(keys, query)
+            end = bisect_left(keys, query + '\x7f', start)
+            for position in positions[start:end]:
+                if position not in matches:
+                    matches[position] = (PREFIX, len(query) / len(self.names[position]))
+
+        # Substring and fuzzy matches share the trigram counts
+        query_grams = _trigrams(query)
+        postings = [self._postings[gram] for gram in query_grams if gram in self._postings]
+        shared = Counter(chain.from_iterable(postings))
+
+        inner_grams = len({query[i:i + 3] for i in range(len(query) - 2)})
+        if inner_grams:
+            for position, count in shared.items():
+                if count >= inner_grams and position not in matches and query in self.names[position]:
+                    matches[position] = (SUBSTRING, len(query) / len(self.names[position]))
+
+        query_count = len(query_grams)
+        for position, count in shared.most_common(self.MAX_FUZZY_CANDIDATES):
+            if position in matches or count < 2:
+                continue
+            coverage = count / query_count
+            dice = 2 * count / (query_count + self._gram_counts[position])
+            score = (coverage + dice) / 2
+            if score >= self.MIN_FUZZY_SCORE:
+                matches[position] = (FUZZY, score)
+
+        return matches
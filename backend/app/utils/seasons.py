@@ -0,0 +1,37 @@
+"""
+NBA season and date helpers
+"""
+
+from typing import Optional
+from datetime import date
+
+
+def current_season(today: Optional[date] = None) -> str:
+    """
+    Get the in-progress (or upcoming) NBA season
+
+    Seasons roll over in October, so from October on the season starting
+    this year is current.
+
+    Args:
+        today: Date to evaluate (defaults to today)
+
+    Returns:
+        Season string (e.g., "2023-24")
+    """
+    today = today or date.today()
+    start_year = today.year if today.month >= 10 else today.year - 1
+    return f"{start_year}-{str(start_year + 1)[2:]}"
+
+
+def game_date_to_api(game_date: str) -> str:
+    """
+    Convert a ShotChartDetail GAME_DATE into the API date filter format
+
+    Args:
+        game_date: Date as YYYYMMDD (e.g., "20231025")
+
+    Returns:
+        Date as MM/DD/YYYY (e.g., "10/25/2023")
+    """
+    return f"{game_date[4:6]}/{game_date[6:8]}/{game_date[:4]}"
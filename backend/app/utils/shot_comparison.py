@@ -0,0 +1,92 @@
+"""
+Vectorized zone and distance comparisons across players
+
+All players' shots are stacked into flat numpy arrays once, then every
+(player, group) count comes out of a single bincount per measure.
+"""
+
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+from app.models.shot_table import ShotTable
+
+# Lower bounds (feet) of the distance bands, with their labels
+DISTANCE_BANDS = (0, 4, 10, 16, 24)
+DISTANCE_BAND_LABELS = ('0-3 ft', '4-9 ft', '10-15 ft', '16-23 ft', '24+ ft')
+
+
+def _group_table(player_groups: np.ndarray, made: np.ndarray, player_count: int,
+                 labels: Sequence[str]) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    Count attempts/makes per (player, group) and derive FG% and differences
+
+    Args:
+        player_groups: player index * len(labels) + group index, per shot
+        made: Made flag per shot
+        player_count: Number of players
+        labels: Group labels
+
+    Returns:
+        Per group label: attempts, made, fieldGoalPercentage and difference
+        (FG% minus the first player's FG%), each a list in player order
+    """
+    size = player_count * len(labels)
+    attempts = np.bincount(player_groups, minlength=size).reshape(player_count, len(labels))
+    makes = np.bincount(player_groups, weights=made, minlength=size).reshape(player_count, len(labels))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentages = np.where(attempts > 0, makes / attempts, np.nan)
+    differences = percentages - percentages[0]
+
+    def as_list(values: np.ndarray) -> List[Any]:
+        return [None if np.isnan(value) else round(float(value), 3) for value in values]
+
+    table = {}
+    for group, label in enumerate(labels):
+        if not attempts[:, group].any():
+            continue
+        table[label] = {
+            'attempts': attempts[:, group].astype(int).tolist(),
+            'made': makes[:, group].astype(int).tolist(),
+            'fieldGoalPercentage': as_list(percentages[:, group]),
+            'difference': as_list(differences[:, group])
+        }
+    return table
+
+
+def compare_shot_tables(tables: Sequence[ShotTable]) -> Dict[str, Dict[str, Dict[str, List[Any]]]]:
+    """
+    Compare players per basic shot zone and per distance band
+
+    Args:
+        tables: One shot table per player; the first is the reference for differences
+
+    Returns:
+        Dictionary with 'zones' and 'distanceBands' aggregate tables
+    """
+    zones: List[str] = []
+    for table in tables:
+        zones.extend(zone for zone in table.zones if zone not in zones)
+    zones.sort()
+
+    player_index, zone_index, distances, made = [], [], [], []
+    for player, table in enumerate(tables):
+        # Map the table's own zone codes onto the shared, sorted zone list
+        code_map = np.array([zones.index(zone) for zone in table.zones] or [0], dtype=np.intp)
+        player_index.append(np.full(len(table), player, dtype=np.intp))
+        zone_index.append(code_map[np.frombuffer(table.zone, dtype=np.uint8).astype(np.intp)])
+        distances.append(np.frombuffer(table.distance, dtype=np.uint16))
+        made.append(np.frombuffer(table.made, dtype=np.uint8))
+
+    player_index = np.concatenate(player_index) if tables else np.empty(0, dtype=np.intp)
+    zone_index = np.concatenate(zone_index) if tables else np.empty(0, dtype=np.intp)
+    distances = np.concatenate(distances) if tables else np.empty(0, dtype=np.uint16)
+    made = np.concatenate(made).astype(np.float64) if tables else np.empty(0)
+
+    band_index = np.digitize(distances, DISTANCE_BANDS) - 1
+
+    return {
+        'zones': _group_table(player_index * len(zones) + zone_index, made, len(tables), zones),
+        'distanceBands': _group_table(player_index * len(DISTANCE_BANDS) + band_index, made,
+                                      len(tables), DISTANCE_BAND_LABELS)
+    }
@@ -0,0 +1,133 @@
+"""
+Binary encodings of shot responses, picked by content negotiation
+
+- application/json: the default
+- application/msgpack: the same payload as the JSON response, packed with MessagePack
+- application/vnd.apache.arrow.stream: an Arrow IPC stream with one row per
+  shot. Record batches wrap the ShotTable column buffers directly, so unpaged
+  responses are produced without copying the shot data; response metadata
+  travels in the schema metadata.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import json
+
+# Both encoders are optional; without them clients get JSON
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import pyarrow
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+from app.models.shot_table import SHOT_FIELDS, ShotTable
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+# Also accepted for MessagePack
+_MSGPACK_ALIASES = ('application/x-msgpack',)
+
+# Rows per Arrow record batch
+ARROW_BATCH_ROWS = 65536
+
+
+def negotiate_encoding(accept, allow_arrow: bool = True) -> str:
+    """
+    Pick the response encoding from an Accept header
+
+    Args:
+        accept: werkzeug MIMEAccept of the request
+        allow_arrow: Whether the response is a shot list Arrow can represent
+
+    Returns:
+        Media type of the encoding to use (JSON unless a binary one is preferred)
+    """
+    offers = [JSON]
+    if MSGPACK_AVAILABLE:
+        offers.extend((MSGPACK,) + _MSGPACK_ALIASES)
+    if ARROW_AVAILABLE and allow_arrow:
+        offers.append(ARROW_STREAM)
+
+    best = accept.best_match(offers, default=JSON)
+    return MSGPACK if best in _MSGPACK_ALIASES else best
+
+
+def encode_msgpack(payload: Dict[str, Any]) -> bytes:
+    """Pack a response payload with MessagePack"""
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def _arrow_columns(shots: ShotTable, fields: Sequence[str]) -> Dict[str, Any]:
+    """Arrow arrays over the table's column buffers for the requested fields"""
+    pa = pyarrow
+    rows = len(shots)
+
+    def wrap(column, arrow_type):
+        # Zero-copy: the array.array buffer becomes the Arrow values buffer
+        return pa.Array.from_buffers(arrow_type, rows, [None, pa.py_buffer(column)])
+
+    def dictionary(codes, names: List[str]):
+        return pa.DictionaryArray.from_arrays(wrap(codes, pa.uint8()), pa.array(names, type=pa.string()))
+
+    columns: Dict[str, Any] = {}
+    for field in fields:
+        if field == 'id':
+            # Shot IDs are built from these two; strings would need a copy
+            columns['gameId'] = wrap(shots.game_id, pa.int32())
+            columns['eventId'] = wrap(shots.event_id, pa.int32())
+        elif field == 'locationX':
+            columns[field] = wrap(shots.loc_x, pa.int16())
+        elif field == 'locationY':
+            columns[field] = wrap(shots.loc_y, pa.int16())
+        elif field == 'shotDistance':
+            columns[field] = wrap(shots.distance, pa.uint16())
+        elif field == 'shotMade':
+            columns[field] = wrap(shots.made, pa.uint8()).cast(pa.bool_())
+        elif field == 'shotType':
+            columns[field] = dictionary(shots.shot_type, shots.shot_types)
+        elif field == 'period':
+            columns[field] = wrap(shots.period, pa.uint8())
+        elif field == 'timeRemaining':
+            # Seconds remaining in the period rather than "M:SS" strings
+            columns['clock'] = wrap(shots.clock, pa.uint16())
+        elif field == 'shotZone':
+            columns[field] = dictionary(shots.zone, shots.zones)
+    return columns
+
+
+def encode_arrow(shots: ShotTable, positions: Optional[Sequence[int]] = None,
+                 fields: Optional[Sequence[str]] = None, metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Write shots as an Arrow IPC stream
+
+    Args:
+        shots: Shot table (typically the cached entry)
+        positions: Row positions to include (all rows if omitted)
+        fields: SHOT_FIELDS to include (all if omitted); 'id' is sent as
+            gameId/eventId and 'timeRemaining' as clock seconds
+        metadata: Response metadata stored as JSON under the schema's 'response' key
+
+    Returns:
+        Arrow IPC stream bytes
+    """
+    pa = pyarrow
+    columns = _arrow_columns(shots, SHOT_FIELDS if fields is None else fields)
+    table = pa.table(columns)
+
+    # Only a page or filtered subset is gathered; the full table is sent as is
+    if positions is not None and not (isinstance(positions, range) and len(positions) == len(shots)
+                                      and positions.start == 0 and positions.step == 1):
+        table = table.take(pa.array(positions, type=pa.int64()))
+
+    table = table.replace_schema_metadata({'response': json.dumps(metadata or {})})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=ARROW_BATCH_ROWS)
+    return sink.getvalue().to_pybytes()
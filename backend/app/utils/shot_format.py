@@ -0,0 +1,154 @@
+"""
+Output formats of shot lists served by the API
+
+- records: one dictionary per shot (ShotTable.to_dicts)
+- columnar: one list per field, with zones and shot types dictionary-encoded
+- binned: attempts, makes and FG% per square court bin, aggregated with numpy
+
+All formats work on row positions of the cached table, so field projections
+and pages only pay for the rows and fields that are actually returned.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import base64
+import numpy as np
+
+from app.models.shot_table import SHOT_FIELDS, ShotTable, FIELD_COLUMNS
+
+OUTPUT_FORMATS = ('records', 'columnar', 'binned')
+
+# Side of a court bin in feet
+DEFAULT_BIN_SIZE = 2
+
+# Shot coordinates of the court corner bins are counted from
+_ORIGIN_X, _ORIGIN_Y = -250, -50
+
+
+def _column(shots: ShotTable, name: str, positions: Optional[np.ndarray]) -> np.ndarray:
+    """numpy view of a table column, gathered at positions if given"""
+    column = getattr(shots, name)
+    values = np.frombuffer(column, dtype=column.typecode)
+    return values if positions is None else values[positions]
+
+
+def columnar_shots(shots: ShotTable, positions: Optional[Sequence[int]] = None,
+                   fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Shots as parallel columns
+
+    Args:
+        shots: Shot table
+        positions: Row positions to include (all rows if omitted)
+        fields: SHOT_FIELDS to include (all if omitted); only these are computed
+
+    Returns:
+        Dictionary with 'columns' (field -> list, same field names as the records
+        format; shotZone/shotType hold codes) and 'dictionaries' decoding the codes
+    """
+    index = None if positions is None else np.asarray(positions, dtype=np.intp)
+    fields = SHOT_FIELDS if fields is None else fields
+
+    columns: Dict[str, List[Any]] = {}
+    dictionaries: Dict[str, List[str]] = {}
+    for field in fields:
+        if field == 'id':
+            columns[field] = [f"shot_{game_id:010d}_{event_id}" for game_id, event_id in
+                              zip(_column(shots, 'game_id', index).tolist(),
+                                  _column(shots, 'event_id', index).tolist())]
+        elif field == 'shotMade':
+            columns[field] = _column(shots, 'made', index).astype(bool).tolist()
+        elif field == 'timeRemaining':
+            clock = _column(shots, 'clock', index)
+            columns[field] = [f"{minutes}:{seconds:02d}" for minutes, seconds in
+                              zip((clock // 60).tolist(), (clock % 60).tolist())]
+        elif field == 'shotType':
+            columns[field] = _column(shots, 'shot_type', index).tolist()
+            dictionaries[field] = list(shots.shot_types)
+        elif field == 'shotZone':
+            columns[field] = _column(shots, 'zone', index).tolist()
+            dictionaries[field] = list(shots.zones)
+        else:
+            columns[field] = _column(shots, FIELD_COLUMNS[field], index).tolist()
+
+    return {'columns': columns, 'dictionaries': dictionaries}
+
+
+def binned_shots(shots: ShotTable, bin_size: float = DEFAULT_BIN_SIZE,
+                 positions: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Aggregate shots into square court bins
+
+    Args:
+        shots: Shot table
+        bin_size: Bin side in feet
+        positions: Row positions to include (all rows if omitted)
+
+    Returns:
+        One entry per non-empty bin: center location (shot coordinates),
+        attempts, made and fieldGoalPercentage
+    """
+    index = None if positions is None else np.asarray(positions, dtype=np.intp)
+    if not (len(shots) if index is None else len(index)):
+        return []
+
+    size = bin_size * 10
+    bin_x = np.floor((_column(shots, 'loc_x', index) - _ORIGIN_X) / size).astype(np.int64)
+    bin_y = np.floor((_column(shots, 'loc_y', index) - _ORIGIN_Y) / size).astype(np.int64)
+    made = _column(shots, 'made', index)
+
+    # Shift to non-negative bin numbers (shots may lie outside the court corner)
+    x_offset, y_offset = bin_x.min(), bin_y.min()
+    rows = bin_y.max() - y_offset + 1
+    keys, inverse = np.unique((bin_x - x_offset) * rows + (bin_y - y_offset), return_inverse=True)
+    attempts = np.bincount(inverse)
+    makes = np.bincount(inverse, weights=made).astype(np.int64)
+
+    x_min = (keys // rows + x_offset) * size + _ORIGIN_X
+    y_min = (keys % rows + y_offset) * size + _ORIGIN_Y
+
+    return [
+        {
+            'x': round(float(x) + size / 2, 1),
+            'y': round(float(y) + size / 2, 1),
+            'attempts': int(count),
+            'made': int(hits),
+            'fieldGoalPercentage': round(hits / count, 3)
+        }
+        for x, y, count, hits in zip(x_min, y_min, attempts, makes)
+    ]
+
+
+def format_shots(shots: ShotTable, output_format: str = 'records', bin_size: float = DEFAULT_BIN_SIZE,
+                 positions: Optional[Sequence[int]] = None, fields: Optional[Sequence[str]] = None) -> Any:
+    """
+    Build the API representation of shots of a table
+
+    Args:
+        shots: Shot table (typically the cached entry, which is not copied)
+        output_format: 'records', 'columnar' or 'binned'
+        bin_size: Bin side in feet (binned format only)
+        positions: Row positions to include (all rows if omitted)
+        fields: SHOT_FIELDS to include (records and columnar formats only)
+
+    Returns:
+        Records list, columnar dictionary or bin list
+    """
+    if output_format == 'columnar':
+        return columnar_shots(shots, positions, fields)
+    if output_format == 'binned':
+        return binned_shots(shots, bin_size, positions)
+    return shots.to_dicts(positions, fields)
+
+
+def encode_cursor(position: int) -> str:
+    """Opaque pagination cursor pointing after a table row"""
+    return base64.urlsafe_b64encode(f'r{position}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[int]:
+    """Row position of a cursor built by encode_cursor, or None if it is malformed"""
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        return int(decoded[1:]) if decoded.startswith('r') else None
+    except (ValueError, UnicodeDecodeError):
+        return None
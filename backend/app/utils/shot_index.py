@@ -0,0 +1,287 @@
+"""
+Precomputed shot index for fast server-side filtering
+
+Categorical attributes (made, period, zone, shot type) are stored as
+bitmaps in Python ints, so combining filters is a handful of C-level AND
+operations. Distance and game clock ranges use sorted indexes with
+prefix bitmaps, and court locations a uniform grid for radius and
+polygon queries.
+
+Indexes are kept in process memory by shot table generation rather than
+in the cache backend: the cache pickles its values, and unpickling an
+index on every request costs more than scanning the shots.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+import threading
+
+from app.models.shot_table import ShotTable
+
+# Indexes kept per process, least recently used dropped first
+MAX_INDEXES = 128
+
+_indexes: 'OrderedDict[Tuple[int, int], ShotIndex]' = OrderedDict()
+_indexes_lock = threading.Lock()
+
+# Full court extent in LOC_X/LOC_Y units: sidelines, then the near and far
+# baselines (the basket is 5.25 ft from the near one)
+COURT_BOUNDS = (-250, 250, -53, 888)
+
+
+def _bitmap(positions: Iterable[int], size: int) -> int:
+    """Build a bitmap with the given bit positions set"""
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+class _SortedIndex:
+    """Shot positions ordered by a numeric attribute for range lookups
+
+    Prefix bitmaps are kept at (at most 64) block boundaries of the sorted
+    order, so a range costs two prefix lookups plus at most one block of
+    bit setting.
+    """
+
+    MAX_BLOCKS = 64
+
+    def __init__(self, values: List[int]):
+        size = len(values)
+        self.positions = sorted(range(size), key=values.__getitem__)
+        self.values = [values[i] for i in self.positions]
+        self.block_size = max(64, -(-size // self.MAX_BLOCKS))
+
+        buffer = bytearray((size + 7) // 8)
+        self.prefixes = [0]
+        for start in range(0, size, self.block_size):
+            for position in self.positions[start:start + self.block_size]:
+                buffer[position >> 3] |= 1 << (position & 7)
+            self.prefixes.append(int.from_bytes(buffer, 'little'))
+
+    def _prefix_bitmap(self, count: int, size: int) -> int:
+        """Bitmap of the first `count` positions in sorted order"""
+        block = count // self.block_size
+        block_start = block * self.block_size
+        return self.prefixes[block] | _bitmap(self.positions[block_start:count], size)
+
+    def range_bitmap(self, low: Optional[int], high: Optional[int], size: int) -> int:
+        """Bitmap of shots whose value lies in [low, high]"""
+        start = bisect_left(self.values, low) if low is not None else 0
+        end = bisect_right(self.values, high) if high is not None else len(self.values)
+
+        if end <= start:
+            return 0
+        return self._prefix_bitmap(end, size) & ~self._prefix_bitmap(start, size)
+
+
+class _SpatialGrid:
+    """Shot positions bucketed into square cells of the court (LOC_X/LOC_Y units)"""
+
+    CELL_SIZE = 40  # 4 ft
+
+    def __init__(self, xs: List[int], ys: List[int]):
+        self.xs = xs
+        self.ys = ys
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for position, (x, y) in enumerate(zip(xs, ys)):
+            self.cells.setdefault((x // self.CELL_SIZE, y // self.CELL_SIZE), []).append(position)
+
+    def _cells_in(self, min_x: float, max_x: float, min_y: float, max_y: float):
+        """Occupied cells overlapping a bounding box, with their (column, row)"""
+        size = self.CELL_SIZE
+        first_column, last_column = int(min_x // size), int(max_x // size)
+        first_row, last_row = int(min_y // size), int(max_y // size)
+
+        # Walk whichever is smaller: the box's cells or the occupied cells
+        if (last_column - first_column + 1) * (last_row - first_row + 1) > len(self.cells):
+            for (column, row), positions in self.cells.items():
+                if first_column <= column <= last_column and first_row <= row <= last_row:
+                    yield column, row, positions
+            return
+
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                positions = self.cells.get((column, row))
+                if positions:
+                    yield column, row, positions
+
+    def within_radius(self, x: float, y: float, radius: float) -> List[int]:
+        """Positions of shots at most `radius` away from (x, y)"""
+        size = self.CELL_SIZE
+        radius_sq = radius * radius
+        xs, ys = self.xs, self.ys
+        result = []
+
+        for column, row, positions in self._cells_in(x - radius, x + radius, y - radius, y + radius):
+            left, bottom = column * size, row * size
+            right, top = left + size - 1, bottom + size - 1
+            far_x = max(abs(x - left), abs(x - right))
+            far_y = max(abs(y - bottom), abs(y - top))
+
+            if far_x * far_x + far_y * far_y <= radius_sq:
+                # Whole cell inside the circle
+                result.extend(positions)
+            else:
+                result.extend(
+                    position for position in positions
+                    if (xs[position] - x) ** 2 + (ys[position] - y) ** 2 <= radius_sq
+                )
+        return result
+
+    def within_polygon(self, polygon: Sequence[Tuple[float, float]]) -> List[int]:
+        """Positions of shots inside a polygon (even-odd rule)"""
+        size = self.CELL_SIZE
+        polygon = list(polygon)
+        polygon_xs = [px for px, _ in polygon]
+        polygon_ys = [py for _, py in polygon]
+        edges = list(zip(polygon, polygon[1:] + polygon[:1]))
+        xs, ys = self.xs, self.ys
+        result = []
+
+        def inside(x: float, y: float) -> bool:
+            crossings = False
+            for (x1, y1), (x2, y2) in edges:
+                if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                    crossings = not crossings
+            return crossings
+
+        for column, row, positions in self._cells_in(min(polygon_xs), max(polygon_xs),
+                                                     min(polygon_ys), max(polygon_ys)):
+            left, bottom = column * size, row * size
+            right, top = left + size - 1, bottom + size - 1
+
+            # A cell with all corners inside and no vertex within it lies wholly inside
+            if (all(inside(cx, cy) for cx, cy in ((left, bottom), (right, bottom), (left, top), (right, top)))
+                    and not any(left <= px <= right and bottom <= py <= top for px, py in polygon)):
+                result.extend(positions)
+            else:
+                result.extend(position for position in positions if inside(xs[position], ys[position]))
+        return result
+
+
+class ShotIndex:
+    """Bitmaps, sorted indexes and a spatial grid over one shot table, built once per generation"""
+
+    def __init__(self, shots: ShotTable):
+        """
+        Build the index
+
+        Args:
+            shots: Shot table (positions refer to its rows)
+        """
+        self.size = len(shots)
+        self.all_bits = (1 << self.size) - 1
+
+        self.made = _bitmap((i for i, made in enumerate(shots.made) if made), self.size)
+        self.periods = self._bitmaps_by_value(shots.period)
+        self.zones = {
+            shots.zones[code]: bitmap for code, bitmap in self._bitmaps_by_value(shots.zone).items()
+        }
+        self.shot_types = {
+            shots.shot_types[code]: bitmap for code, bitmap in self._bitmaps_by_value(shots.shot_type).items()
+        }
+
+        self.distance = _SortedIndex(list(shots.distance))
+        self.clock = _SortedIndex(list(shots.clock))
+        self.grid = _SpatialGrid(list(shots.loc_x), list(shots.loc_y))
+
+    def _bitmaps_by_value(self, column: Iterable[int]) -> Dict[int, int]:
+        """One bitmap per distinct value of a column"""
+        positions_by_value: Dict[int, List[int]] = {}
+        for position, value in enumerate(column):
+            positions_by_value.setdefault(value, []).append(position)
+        return {value: _bitmap(positions, self.size) for value, positions in positions_by_value.items()}
+
+    def _any_of(self, bitmaps: Dict[Any, int], keys: Iterable[Any]) -> int:
+        """Union of the bitmaps of the given keys"""
+        result = 0
+        for key in keys:
+            result |= bitmaps.get(key, 0)
+        return result
+
+    def query(self, shot_made: Optional[bool] = None, periods: Optional[List[int]] = None,
+              shot_zones: Optional[List[str]] = None, shot_types: Optional[List[str]] = None,
+              min_distance: Optional[int] = None, max_distance: Optional[int] = None,
+              min_clock: Optional[int] = None, max_clock: Optional[int] = None,
+              near: Optional[Tuple[float, float, float]] = None,
+              polygon: Optional[List[Tuple[float, float]]] = None) -> List[int]:
+        """
+        Find shots matching all given filters
+
+        Args:
+            shot_made: Only made (True) or missed (False) shots
+            periods: Periods to include
+            shot_zones: Basic shot zones to include
+            shot_types: Shot types to include (e.g., "3PT Field Goal")
+            min_distance: Minimum shot distance in feet
+            max_distance: Maximum shot distance in feet
+            min_clock: Minimum seconds remaining in the period
+            max_clock: Maximum seconds remaining in the period
+            near: (x, y, radius) circle in court coordinates (LOC_X/LOC_Y units)
+            polygon: Polygon vertices in court coordinates
+
+        Returns:
+            Positions of matching shots in the indexed list, in original order
+        """
+        bits = self.all_bits
+
+        if shot_made is not None:
+            bits &= self.made if shot_made else ~self.made
+        if periods:
+            bits &= self._any_of(self.periods, periods)
+        if shot_zones:
+            bits &= self._any_of(self.zones, shot_zones)
+        if shot_types:
+            bits &= self._any_of(self.shot_types, shot_types)
+        if bits and (min_distance is not None or max_distance is not None):
+            bits &= self.distance.range_bitmap(min_distance, max_distance, self.size)
+        if bits and (min_clock is not None or max_clock is not None):
+            bits &= self.clock.range_bitmap(min_clock, max_clock, self.size)
+        if bits and near is not None:
+            bits &= _bitmap(self.grid.within_radius(*near), self.size)
+        if bits and polygon:
+            bits &= _bitmap(self.grid.within_polygon(polygon), self.size)
+
+        return self._positions(bits & self.all_bits)
+
+    @staticmethod
+    def _positions(bits: int) -> List[int]:
+        """Positions of the set bits, lowest first"""
+        positions = []
+        binary = bin(bits)[:1:-1]
+        position = binary.find('1')
+        while position != -1:
+            positions.append(position)
+            position = binary.find('1', position + 1)
+        return positions
+
+
+def index_for(shots: ShotTable) -> ShotIndex:
+    """
+    Get the index of a shot table, building it on first use in this process
+
+    Tables are identified by generation (copies unpickled from the cache
+    share it) and row count.
+
+    Args:
+        shots: Shot table
+
+    Returns:
+        ShotIndex over the table's rows
+    """
+    key = (shots.generation, len(shots))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+
+    index = ShotIndex(shots)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
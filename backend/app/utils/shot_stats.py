@@ -0,0 +1,96 @@
+"""
+Shooting statistics derived from shot data
+"""
+
+from typing import Dict, Any
+
+from app.models.shot_table import ShotTable
+
+
+def empty_shot_stats() -> Dict[str, Any]:
+    """
+    Get a zeroed statistics dictionary
+
+    Returns:
+        Statistics dictionary with all values set to zero
+    """
+    return {
+        'totalAttempts': 0,
+        'totalMade': 0,
+        'fieldGoalPercentage': 0.0,
+        'threePointAttempts': 0,
+        'threePointMade': 0,
+        'threePointPercentage': 0.0,
+        'averageShotDistance': 0.0
+    }
+
+
+def compute_shot_stats(shots: ShotTable) -> Dict[str, Any]:
+    """
+    Compute shooting statistics from a shot table
+
+    Args:
+        shots: Shot table
+
+    Returns:
+        Statistics dictionary in the same shape as the stats endpoint
+    """
+    total_attempts = len(shots)
+    if not total_attempts:
+        return empty_shot_stats()
+
+    total_made = sum(shots.made)
+    total_distance = sum(shots.distance)
+
+    three_codes = set(shots.shot_type_codes(name for name in shots.shot_types if name.startswith('3PT')))
+    three_attempts = 0
+    three_made = 0
+    for made, shot_type in zip(shots.made, shots.shot_type):
+        if shot_type in three_codes:
+            three_attempts += 1
+            three_made += made
+
+    return {
+        'totalAttempts': total_attempts,
+        'totalMade': total_made,
+        'fieldGoalPercentage': round(total_made / total_attempts, 3),
+        'threePointAttempts': three_attempts,
+        'threePointMade': three_made,
+        'threePointPercentage': round(three_made / three_attempts, 3) if three_attempts else 0.0,
+        'averageShotDistance': round(total_distance / total_attempts, 1)
+    }
+
+
+def merge_shot_stats(stats: Dict[str, Any], new_shots: ShotTable, total_distance: int) -> Dict[str, Any]:
+    """
+    Update statistics with newly appended shots without rescanning old ones
+
+    Args:
+        stats: Statistics computed over the existing shots
+        new_shots: Shots appended since the statistics were computed
+        total_distance: Exact sum of the existing shots' distances; the
+            rounded averageShotDistance would drift over repeated merges
+
+    Returns:
+        Statistics covering both existing and new shots
+    """
+    if not new_shots:
+        return stats
+
+    added = compute_shot_stats(new_shots)
+
+    total_attempts = stats['totalAttempts'] + added['totalAttempts']
+    total_made = stats['totalMade'] + added['totalMade']
+    three_attempts = stats['threePointAttempts'] + added['threePointAttempts']
+    three_made = stats['threePointMade'] + added['threePointMade']
+    total_distance += sum(new_shots.distance)
+
+    return {
+        'totalAttempts': total_attempts,
+        'totalMade': total_made,
+        'fieldGoalPercentage': round(total_made / total_attempts, 3),
+        'threePointAttempts': three_attempts,
+        'threePointMade': three_made,
+        'threePointPercentage': round(three_made / three_attempts, 3) if three_attempts else 0.0,
+        'averageShotDistance': round(total_distance / total_attempts, 1)
+    }
@@ -2,7 +2,9 @@
 Input validation utilities for API endpoints
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Mapping
+import math
+import re
 
 def validate_player_search(query: str, limit: int) -> Optional[Dict[str, Any]]:
     """
@@ -72,6 +74,25 @@ def validate_player_id(player_id: int) -> Optional[Dict[str, Any]]:
     
     return None
 
+def validate_team_id(team_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Validate NBA team ID
+    
+    Args:
+        team_id: NBA team ID
+        
+    Returns:
+        Error dict if validation fails, None if valid
+    """
+    # Franchise IDs run from 1610612737 (ATL) to 1610612766 (CHA)
+    if not isinstance(team_id, int) or team_id < 1610612737 or team_id > 1610612766:
+        return {
+            'code': 'INVALID_TEAM_ID',
+            'message': 'Team ID must be an NBA team ID between 1610612737 and 1610612766'
+        }
+    
+    return None
+
 def validate_season(season: str) -> Optional[Dict[str, Any]]:
     """
     Validate NBA season format
@@ -89,7 +110,7 @@ def validate_season(season: str) -> Optional[Dict[str, Any]]:
         }
     
     # Season format: YYYY-YY (e.g., "2023-24")
-    if len(season) != 7 or season[4] != '-':
+    if not re.fullmatch(r'\d{4}-\d{2}', season):
         return {
             'code': 'INVALID_SEASON_FORMAT',
             'message': 'Season must be in format YYYY-YY (e.g., "2023-24")'
@@ -120,4 +141,282 @@ def validate_season(season: str) -> Optional[Dict[str, Any]]:
             'message': 'Season must contain valid years'
         }
     
-    return None
\ No newline at end of file
+    return None
+
+def parse_player_ids(value: str, max_players: int = 10) -> Tuple[list, Optional[Dict[str, Any]]]:
+    """
+    Parse and validate a comma-separated list of player IDs
+    
+    Args:
+        value: Comma-separated player IDs
+        max_players: Maximum number of IDs
+        
+    Returns:
+        Tuple of (player IDs, error dict or None)
+    """
+    try:
+        player_ids = [int(player_id) for player_id in value.split(',') if player_id.strip()]
+    except ValueError:
+        return [], {
+            'code': 'INVALID_PLAYER_IDS',
+            'message': 'ids must be a comma-separated list of player IDs'
+        }
+    
+    if len(player_ids) < 2 or len(player_ids) > max_players:
+        return [], {
+            'code': 'INVALID_PLAYER_IDS',
+            'message': f'Between 2 and {max_players} player IDs are required'
+        }
+    
+    for player_id in player_ids:
+        error = validate_player_id(player_id)
+        if error:
+            return [], error
+    
+    return player_ids, None
+
+SHOT_TYPE_ALIASES = {
+    '2PT': '2PT Field Goal',
+    '3PT': '3PT Field Goal'
+}
+
+def parse_shot_filters(args: Mapping[str, str]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Parse and validate shot filter query parameters
+    
+    Args:
+        args: Request query parameters
+        
+    Returns:
+        Tuple of (filters for ShotIndex.query, error dict or None)
+    """
+    filters: Dict[str, Any] = {}
+    
+    shot_made = args.get('shot_made')
+    if shot_made is not None and shot_made != '':
+        if shot_made.lower() not in ('true', 'false', '1', '0'):
+            return {}, {
+                'code': 'INVALID_SHOT_MADE',
+                'message': 'shot_made must be true or false'
+            }
+        filters['shot_made'] = shot_made.lower() in ('true', '1')
+    
+    if args.get('period'):
+        try:
+            filters['periods'] = [int(period) for period in args['period'].split(',')]
+        except ValueError:
+            return {}, {
+                'code': 'INVALID_PERIOD',
+                'message': 'period must be a comma-separated list of integers'
+            }
+    
+    if args.get('shot_zone'):
+        filters['shot_zones'] = [zone.strip() for zone in args['shot_zone'].split(',')]
+    
+    if args.get('shot_type'):
+        filters['shot_types'] = [
+            SHOT_TYPE_ALIASES.get(shot_type.strip().upper(), shot_type.strip())
+            for shot_type in args['shot_type'].split(',')
+        ]
+    
+    for param in ('min_distance', 'max_distance', 'min_clock', 'max_clock'):
+        value = args.get(param)
+        if value is None or value == '':
+            continue
+        try:
+            filters[param] = int(value)
+        except ValueError:
+            return {}, {
+                'code': 'INVALID_RANGE',
+                'message': f'{param} must be an integer'
+            }
+        if filters[param] < 0:
+            return {}, {
+                'code': 'INVALID_RANGE',
+                'message': f'{param} cannot be negative'
+            }
+    
+    return filters, None
+
+def parse_spatial_query(args: Mapping[str, str], region: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Parse and validate radius or polygon query parameters
+    
+    Coordinates use the court system of the shot data (LOC_X/LOC_Y, tenths
+    of feet with the basket at 0,0); the radius is given in feet. Polygon
+    vertices off the court are moved onto its edge.
+    
+    Args:
+        args: Request query parameters
+        region: 'radius' (x, y, radius) or 'polygon' (polygon=x1,y1,x2,y2,...)
+        
+    Returns:
+        Tuple of (spatial filters for ShotIndex.query, error dict or None)
+    """
+    from app.utils.shot_index import COURT_BOUNDS
+    
+    if region == 'radius':
+        try:
+            x = float(args['x'])
+            y = float(args['y'])
+            radius = float(args['radius'])
+        except (KeyError, ValueError):
+            x = y = radius = math.nan
+        if not all(math.isfinite(value) for value in (x, y, radius)):
+            return {}, {
+                'code': 'INVALID_RADIUS_QUERY',
+                'message': 'x, y and radius (feet) are required numbers'
+            }
+        if radius <= 0 or radius > 100:
+            return {}, {
+                'code': 'INVALID_RADIUS_QUERY',
+                'message': 'radius must be between 0 and 100 feet'
+            }
+        return {'near': (x, y, radius * 10)}, None
+    
+    try:
+        values = [float(value) for value in args.get('polygon', '').split(',')]
+    except ValueError:
+        values = []
+    if len(values) < 6 or len(values) % 2 or not all(math.isfinite(value) for value in values):
+        return {}, {
+            'code': 'INVALID_POLYGON',
+            'message': 'polygon must be at least 3 comma-separated x,y vertex pairs'
+        }
+    
+    min_x, max_x, min_y, max_y = COURT_BOUNDS
+    polygon = [
+        (min(max(x, min_x), max_x), min(max(y, min_y), max_y))
+        for x, y in zip(values[::2], values[1::2])
+    ]
+    return {'polygon': polygon}, None
+
+def parse_chart_options(args: Mapping[str, str], fmt: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Parse and validate shot chart rendering options
+    
+    Args:
+        args: Request query parameters (mode, width)
+        fmt: Image format from the URL
+        
+    Returns:
+        Tuple of (format, mode and width options, error dict or None)
+    """
+    from app.utils.chart_render import DEFAULT_WIDTH, FORMATS, MODES, WIDTHS
+    
+    if fmt not in FORMATS:
+        return {}, {
+            'code': 'INVALID_CHART_FORMAT',
+            'message': f'Chart format must be one of: {", ".join(FORMATS)}'
+        }
+    
+    mode = args.get('mode', 'markers')
+    if mode not in MODES:
+        return {}, {
+            'code': 'INVALID_CHART_MODE',
+            'message': f'Chart mode must be one of: {", ".join(MODES)}'
+        }
+    
+    try:
+        width = int(args.get('width', DEFAULT_WIDTH))
+    except ValueError:
+        width = 0
+    if width not in WIDTHS:
+        return {}, {
+            'code': 'INVALID_CHART_WIDTH',
+            'message': f'Chart width must be one of: {", ".join(str(width) for width in WIDTHS)} pixels'
+        }
+    return {'fmt': fmt, 'mode': mode, 'width': width}, None
+
+def parse_output_format(args: Mapping[str, str]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Parse and validate the shot list output format
+    
+    Args:
+        args: Request query parameters (format, bin_size)
+        
+    Returns:
+        Tuple of (output_format and bin_size options, error dict or None)
+    """
+    from app.utils.shot_format import OUTPUT_FORMATS, DEFAULT_BIN_SIZE
+    
+    output_format = args.get('format', 'records')
+    if output_format not in OUTPUT_FORMATS:
+        return {}, {
+            'code': 'INVALID_FORMAT',
+            'message': f'format must be one of: {", ".join(OUTPUT_FORMATS)}'
+        }
+    
+    try:
+        bin_size = float(args.get('bin_size', DEFAULT_BIN_SIZE))
+    except ValueError:
+        bin_size = 0
+    if not math.isfinite(bin_size) or bin_size < 1 or bin_size > 10:
+        return {}, {
+            'code': 'INVALID_BIN_SIZE',
+            'message': 'bin_size must be between 1 and 10 feet'
+        }
+    return {'output_format': output_format, 'bin_size': bin_size}, None
+
+def parse_shot_page(args: Mapping[str, str]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Parse and validate field projection and cursor pagination parameters
+    
+    Args:
+        args: Request query parameters (fields, limit, cursor, since_version)
+        
+    Returns:
+        Tuple of (fields, limit, cursor position and since_version, each None
+        when not given; error dict or None)
+    """
+    from app.models.shot_table import SHOT_FIELDS
+    from app.utils.shot_format import decode_cursor
+    
+    page = {'fields': None, 'limit': None, 'cursor': None, 'since_version': None}
+    
+    if args.get('fields'):
+        fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in SHOT_FIELDS]
+        if unknown or not fields:
+            return {}, {
+                'code': 'INVALID_FIELDS',
+                'message': f'fields must be a comma-separated subset of: {", ".join(SHOT_FIELDS)}'
+            }
+        page['fields'] = list(dict.fromkeys(fields))
+    
+    if 'limit' in args:
+        try:
+            page['limit'] = int(args['limit'])
+        except ValueError:
+            page['limit'] = 0
+        if page['limit'] < 1 or page['limit'] > 10000:
+            return {}, {
+                'code': 'INVALID_LIMIT',
+                'message': 'limit must be between 1 and 10000'
+            }
+    
+    if 'cursor' in args:
+        page['cursor'] = decode_cursor(args['cursor'])
+        if page['cursor'] is None:
+            return {}, {
+                'code': 'INVALID_CURSOR',
+                'message': 'cursor must be a next_cursor value returned by a previous page'
+            }
+    
+    if 'since_version' in args:
+        try:
+            page['since_version'] = int(args['since_version'])
+        except ValueError:
+            page['since_version'] = -1
+        if page['since_version'] < 0:
+            return {}, {
+                'code': 'INVALID_SINCE_VERSION',
+                'message': 'since_version must be a version returned by a previous response'
+            }
+    
+    if args.get('format') == 'binned' and (page['limit'] or page['cursor'] is not None):
+        return {}, {
+            'code': 'INVALID_PAGINATION',
+            'message': 'The binned format aggregates all shots and cannot be paginated'
+        }
+    return page, None
\ No newline at end of file
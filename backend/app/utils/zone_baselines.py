@@ -0,0 +1,141 @@
+"""
+League-average shooting baselines per court zone
+
+Baselines are stored as [attempts, made] pairs per SHOT_ZONE_BASIC,
+SHOT_ZONE_AREA, SHOT_ZONE_RANGE and their combination, so they stay
+small and can be merged when new games are synced. Percentages are
+only derived when a baseline is served.
+"""
+
+from typing import Any, Dict, List
+
+# Baseline dimension -> ShotChartDetail column
+DIMENSIONS = {
+    'basic': 'SHOT_ZONE_BASIC',
+    'area': 'SHOT_ZONE_AREA',
+    'range': 'SHOT_ZONE_RANGE'
+}
+
+# Separator of the combined basic|area|range zone key
+DETAIL_SEPARATOR = '|'
+
+
+def compute_zone_baselines(shot_data) -> Dict[str, Dict[str, List[int]]]:
+    """
+    Count attempts and makes per zone of a ShotChartDetail frame
+
+    Args:
+        shot_data: ShotChartDetail data frame
+
+    Returns:
+        [attempts, made] per zone name, keyed by dimension ('basic', 'area', 'range', 'detail')
+    """
+    baselines: Dict[str, Dict[str, List[int]]] = {dimension: {} for dimension in DIMENSIONS}
+    baselines['detail'] = {}
+    if shot_data.empty:
+        return baselines
+
+    made = shot_data['SHOT_MADE_FLAG'].astype(int)
+
+    for dimension, column in DIMENSIONS.items():
+        counts = made.groupby(shot_data[column].astype(str)).agg(['size', 'sum'])
+        baselines[dimension] = {
+            zone: [int(attempts), int(makes)] for zone, attempts, makes in counts.itertuples()
+        }
+
+    detail_keys = (
+        shot_data['SHOT_ZONE_BASIC'].astype(str) + DETAIL_SEPARATOR +
+        shot_data['SHOT_ZONE_AREA'].astype(str) + DETAIL_SEPARATOR +
+        shot_data['SHOT_ZONE_RANGE'].astype(str)
+    )
+    counts = made.groupby(detail_keys).agg(['size', 'sum'])
+    baselines['detail'] = {
+        zone: [int(attempts), int(makes)] for zone, attempts, makes in counts.itertuples()
+    }
+    return baselines
+
+
+def merge_zone_baselines(baselines: Dict[str, Dict[str, List[int]]],
+                         new_baselines: Dict[str, Dict[str, List[int]]]) -> Dict[str, Dict[str, List[int]]]:
+    """
+    Add the counts of newly synced shots to existing baselines
+
+    Args:
+        baselines: Existing [attempts, made] counts
+        new_baselines: Counts of the new shots only
+
+    Returns:
+        New baselines dictionary with summed counts
+    """
+    merged = {dimension: {zone: list(counts) for zone, counts in zones.items()}
+              for dimension, zones in baselines.items()}
+
+    for dimension, zones in new_baselines.items():
+        target = merged.setdefault(dimension, {})
+        for zone, (attempts, makes) in zones.items():
+            counts = target.setdefault(zone, [0, 0])
+            counts[0] += attempts
+            counts[1] += makes
+    return merged
+
+
+def expand_zone_baselines(baselines: Dict[str, Dict[str, List[int]]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Turn stored counts into the API shape with field goal percentages
+
+    Args:
+        baselines: [attempts, made] counts per dimension and zone
+
+    Returns:
+        attempts, made and fieldGoalPercentage per dimension and zone
+    """
+    return {
+        dimension: {
+            zone: {
+                'attempts': attempts,
+                'made': makes,
+                'fieldGoalPercentage': round(makes / attempts, 3) if attempts else 0.0
+            }
+            for zone, (attempts, makes) in zones.items()
+        }
+        for dimension, zones in baselines.items()
+    }
+
+
+def player_zone_overlay(shots, baselines: Dict[str, Dict[str, List[int]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare a player's shooting per basic zone with the league baseline
+
+    Args:
+        shots: Player's ShotTable
+        baselines: League [attempts, made] counts per dimension and zone
+
+    Returns:
+        Player and league attempts/FG% and the FG% difference per basic zone
+    """
+    import numpy as np
+
+    zone_codes = np.frombuffer(shots.zone, dtype=np.uint8)
+    made = np.frombuffer(shots.made, dtype=np.uint8)
+    attempts_by_code = np.bincount(zone_codes, minlength=len(shots.zones))
+    made_by_code = np.bincount(zone_codes, weights=made, minlength=len(shots.zones))
+
+    league = baselines.get('basic', {})
+    overlay = {}
+    for zone in sorted(set(shots.zones) | set(league)):
+        code = shots.zones.index(zone) if zone in shots.zones else None
+        attempts = int(attempts_by_code[code]) if code is not None else 0
+        makes = int(made_by_code[code]) if code is not None else 0
+        league_attempts, league_made = league.get(zone, (0, 0))
+
+        player_pct = round(makes / attempts, 3) if attempts else 0.0
+        league_pct = round(league_made / league_attempts, 3) if league_attempts else 0.0
+        overlay[zone] = {
+            'attempts': attempts,
+            'made': makes,
+            'fieldGoalPercentage': player_pct,
+            'leagueAttempts': league_attempts,
+            'leagueFieldGoalPercentage': league_pct,
+            'difference': round(player_pct - league_pct, 3) if attempts and league_attempts else None
+        }
+    return overlay
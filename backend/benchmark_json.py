@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+JSON serialization microbenchmark
+Compares Flask's default provider with the orjson provider on typical
+search, shots and stats response payloads. With --models, compares
+pydantic response models validated on every request, models validated
+once at cache fill (as the API serves them) and unvalidated dictionaries
+"""
+
+import sys
+import os
+import argparse
+import json
+import timeit
+from array import array
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.models.player import PlayerSearchResponse, PlayerStatsResponse, ShotDataResponse
+from app.models.shot_table import COLUMNS, ShotTable
+from app.utils.json_provider import ORJSON_AVAILABLE, OrjsonProvider
+from app.utils.shot_stats import compute_shot_stats
+
+ZONES = ['Restricted Area', 'In The Paint (Non-RA)', 'Mid-Range', 'Left Corner 3',
+         'Right Corner 3', 'Above the Break 3', 'Backcourt']
+
+def synthetic_shots(count: int, seed: int = 0) -> ShotTable:
+    """Build a random but realistic shot table"""
+    rng = np.random.default_rng(seed)
+    values = {
+        'game_id': 22300001 + rng.integers(0, 82, count),
+        'event_id': np.arange(count),
+        'loc_x': rng.integers(-250, 250, count),
+        'loc_y': rng.integers(-50, 420, count),
+        'distance': rng.integers(0, 35, count),
+        'made': rng.integers(0, 2, count),
+        'period': rng.integers(1, 5, count),
+        'clock': rng.integers(0, 720, count),
+        'zone': rng.integers(0, len(ZONES), count),
+        'shot_type': rng.integers(0, 2, count),
+        'game_date': np.full(count, 20240115)
+    }
+    columns = {name: array(typecode, values[name].astype(np.dtype(typecode)).tobytes())
+               for name, typecode in COLUMNS}
+    return ShotTable(columns, ZONES, ['2PT Field Goal', '3PT Field Goal'])
+
+def payloads(shot_count: int) -> dict:
+    """Response payloads shaped like the search, shots and stats endpoints"""
+    shots = synthetic_shots(shot_count)
+    players = [
+        {
+            'id': 2544 + i,
+            'firstName': 'LeBron',
+            'lastName': f'James {i}',
+            'fullName': f'LeBron James {i}',
+            'teamId': 1610612747,
+            'teamName': 'Los Angeles Lakers',
+            'position': 'F',
+            'jerseyNumber': '23',
+            'imageUrl': f'https://cdn.nba.com/headshots/nba/latest/1040x760/{2544 + i}.png'
+        }
+        for i in range(10)
+    ]
+    return {
+        'search': {'data': players, 'count': len(players), 'query': 'lebron'},
+        'shots': {'data': shots.to_dicts(), 'player_id': 2544, 'season': '2023-24',
+                  'season_type': 'Regular Season', 'count': len(shots)},
+        'stats': {'data': compute_shot_stats(shots), 'player_id': 2544, 'season': '2023-24'}
+    }
+
+# Response model of each payload
+MODELS = {'search': PlayerSearchResponse, 'shots': ShotDataResponse, 'stats': PlayerStatsResponse}
+
+def best_ms(func, name: str, repeat: int) -> float:
+    """Best time of one call in milliseconds"""
+    number = 2000 if name != 'shots' else 20
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+def benchmark_models(shot_count: int, repeat: int) -> int:
+    """Compare validated, cache-validated and unvalidated response serialization"""
+    app = Flask(__name__)
+    provider = OrjsonProvider(app) if ORJSON_AVAILABLE else DefaultJSONProvider(app)
+    
+    print(f"{'payload':<8} {'validate ms':>12} {'cached ms':>10} {'dict ms':>8} {'vs validate':>12}")
+    with app.app_context():
+        for name, payload in payloads(shot_count).items():
+            model = MODELS[name]
+            # What the cache holds: the data validated once, wrapped per request
+            validated = model.model_validate(payload)
+            fields = {key: getattr(validated, key) for key in model.model_fields}
+            assert json.loads(model.model_construct(**fields).model_dump_json()) == json.loads(
+                provider.response(payload).get_data()), f'{name} output differs'
+            
+            timings = {
+                'validate': best_ms(lambda: model.model_validate(payload).model_dump_json(), name, repeat),
+                'cached': best_ms(lambda: model.model_construct(**fields).model_dump_json(), name, repeat),
+                'dict': best_ms(lambda: provider.response(payload), name, repeat)
+            }
+            print(f"{name:<8} {timings['validate']:>12.3f} {timings['cached']:>10.3f} {timings['dict']:>8.3f} "
+                  f"{timings['validate'] / timings['cached']:>11.1f}x")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--shots', type=int, default=2000, help='shots in the shots payload')
+    parser.add_argument('--repeat', type=int, default=5, help='timing repetitions (best is reported)')
+    parser.add_argument('--models', action='store_true', help='benchmark pydantic response models instead')
+    args = parser.parse_args()
+    
+    if args.models:
+        return benchmark_models(args.shots, args.repeat)
+    
+    if not ORJSON_AVAILABLE:
+        print('orjson is not installed; only the default provider is available')
+        return 1
+    
+    app = Flask(__name__)
+    providers = {'default': DefaultJSONProvider(app), 'orjson': OrjsonProvider(app)}
+    
+    print(f"{'payload':<8} {'bytes':>9} {'default ms':>11} {'orjson ms':>10} {'speedup':>8}")
+    with app.app_context():
+        for name, payload in payloads(args.shots).items():
+            bodies = {key: provider.response(payload).get_data() for key, provider in providers.items()}
+            assert json.loads(bodies['default']) == json.loads(bodies['orjson']), f'{name} output differs'
+            
+            timings = {key: best_ms(lambda: provider.response(payload), name, args.repeat)
+                       for key, provider in providers.items()}
+            
+            print(f"{name:<8} {len(bodies['orjson']):>9} {timings['default']:>11.3f} "
+                  f"{timings['orjson']:>10.3f} {timings['default'] / timings['orjson']:>7.1f}x")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Tests for cached player shots
+"""
+
+import time
+
+import pytest
+
+from app import create_app
+from app.models.shot_table import ShotTable
+from app.services.cache_service import CacheService
+from tests.test_chart_render import make_shots
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    monkeypatch.setenv('CACHE_SNAPSHOT', '0')
+    monkeypatch.setenv('SHOT_STORE_DIR', str(tmp_path))
+    app = create_app()
+    with app.app_context():
+        yield app
+
+
+def test_player_shots_are_stored_once_and_kept_as_last_known_good(app, monkeypatch):
+    cache_service = CacheService()
+    shots = make_shots()
+    entries = app.cache.cache._cache
+
+    assert cache_service.set_player_shots(shots, 2544, '2023-24', 'Regular Season')
+    assert len(entries) == 1
+    assert len(cache_service.get_player_shots(2544, '2023-24', 'Regular Season')) == len(shots)
+
+    # Past the fresh TTL the entry is only served as fallback
+    fresh_for = CacheService.CACHE_TIMEOUTS['player_shots']
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + fresh_for + 1)
+
+    assert cache_service.get_player_shots(2544, '2023-24', 'Regular Season') is None
+    stale = cache_service.get_last_known_good('player_shots', 2544, '2023-24', 'Regular Season')
+    assert len(stale) == len(shots)
+
+
+def test_empty_player_shots_use_the_negative_ttl(app):
+    cache_service = CacheService()
+
+    assert cache_service.set_player_shots(ShotTable.empty(), 2544, '2023-24', 'Regular Season')
+
+    (expires, _), = app.cache.cache._cache.values()
+    assert expires - time.time() <= CacheService.CACHE_TIMEOUTS['negative']
+    assert not cache_service.get_player_shots(2544, '2023-24', 'Regular Season')
@@ -0,0 +1,44 @@
+"""
+Tests for chart render cache keys
+"""
+
+from app.models.shot_table import ShotTable
+from app.utils.chart_render import chart_digest
+
+
+def make_shots(count=20):
+    """Shot table with `count` distinct shots"""
+    return ShotTable.from_dicts([
+        {
+            'id': f'shot_0022300001_{i}',
+            'locationX': i * 10 - 100,
+            'locationY': i * 5,
+            'shotDistance': i,
+            'shotMade': i % 2 == 0,
+            'shotType': '3PT Field Goal' if i % 3 == 0 else '2PT Field Goal',
+            'period': 1 + i % 4,
+            'timeRemaining': f'{i % 12}:{i % 60:02d}',
+            'shotZone': 'Mid-Range' if i % 2 else 'Restricted Area'
+        }
+        for i in range(count)
+    ], game_date=20240101)
+
+
+def test_same_rows_give_same_digest():
+    shots = make_shots()
+
+    first = chart_digest(shots.take(range(10)), 'png', 'markers', 500)
+    second = chart_digest(shots.take(range(10)), 'png', 'markers', 500)
+    rebuilt = chart_digest(make_shots().take(range(10)), 'png', 'markers', 500)
+
+    assert first == second == rebuilt
+
+
+def test_different_rows_or_options_give_different_digests():
+    shots = make_shots()
+    digest = chart_digest(shots.take(range(10)), 'png', 'markers', 500)
+
+    assert chart_digest(shots.take(range(11)), 'png', 'markers', 500) != digest
+    assert chart_digest(shots.take(range(10)), 'svg', 'markers', 500) != digest
+    assert chart_digest(shots.take(range(10)), 'png', 'hexbin', 500) != digest
+    assert chart_digest(shots.take(range(10)), 'png', 'markers', 750) != digest
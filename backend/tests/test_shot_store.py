@@ -0,0 +1,29 @@
+"""
+Tests for shot store paths
+"""
+
+import os
+
+import pytest
+
+from app.services.shot_store import ShotStore
+
+
+@pytest.mark.parametrize('season', ['../../etc', '2023-24/..', '2023-24\n', '', None])
+def test_rejects_seasons_outside_the_season_format(tmp_path, season):
+    store = ShotStore(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        store._season_dir(season, 'Regular Season')
+
+    with pytest.raises(ValueError):
+        with store.lock(season, 'Regular Season', 'sync'):
+            pass
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_season_dir_stays_under_base_dir(tmp_path):
+    store = ShotStore(str(tmp_path))
+
+    assert store._season_dir('2023-24', 'Regular Season') == os.path.join(str(tmp_path), '2023-24', 'regular_season')